@@ -0,0 +1,78 @@
+"""
+Benchmark du chiffrement par lots (encrypt_many / decrypt_many)
+
+Mesure la courbe de montée en charge du traitement en ligne et du pool de
+threads pour chaque nombre de workers, sur 10k, 100k et 1M champs par défaut,
+et indique la plus petite taille pour laquelle les threads sont plus rapides
+(valeur de référence pour ENCRYPTION['parallel_min_items']).
+
+Usage : python -m benchmarks.batch_crypto_benchmark [taille1,taille2,...] [workers_max]
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.encryption import EncryptionManager
+from core.parallel import backend_releases_gil, shutdown_executors
+from core.session import SessionKeyManager
+
+def _bench(encryption: EncryptionManager, values: list, executor: str, workers: int) -> dict:
+    """Chiffrer puis déchiffrer toutes les valeurs"""
+    start = time.perf_counter()
+    tokens = encryption.encrypt_many(values, workers=workers, executor=executor)
+    encrypt_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    encryption.decrypt_many(tokens, workers=workers, executor=executor)
+    decrypt_time = time.perf_counter() - start
+
+    return {'encrypt': encrypt_time, 'decrypt': decrypt_time}
+
+def main():
+    """Point d'entrée du benchmark"""
+    sizes = [int(size) for size in sys.argv[1].split(',')] if len(sys.argv) > 1 \
+        else [10_000, 100_000, 1_000_000]
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+
+    key_session = SessionKeyManager()
+    key_session.unlock(os.urandom(32))
+    encryption = EncryptionManager(key_session)
+
+    print(f"{os.cpu_count()} cœur(s), GIL libéré par le backend : {backend_releases_gil()}")
+    worker_counts = sorted({1, 2, 4, max_workers} & set(range(1, max_workers + 1)))
+    crossover = None
+    try:
+        for size in sizes:
+            values = [f"value-{i:08d}" for i in range(size)]
+            baseline = None
+            for executor in ('none', 'thread'):
+                # Avec un seul worker, map_chunks reste dans le thread appelant
+                for workers in ([count for count in worker_counts if count > 1]
+                                if executor != 'none' else [1]):
+                    # Démarrage de l'exécuteur partagé exclu de la mesure
+                    encryption.encrypt_many(values[:2000], chunk_size=1000,
+                                            workers=workers, executor=executor)
+                    result = _bench(encryption, values, executor, workers)
+                    total = result['encrypt'] + result['decrypt']
+                    baseline = baseline or total
+                    print(f"{size:>9} champs [{executor:7} x{workers}] : "
+                          f"chiffrement {result['encrypt']:7.3f} s, "
+                          f"déchiffrement {result['decrypt']:7.3f} s, "
+                          f"accélération x{baseline / total:.2f}")
+                    if executor == 'thread' and total < baseline and crossover is None:
+                        crossover = size
+    finally:
+        shutdown_executors()
+
+    if crossover is None:
+        print("Aucun gain mesuré avec les threads : garder le traitement en ligne")
+    else:
+        print(f"Threads plus rapides à partir de {crossover} champs "
+              f"(ENCRYPTION['parallel_min_items'])")
+
+if __name__ == "__main__":
+    main()
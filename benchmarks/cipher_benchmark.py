@@ -0,0 +1,72 @@
+"""
+Benchmark du chiffrement des champs
+
+Compare l'ancien format (jeton Fernet encodé une seconde fois en base64) au
+moteur AEAD pour chaque algorithme, stocké en BLOB brut : durée de
+chiffrement et de déchiffrement, et taille stockée d'un champ.
+
+Usage : python -m benchmarks.cipher_benchmark [nombre_champs]
+"""
+
+import base64
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from cryptography.fernet import Fernet
+
+from core.ciphers import CIPHERS_BY_NAME
+
+# Champ typique : un mot de passe généré de 16 caractères
+SAMPLE = b"xK9#mP2$vL7@qR4!"
+
+def _bench_legacy(key: bytes, fields: int) -> dict:
+    """Reproduire l'ancien chemin : Fernet puis urlsafe_b64encode"""
+    fernet = Fernet(base64.urlsafe_b64encode(key))
+
+    start = time.perf_counter()
+    tokens = [base64.urlsafe_b64encode(fernet.encrypt(SAMPLE)) for _ in range(fields)]
+    encrypt_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for token in tokens:
+        fernet.decrypt(base64.urlsafe_b64decode(token))
+    decrypt_time = time.perf_counter() - start
+
+    return {'encrypt': encrypt_time, 'decrypt': decrypt_time, 'size': len(tokens[0])}
+
+def _bench_aead(name: str, key: bytes, fields: int) -> dict:
+    """Mesurer le moteur AEAD (octets bruts, comme dans les colonnes BLOB)"""
+    cipher = CIPHERS_BY_NAME[name]
+
+    start = time.perf_counter()
+    tokens = [cipher.encrypt(key, SAMPLE) for _ in range(fields)]
+    encrypt_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for token in tokens:
+        cipher.decrypt(key, token)
+    decrypt_time = time.perf_counter() - start
+
+    return {'encrypt': encrypt_time, 'decrypt': decrypt_time, 'size': len(tokens[0])}
+
+def _report(label: str, result: dict, fields: int):
+    """Afficher une ligne de résultats"""
+    print(f"{label:22} : chiffrement {result['encrypt'] * 1e6 / fields:7.2f} µs/champ, "
+          f"déchiffrement {result['decrypt'] * 1e6 / fields:7.2f} µs/champ, "
+          f"{result['size']} octets pour {len(SAMPLE)} octets en clair")
+
+def main():
+    """Point d'entrée du benchmark"""
+    fields = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    key = os.urandom(32)
+
+    _report("fernet + base64", _bench_legacy(key, fields), fields)
+    for name in CIPHERS_BY_NAME:
+        _report(name, _bench_aead(name, key, fields), fields)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark des accès à la base de données
+
+Compare l'ancien modèle (une connexion ouverte puis fermée par opération)
+aux connexions persistantes du DatabaseManager pour chaque profil de pragmas.
+
+Usage : python -m benchmarks.database_benchmark [nombre_operations]
+"""
+
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config.settings import DATABASE_PROFILES
+from core.database import DatabaseManager
+
+def _bench_connect_per_operation(db_path: Path, operations: int) -> float:
+    """Reproduire l'ancien modèle : connect + commit + close à chaque opération"""
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS Accounts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                site TEXT NOT NULL,
+                login TEXT NOT NULL,
+                password TEXT NOT NULL
+            )
+        """)
+
+    start = time.perf_counter()
+    for i in range(operations):
+        conn = sqlite3.connect(db_path)
+        conn.execute("INSERT INTO Accounts (site, login, password) VALUES (?, ?, ?)",
+                     (f"site{i}", f"login{i}", f"password{i}"))
+        conn.commit()
+        conn.close()
+    return time.perf_counter() - start
+
+def _bench_persistent(db_path: Path, profile: str, operations: int) -> dict:
+    """Mesurer les mêmes écritures via les connexions persistantes"""
+    with DatabaseManager(db_path, profile=profile) as db_manager:
+        db_manager.reset_stats()
+        start = time.perf_counter()
+        for i in range(operations):
+            with db_manager._transaction("insert") as cursor:
+                cursor.execute("INSERT INTO Accounts (site, login, password) VALUES (?, ?, ?)",
+                               (f"site{i}", f"login{i}", f"password{i}"))
+        elapsed = time.perf_counter() - start
+        stats = db_manager.get_stats()
+    return {'elapsed': elapsed, 'stats': stats}
+
+def main():
+    """Point d'entrée du benchmark"""
+    operations = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        baseline = _bench_connect_per_operation(Path(tmp_dir) / "baseline.db", operations)
+        print(f"connect/close par opération : {baseline * 1000 / operations:.3f} ms/op "
+              f"({operations} commits)")
+
+        for profile in DATABASE_PROFILES:
+            result = _bench_persistent(Path(tmp_dir) / f"{profile}.db", profile, operations)
+            stats = result['stats']
+            print(f"persistant [{profile:8}] : {result['elapsed'] * 1000 / operations:.3f} ms/op "
+                  f"(synchronous={stats['synchronous']}, commits={stats['commits']}, "
+                  f"connexions={stats['connections']})")
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,94 @@ ASSETS_DIR = BASE_DIR / "assets"
 IMAGES_DIR = ASSETS_DIR / "images"
 DATABASE_PATH = DATA_DIR / "databasee.db"
 
+# Base de données
+DATABASE = {
+    'profile': 'balanced',      # Profil de pragmas utilisé par défaut
+    'journal_mode': 'WAL',
+    'batch_size': 500           # Lignes lues par lot lors des parcours
+}
+
+# Profils de pragmas SQLite (cache_size négatif = taille en Kio)
+DATABASE_PROFILES = {
+    'safe': {
+        'synchronous': 'FULL',
+        'cache_size': -8000,
+        'mmap_size': 0,
+        'busy_timeout': 10000
+    },
+    'balanced': {
+        'synchronous': 'NORMAL',
+        'cache_size': -16000,
+        'mmap_size': 64 * 1024 * 1024,
+        'busy_timeout': 5000
+    },
+    'fast': {
+        'synchronous': 'OFF',
+        'cache_size': -64000,
+        'mmap_size': 256 * 1024 * 1024,
+        'busy_timeout': 2000
+    }
+}
+
+# Dérivation de clé (mot de passe maître et clé du coffre)
+KDF = {
+    'algorithm': 'scrypt',      # 'scrypt' ou 'pbkdf2-sha256'
+    # Durée visée par dérivation (deux par déverrouillage), ajustable par déploiement
+    'target_ms': int(os.environ.get('PASSWORD_VAULT_KDF_TARGET_MS', 250)),
+    'pbkdf2_min_iterations': 100000,
+    'scrypt_r': 8,
+    'scrypt_p': 1,
+    'scrypt_min_log_n': 14,     # N = 2^14 (16 Mio de mémoire)
+    'scrypt_max_log_n': 18      # N = 2^18 (256 Mio de mémoire)
+}
+
+# Chiffrement des champs
+ENCRYPTION = {
+    'cipher': 'aes-gcm',        # 'aes-gcm' ou 'chacha20-poly1305'
+    # 'fields' : un chiffrement par champ ; 'sealed' : un seul bloc chiffré par compte
+    'record_format': 'fields',
+    # Traitement par lots (encrypt_many / decrypt_many)
+    'executor': 'auto',         # 'auto', 'thread' ou 'none'
+    # 'auto' : pool de threads seulement à partir de ce nombre de champs (en dessous,
+    # la répartition coûte plus qu'elle ne rapporte ; voir batch_crypto_benchmark)
+    'parallel_min_items': 10000,
+    'workers': None,            # None = nombre de cœurs
+    'chunk_size': 1000          # Champs par lot
+}
+
+# Session déverrouillée
+SESSION = {
+    # Après une vérification du mot de passe maître, les consultations suivantes
+    # n'en redemandent pas pendant ce délai (0 = toujours redemander)
+    'reauth_grace_seconds': 300,
+    # Le délai de grâce est révoqué après cette durée sans activité
+    'reauth_idle_seconds': 120
+}
+
+# Déverrouillage rapide par code PIN (clé de données enveloppée sous le PIN)
+QUICK_UNLOCK = {
+    'path': DATA_DIR / "quick_unlock.json",
+    'algorithm': 'scrypt',      # Dérivation propre au PIN
+    'target_ms': 50,            # Volontairement peu coûteuse
+    'validity_minutes': 12 * 60,
+    'max_attempts': 3,          # Le fichier est supprimé après ces échecs
+    'min_pin_length': 4
+}
+
+# Cache des valeurs déchiffrées (consultation répétée d'un même compte)
+PLAINTEXT_CACHE = {
+    'max_entries': 256,         # 0 désactive le cache
+    'max_bytes': 64 * 1024,     # Taille cumulée des valeurs en clair
+    'ttl_seconds': 120          # Expiration après inactivité
+}
+
+# Recherche
+SEARCH = {
+    'debounce_ms': 200,         # Délai avant de filtrer pendant la saisie
+    'fuzzy_max_distance': 2,    # Fautes de frappe tolérées (distance d'édition)
+    'fuzzy_max_results': 200    # Candidats approximatifs retenus avant classement
+}
+
 # Interface utilisateur
 WINDOW_CONFIG = {
     'main': {
@@ -137,7 +225,9 @@ MESSAGES = {
         'username_length': "Le nom d'utilisateur doit contenir minimum 5 caractères",
         'select_account': "Veuillez selectionner un compte à supprimer",
         'select_account_edit': "Veuillez selectionner un compte à modifier",
-        'invalid_master': "Le mot de passe maitre est invalide"
+        'invalid_master': "Le mot de passe maitre est invalide",
+        'invalid_pin': f"Le code PIN doit contenir au moins {QUICK_UNLOCK['min_pin_length']} chiffres",
+        'pin_mismatch': "Les codes PIN ne correspondent pas"
     },
     'success': {
         'master_changed': "Le mot de passe maître à été modifié",
@@ -0,0 +1,194 @@
+"""
+Cache borné des valeurs déchiffrées (site, login, mot de passe)
+
+Évite de relire et de redéchiffrer un compte consulté plusieurs fois de
+suite (affichage, modification, copie du mot de passe). Le cache est limité
+en nombre d'entrées et en octets (éviction LRU), une entrée non consultée
+pendant ttl_seconds expire, et les valeurs sont conservées dans des
+bytearray remis à zéro à l'éviction, à l'invalidation et au verrouillage.
+
+Les chaînes retournées par get() sont des copies immuables que Python ne
+permet pas d'effacer : seule la copie détenue par le cache est maîtrisée.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from config.settings import PLAINTEXT_CACHE
+
+def _wipe(value: bytearray):
+    """Remettre à zéro une valeur en clair"""
+    for i in range(len(value)):
+        value[i] = 0
+
+class PlaintextCache:
+    """Cache LRU à durée d'inactivité limitée, indexé par (ID du compte, champ)"""
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None,
+                 ttl_seconds: Optional[float] = None):
+        """
+        Args:
+            max_entries: Nombre maximal de valeurs (0 désactive le cache)
+            max_bytes: Taille maximale cumulée des valeurs en octets
+            ttl_seconds: Durée d'inactivité après laquelle une valeur expire
+        """
+        self.max_entries = PLAINTEXT_CACHE['max_entries'] if max_entries is None else max_entries
+        self.max_bytes = PLAINTEXT_CACHE['max_bytes'] if max_bytes is None else max_bytes
+        self.ttl_seconds = PLAINTEXT_CACHE['ttl_seconds'] if ttl_seconds is None else ttl_seconds
+
+        self._lock = threading.Lock()
+        # (id, champ) -> (valeur, dernier accès), du moins au plus récemment utilisé
+        self._entries: "OrderedDict[Tuple[int, str], Tuple[bytearray, float]]" = OrderedDict()
+        self._bytes = 0
+        # Incrémenté à chaque invalidation : une lecture commencée avant ne remplit pas le cache
+        self._version = 0
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def version(self) -> int:
+        """Compteur d'invalidations (à relever avant de lire la base)"""
+        return self._version
+
+    def get(self, account_id: int, field: str) -> Optional[str]:
+        """
+        Lire une valeur en cache
+
+        Args:
+            account_id: ID du compte
+            field: Nom du champ ('site', 'login' ou 'password')
+
+        Returns:
+            Valeur en clair, ou None si elle n'est pas en cache
+        """
+        key = (int(account_id), field)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            value, last_access = entry
+            if now - last_access > self.ttl_seconds:
+                self._discard_locked(key)
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return None
+            self._entries[key] = (value, now)
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return value.decode('utf-8')
+
+    def get_many(self, account_id: int, fields: Iterable[str]) -> Optional[Dict[str, str]]:
+        """
+        Lire plusieurs champs d'un compte (tout ou rien)
+
+        Args:
+            account_id: ID du compte
+            fields: Champs demandés
+
+        Returns:
+            Dictionnaire champ -> valeur, ou None si un champ manque
+        """
+        values = {}
+        for field in fields:
+            value = self.get(account_id, field)
+            if value is None:
+                return None
+            values[field] = value
+        return values
+
+    def put(self, account_id: int, field: str, value: Optional[str], version: Optional[int] = None):
+        """
+        Mettre une valeur en cache
+
+        Args:
+            account_id: ID du compte
+            field: Nom du champ
+            value: Valeur en clair (None est ignoré)
+            version: Valeur de version relevée avant la lecture ; la valeur est
+                     ignorée si une invalidation a eu lieu entre-temps
+        """
+        if value is None or self.max_entries <= 0:
+            return
+        data = bytearray(value.encode('utf-8'))
+        if len(data) > self.max_bytes:
+            _wipe(data)
+            return
+
+        key = (int(account_id), field)
+        with self._lock:
+            if version is not None and version != self._version:
+                _wipe(data)
+                return
+            now = time.monotonic()
+            # Les entrées les moins récemment consultées sont en tête : purge des expirées
+            while self._entries:
+                oldest = next(iter(self._entries))
+                if now - self._entries[oldest][1] <= self.ttl_seconds:
+                    break
+                self._discard_locked(oldest)
+                self._stats['expirations'] += 1
+            self._discard_locked(key)
+            self._entries[key] = (data, now)
+            self._bytes += len(data)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._discard_locked(next(iter(self._entries)))
+                self._stats['evictions'] += 1
+
+    def invalidate(self, account_ids: Iterable[int]):
+        """
+        Oublier les valeurs de comptes modifiés ou supprimés
+
+        Args:
+            account_ids: IDs des comptes
+        """
+        account_ids = {int(account_id) for account_id in account_ids}
+        if not account_ids:
+            return
+        with self._lock:
+            self._version += 1
+            for key in [key for key in self._entries if key[0] in account_ids]:
+                self._discard_locked(key)
+
+    def clear(self):
+        """Effacer toutes les valeurs (verrouillage du coffre)"""
+        with self._lock:
+            self._version += 1
+            for value, _ in self._entries.values():
+                _wipe(value)
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        """
+        Statistiques du cache
+
+        Returns:
+            Dictionnaire avec hits, misses, evictions, expirations, entries,
+            bytes et hit_rate
+        """
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return dict(
+                self._stats,
+                entries=len(self._entries),
+                bytes=self._bytes,
+                hit_rate=self._stats['hits'] / lookups if lookups else 0.0
+            )
+
+    def reset_stats(self):
+        """Remettre à zéro les compteurs"""
+        with self._lock:
+            self._stats = dict.fromkeys(self._stats, 0)
+
+    def _discard_locked(self, key: Tuple[int, str]):
+        """Retirer et effacer une entrée (verrou détenu)"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            _wipe(entry[0])
+            self._bytes -= len(entry[0])
@@ -0,0 +1,129 @@
+"""
+Chiffrement authentifié (AEAD) des champs du coffre
+
+Format binaire d'un champ chiffré :
+
+    octet 0        version (algorithme)
+    octets 1-12    nonce aléatoire
+    octets 13-     texte chiffré suivi du tag d'authentification (16 octets)
+
+Le surcoût est de 29 octets par champ, contre environ 1,8 fois la taille
+pour l'ancien format (jeton Fernet lui-même encodé une seconde fois en
+base64). Les champs sont stockés tels quels en BLOB.
+
+Les jetons Fernet bruts commencent par 0x80 : ils ne peuvent pas être
+confondus avec une version AEAD, ce qui permet de relire les deux formats.
+"""
+
+import base64
+import binascii
+import os
+from typing import Optional
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+
+NONCE_SIZE = 12
+HEADER_SIZE = 1 + NONCE_SIZE
+
+class AEADCipher:
+    """Chiffrement AEAD d'un champ avec en-tête versionné"""
+
+    def __init__(self, version: int, name: str, algorithm):
+        """
+        Args:
+            version: Octet de version écrit en tête de chaque champ
+            name: Nom de l'algorithme dans la configuration
+            algorithm: Classe AEAD de cryptography (AESGCM, ChaCha20Poly1305)
+        """
+        self.version = version
+        self.name = name
+        self.algorithm = algorithm
+
+    def encrypt(self, key: bytes, data: bytes, associated_data: Optional[bytes] = None) -> bytes:
+        """
+        Chiffrer un champ
+
+        Args:
+            key: Clé de 32 octets
+            data: Données en clair
+            associated_data: Données authentifiées mais non chiffrées
+
+        Returns:
+            En-tête et texte chiffré
+        """
+        nonce = os.urandom(NONCE_SIZE)
+        return bytes((self.version,)) + nonce + self.algorithm(key).encrypt(nonce, data, associated_data)
+
+    def decrypt(self, key: bytes, token: bytes, associated_data: Optional[bytes] = None) -> bytes:
+        """
+        Déchiffrer un champ produit par encrypt
+
+        Args:
+            key: Clé de 32 octets
+            token: En-tête et texte chiffré
+            associated_data: Données authentifiées au chiffrement
+
+        Returns:
+            Données en clair
+
+        Raises:
+            cryptography.exceptions.InvalidTag: Si le champ a été altéré
+        """
+        nonce = token[1:HEADER_SIZE]
+        return self.algorithm(key).decrypt(nonce, token[HEADER_SIZE:], associated_data)
+
+# Algorithmes disponibles ; une version publiée ne doit jamais être réattribuée
+AES_GCM = AEADCipher(1, 'aes-gcm', AESGCM)
+CHACHA20_POLY1305 = AEADCipher(2, 'chacha20-poly1305', ChaCha20Poly1305)
+
+CIPHERS_BY_NAME = {cipher.name: cipher for cipher in (AES_GCM, CHACHA20_POLY1305)}
+CIPHERS_BY_VERSION = {cipher.version: cipher for cipher in (AES_GCM, CHACHA20_POLY1305)}
+
+def cipher_for(token: bytes) -> Optional[AEADCipher]:
+    """
+    Identifier l'algorithme d'un champ chiffré
+
+    Args:
+        token: Champ chiffré (binaire)
+
+    Returns:
+        Algorithme AEAD, ou None pour un ancien jeton Fernet
+    """
+    if len(token) <= HEADER_SIZE:
+        return None
+    return CIPHERS_BY_VERSION.get(token[0])
+
+# Premier octet d'un jeton Fernet décodé
+FERNET_VERSION = 0x80
+
+def is_fernet(token: bytes) -> bool:
+    """True pour un ancien jeton Fernet brut"""
+    return token[:1] == bytes((FERNET_VERSION,))
+
+def legacy_text_to_blob(value: str) -> bytes:
+    """
+    Convertir un champ de l'ancien stockage TEXT en champ binaire
+
+    Retire le base64 externe et, pour un jeton Fernet, son propre base64.
+    Aucune clé n'est nécessaire : le contenu chiffré est conservé à l'identique.
+
+    Args:
+        value: Valeur de la colonne TEXT
+
+    Returns:
+        Champ chiffré brut (Fernet ou AEAD), ou la valeur encodée en UTF-8 si
+        elle n'était pas chiffrée
+    """
+    if not value:
+        return b""
+    try:
+        decoded = base64.urlsafe_b64decode(value.encode('ascii'))
+        if cipher_for(decoded) is not None:
+            return decoded
+        raw = base64.urlsafe_b64decode(decoded)
+        if is_fernet(raw):
+            return raw
+    except (binascii.Error, UnicodeEncodeError, ValueError):
+        pass
+    # Valeur restée en clair (échec de chiffrement d'une ancienne version)
+    return value.encode('utf-8')
@@ -2,208 +2,1368 @@
 Gestionnaire de base de données pour le password manager
 """
 
+import base64
 import sqlite3
-from typing import List, Tuple, Optional
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Tuple, Optional, Dict, Iterable, Iterator
 from pathlib import Path
 import logging
 
-from config.settings import DATABASE_PATH
-from core.encryption import EncryptionManager
+from config.settings import (DATABASE_PATH, DATABASE, DATABASE_PROFILES, SEARCH, ENCRYPTION,
+                             KDF as KDF_CONFIG)
+from cryptography.exceptions import InvalidTag
+
+from core import kdf as kdf_format
+from core.cache import PlaintextCache
+from core.encryption import EncryptionManager, legacy_key
+from core.kdf import KDF, LEGACY_KDF, calibrate
+from core.session import SessionKeyManager, VaultLockedError
+from core.migrations import ensure_schema
+from core.search_index import FullTextIndex, TrigramIndex, FuzzyIndex
+
+# Champs chiffrés d'un compte, dans l'ordre des tuples retournés
+ACCOUNT_FIELDS = ('site', 'login', 'password')
+
+# Projection pour l'affichage en liste : le mot de passe reste chiffré
+LISTING_FIELDS = ('site', 'login')
 
 class DatabaseManager:
     """Gestionnaire de la base de données SQLite"""
-    
-    def __init__(self, db_path: Path = DATABASE_PATH):
+
+    def __init__(self, db_path: Path = DATABASE_PATH, profile: Optional[str] = None,
+                 key_session: Optional[SessionKeyManager] = None):
         self.db_path = db_path
-        self.encryption = EncryptionManager()
+        self.profile = profile or DATABASE['profile']
+        self.pragmas = DATABASE_PROFILES[self.profile]
+        self.encryption = EncryptionManager(key_session)
+
+        # Une connexion persistante par thread (sqlite3 interdit le partage)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._stats = {'connections': 0, 'commits': 0, 'rollbacks': 0, 'operations': {}}
+        self._blind_indexes_ready = False
+        self._search_index: Optional[FullTextIndex] = None
+        self._substring_index: Optional[TrigramIndex] = None
+        self._fuzzy_index: Optional[FuzzyIndex] = None
+        # Incrémenté à chaque modification des index : une construction en
+        # arrière-plan commencée avant n'est pas installée
+        self._index_lock = threading.Lock()
+        self._index_changes = 0
+        self._rehash_thread: Optional[threading.Thread] = None
+
+        # Valeurs déchiffrées récemment consultées, effacées au verrouillage
+        self._plaintext_cache = PlaintextCache()
+        self.encryption.session.add_lock_listener(self._plaintext_cache.clear)
+
         self._initialize_database()
-        
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Récupérer (ou ouvrir) la connexion du thread courant"""
+        conn = getattr(self._local, 'connection', None)
+        if conn is None:
+            conn = self._open_connection()
+            self._local.connection = conn
+            with self._lock:
+                self._connections.append(conn)
+                self._stats['connections'] += 1
+        return conn
+
+    def _open_connection(self) -> sqlite3.Connection:
+        """Ouvrir une connexion configurée selon le profil de pragmas"""
+        # isolation_level=None : les transactions sont gérées explicitement.
+        # check_same_thread=False uniquement pour permettre close() depuis un
+        # autre thread : chaque connexion reste utilisée par son seul thread.
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.pragmas['busy_timeout'] / 1000,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        conn.execute(f"PRAGMA journal_mode = {DATABASE['journal_mode']}")
+        conn.execute(f"PRAGMA synchronous = {self.pragmas['synchronous']}")
+        conn.execute(f"PRAGMA cache_size = {int(self.pragmas['cache_size'])}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.pragmas['mmap_size'])}")
+        conn.execute(f"PRAGMA busy_timeout = {int(self.pragmas['busy_timeout'])}")
+        return conn
+
+    def close(self):
+        """Fermer toutes les connexions ouvertes par ce gestionnaire"""
+        with self._lock:
+            rehash_thread, self._rehash_thread = self._rehash_thread, None
+        if rehash_thread is not None:
+            # Le thread détient le mot de passe en clair et sa propre connexion
+            rehash_thread.join()
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logging.error(f"Erreur lors de la fermeture de la connexion : {e}")
+        self._local = threading.local()
+
+    def _record(self, operation: str, elapsed: float):
+        """Comptabiliser la durée d'une opération"""
+        with self._lock:
+            count, total = self._stats['operations'].get(operation, (0, 0.0))
+            self._stats['operations'][operation] = (count + 1, total + elapsed)
+
+    @contextmanager
+    def _query(self, operation: str):
+        """Exécuter une lecture sur la connexion persistante (mesurée)"""
+        start = time.perf_counter()
+        try:
+            yield self._get_connection().cursor()
+        finally:
+            self._record(operation, time.perf_counter() - start)
+
+    @contextmanager
+    def _transaction(self, operation: str):
+        """Exécuter une écriture dans une transaction explicite (mesurée)"""
+        start = time.perf_counter()
+        conn = self._get_connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn.cursor()
+                conn.execute("COMMIT")
+                with self._lock:
+                    self._stats['commits'] += 1
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                with self._lock:
+                    self._stats['rollbacks'] += 1
+                raise
+        finally:
+            self._record(operation, time.perf_counter() - start)
+
+    def get_stats(self) -> Dict:
+        """
+        Récupérer les statistiques d'utilisation de la base de données
+
+        Returns:
+            Dictionnaire avec le profil, le nombre de connexions, de commits
+            (un fsync par commit en mode synchronous=FULL) et la latence
+            moyenne par opération en millisecondes
+        """
+        with self._lock:
+            operations = {
+                name: {
+                    'count': count,
+                    'total_ms': total * 1000,
+                    'avg_ms': (total * 1000) / count if count else 0.0
+                }
+                for name, (count, total) in self._stats['operations'].items()
+            }
+            return {
+                'profile': self.profile,
+                'synchronous': self.pragmas['synchronous'],
+                'connections': self._stats['connections'],
+                'commits': self._stats['commits'],
+                'rollbacks': self._stats['rollbacks'],
+                'operations': operations,
+                'plaintext_cache': self._plaintext_cache.stats()
+            }
+
+    def reset_stats(self):
+        """Remettre à zéro les statistiques"""
+        with self._lock:
+            self._stats.update({'commits': 0, 'rollbacks': 0, 'operations': {}})
+        self._plaintext_cache.reset_stats()
+
     def _initialize_database(self):
-        """Initialiser la base de données avec les tables nécessaires"""
+        """Initialiser la base de données (migrations du schéma, une fois par processus)"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Table des comptes
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS Accounts (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        site TEXT NOT NULL,
-                        login TEXT NOT NULL,
-                        password TEXT NOT NULL
-                    )
-                """)
-                
-                # Table pour le mot de passe maître
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS MasterPassword (
-                        id INTEGER PRIMARY KEY,
-                        password_hash TEXT NOT NULL
-                    )
-                """)
-                
-                conn.commit()
+            ensure_schema(self._get_connection(), self.db_path)
         except sqlite3.Error as e:
             logging.error(f"Erreur lors de l'initialisation de la base de données : {e}")
             raise
-    
+
+    def _encrypt_rows(self, rows, encryption: Optional[EncryptionManager] = None) -> List[Tuple]:
+        """
+        Chiffrer un lot de lignes (site, login, password)
+
+        Selon ENCRYPTION['record_format'], les champs sont chiffrés chacun dans
+        leur colonne ('fields') ou scellés ensemble dans la colonne record
+        ('sealed', les colonnes de champ restent vides).
+
+        Returns:
+            Tuples (site, login, password, record, site_index, login_index) prêts à écrire
+        """
+        encryption = encryption or self.encryption
+        rows = list(rows)
+        if ENCRYPTION['record_format'] == 'sealed':
+            fields = [(b"", b"", b"", encryption.seal_record(dict(zip(ACCOUNT_FIELDS, row))))
+                      for row in rows]
+        else:
+            values = iter(encryption.encrypt_many([value for row in rows for value in row]))
+            fields = [(next(values), next(values), next(values), None) for _ in rows]
+        return [encrypted + (encryption.blind_index(site), encryption.blind_index(login))
+                for encrypted, (site, login, _) in zip(fields, rows)]
+
+    @staticmethod
+    def _chunks(items: Iterable, chunk_size: Optional[int]) -> Iterator[list]:
+        """Découper un itérable en lots (un seul lot si chunk_size est None)"""
+        if not chunk_size:
+            yield list(items)
+            return
+        chunk = []
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def _select_columns(fields: Iterable[str]) -> str:
+        """
+        Construire la projection SQL (les champs non demandés valent NULL, puis
+        record, lui aussi NULL si aucun champ n'est demandé)
+        """
+        fields = set(fields)
+        unknown = fields - set(ACCOUNT_FIELDS)
+        if unknown:
+            raise ValueError(f"Champs inconnus : {', '.join(sorted(unknown))}")
+        return ", ".join([field if field in fields else "NULL" for field in ACCOUNT_FIELDS]
+                         + ["record" if fields else "NULL"])
+
+    def _decrypt_row(self, row: Tuple, encryption: Optional[EncryptionManager] = None
+                     ) -> Tuple[str, str, str, int]:
+        """Déchiffrer une ligne (site, login, password, record, id), les NULL restent None"""
+        encryption = encryption or self.encryption
+        *columns, record, account_id = row
+        if record is not None:
+            # Un seul déchiffrement pour tout le compte ; seuls les champs demandés sont gardés
+            values = encryption.open_record(record)
+            return tuple(values.get(field, "") if column is not None else None
+                         for field, column in zip(ACCOUNT_FIELDS, columns)) + (account_id,)
+        return tuple(encryption.decrypt(column) for column in columns) + (account_id,)
+
+    def _decrypt_rows(self, rows: List[Tuple], encryption: Optional[EncryptionManager] = None
+                      ) -> List[Tuple[str, str, str, int]]:
+        """Déchiffrer un lot de lignes, les champs séparés via decrypt_many"""
+        encryption = encryption or self.encryption
+        field_rows = [row for row in rows if row[-2] is None]
+        if len(field_rows) < 2:
+            return [self._decrypt_row(row, encryption) for row in rows]
+
+        width = len(ACCOUNT_FIELDS)
+        values = iter(encryption.decrypt_many([column for row in field_rows for column in row[:width]]))
+        decrypted = []
+        for row in rows:
+            if row[-2] is None:
+                decrypted.append(tuple(next(values) for _ in range(width)) + (row[-1],))
+            else:
+                decrypted.append(self._decrypt_row(row, encryption))
+        return decrypted
+
+    def _on_accounts_changed(self, upserted: Iterable[Tuple[str, str, int]] = (),
+                             deleted: Iterable[int] = ()):
+        """
+        Répercuter une écriture validée sur les index en mémoire
+
+        Args:
+            upserted: Tuples (site, login, id) créés ou modifiés
+            deleted: IDs supprimés
+        """
+        upserted, deleted = list(upserted), [int(account_id) for account_id in deleted]
+        self._plaintext_cache.invalidate([account_id for _, _, account_id in upserted] + deleted)
+        with self._index_lock:
+            for index in (self._search_index, self._substring_index, self._fuzzy_index):
+                if index is None:
+                    continue
+                if deleted:
+                    index.remove(deleted)
+                if upserted:
+                    index.add(upserted)
+            self._index_changes += 1
+
     def create_account(self, site: str, login: str, password: str) -> int:
         """
         Créer un nouveau compte
-        
+
         Args:
             site: Nom du site
             login: Nom d'utilisateur
             password: Mot de passe
-            
+
         Returns:
             ID du compte créé
         """
+        return self.create_accounts([(site, login, password)])[0]
+
+    def create_accounts(self, accounts: Iterable[Tuple[str, str, str]],
+                        chunk_size: Optional[int] = None) -> List[int]:
+        """
+        Créer plusieurs comptes en une seule transaction
+
+        Args:
+            accounts: Itérable de tuples (site, login, password)
+            chunk_size: Nombre de lignes par commit (None = une seule transaction)
+
+        Returns:
+            Liste des IDs créés, dans l'ordre des comptes fournis
+        """
+        account_ids = []
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO Accounts (site, login, password)
-                    VALUES (?, ?, ?)
-                """, (
-                    self.encryption.encrypt(site),
-                    self.encryption.encrypt(login),
-                    self.encryption.encrypt(password)
-                ))
-                conn.commit()
-                return cursor.lastrowid
-        except sqlite3.Error as e:
-            logging.error(f"Erreur lors de la création du compte : {e}")
+            for chunk in self._chunks(accounts, chunk_size):
+                if not chunk:
+                    continue
+                rows = self._encrypt_rows(chunk)
+                with self._transaction("create_accounts") as cursor:
+                    # Verrou d'écriture déjà pris : les IDs attribués se suivent
+                    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM Accounts")
+                    last_id = cursor.fetchone()[0]
+                    cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'Accounts'")
+                    sequence = cursor.fetchone()
+                    if sequence:
+                        last_id = max(last_id, sequence[0])
+
+                    cursor.executemany("""
+                        INSERT INTO Accounts (site, login, password, record, site_index, login_index)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    """, rows)
+
+                    cursor.execute("SELECT id FROM Accounts WHERE id > ? ORDER BY id", (last_id,))
+                    chunk_ids = [row[0] for row in cursor.fetchall()]
+
+                account_ids.extend(chunk_ids)
+                self._on_accounts_changed(
+                    upserted=[(site, login, account_id)
+                              for (site, login, _), account_id in zip(chunk, chunk_ids)]
+                )
+            return account_ids
+        except sqlite3.Error as e:
+            logging.error(f"Erreur lors de la création des comptes : {e}")
             raise
-    
-    def get_all_accounts(self) -> List[Tuple[str, str, str, int]]:
+
+    def iter_accounts(self, batch_size: Optional[int] = None, after_id: int = 0,
+                      fields: Iterable[str] = ACCOUNT_FIELDS) -> Iterator[Tuple[str, str, str, int]]:
+        """
+        Parcourir les comptes par lots (pagination par clé sur l'ID)
+
+        Les lignes sont lues et déchiffrées lot par lot : la mémoire utilisée
+        ne dépend que de batch_size, pas de la taille du coffre.
+
+        Args:
+            batch_size: Nombre de lignes lues par requête
+            after_id: Ne retourner que les comptes dont l'ID est supérieur
+            fields: Champs à déchiffrer (les autres sont retournés à None)
+
+        Yields:
+            Comptes (site, login, password, id) triés par ID
+        """
+        batch_size = batch_size or DATABASE['batch_size']
+        columns = self._select_columns(fields)
+        last_id = after_id
+        while True:
+            try:
+                with self._query("iter_accounts") as cursor:
+                    cursor.execute(f"""
+                        SELECT {columns}, id FROM Accounts
+                        WHERE id > ?
+                        ORDER BY id
+                        LIMIT ?
+                    """, (last_id, batch_size))
+                    rows = cursor.fetchall()
+            except sqlite3.Error as e:
+                logging.error(f"Erreur lors du parcours des comptes : {e}")
+                raise
+
+            yield from self._decrypt_rows(rows)
+
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1][-1]
+
+    def page(self, limit: int, offset: Optional[int] = None, after_id: Optional[int] = None,
+             fields: Iterable[str] = ACCOUNT_FIELDS) -> List[Tuple[str, str, str, int]]:
+        """
+        Récupérer une page de comptes triés par ID
+
+        Args:
+            limit: Nombre maximum de comptes
+            offset: Décalage classique (ignoré si after_id est fourni)
+            after_id: Pagination par clé, à partir du dernier ID de la page précédente
+            fields: Champs à déchiffrer (les autres sont retournés à None)
+
+        Returns:
+            Liste des comptes (site, login, password, id)
+        """
+        columns = self._select_columns(fields)
+        try:
+            with self._query("page") as cursor:
+                if after_id is not None:
+                    cursor.execute(f"""
+                        SELECT {columns}, id FROM Accounts
+                        WHERE id > ?
+                        ORDER BY id
+                        LIMIT ?
+                    """, (after_id, limit))
+                else:
+                    cursor.execute(f"""
+                        SELECT {columns}, id FROM Accounts
+                        ORDER BY id
+                        LIMIT ? OFFSET ?
+                    """, (limit, offset or 0))
+                rows = cursor.fetchall()
+            return self._decrypt_rows(rows)
+        except sqlite3.Error as e:
+            logging.error(f"Erreur lors de la récupération de la page : {e}")
+            return []
+
+    def get_all_accounts(self, fields: Iterable[str] = ACCOUNT_FIELDS) -> List[Tuple[str, str, str, int]]:
         """
         Récupérer tous les comptes
-        
+
+        Args:
+            fields: Champs à déchiffrer (les autres sont retournés à None),
+                    par exemple LISTING_FIELDS pour ne pas déchiffrer les mots de passe
+
         Returns:
             Liste des comptes (site, login, password, id)
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT site, login, password, id FROM Accounts")
-                accounts = cursor.fetchall()
-                
-                # Décrypter les données
-                decrypted_accounts = []
-                for site, login, password, account_id in accounts:
-                    decrypted_accounts.append((
-                        self.encryption.decrypt(site) if site else site,
-                        self.encryption.decrypt(login) if login else login,
-                        self.encryption.decrypt(password) if password else password,
+            return list(self.iter_accounts(fields=fields))
+        except sqlite3.Error:
+            return []
+
+    @property
+    def index_generation(self) -> int:
+        """Compteur des modifications des index (à relever avec les données à indexer)"""
+        return self._index_changes
+
+    @property
+    def search_index_ready(self) -> bool:
+        """True si la recherche exacte peut répondre sans construire son index"""
+        return self._substring_index is not None
+
+    def build_search_index(self, accounts: Optional[Iterable[Tuple[str, str, int]]] = None,
+                           generation: Optional[int] = None):
+        """
+        Construire l'index de recherche en mémoire (trigrammes)
+
+        L'index plein texte n'est construit qu'à la première recherche
+        "fulltext", et l'index approximatif par build_fuzzy_index. Peut être
+        appelé depuis un thread d'arrière-plan : un index dépassé par une
+        modification pendant sa construction est reconstruit depuis le coffre.
+
+        Args:
+            accounts: Tuples (site, login, id) déjà déchiffrés (par exemple lors
+                      du chargement du tableau) ; à défaut, le coffre est parcouru
+            generation: index_generation relevé lors de la lecture de accounts
+        """
+        while True:
+            with self._index_lock:
+                changes = self._index_changes
+            if accounts is None or (generation is not None and generation != changes):
+                accounts = ((site, login, account_id)
+                            for site, login, _, account_id in self.iter_accounts(fields=LISTING_FIELDS))
+            substring_index = TrigramIndex()
+            substring_index.build(accounts)
+            with self._index_lock:
+                if changes == self._index_changes:
+                    self._substring_index = substring_index
+                    # Reconstruits à partir de ces données à la demande
+                    self._search_index = self._fuzzy_index = None
+                    self._index_changes += 1
+                    return
+            accounts = None
+
+    def _fulltext_index(self) -> FullTextIndex:
+        """Index plein texte, construit au premier usage à partir des trigrammes"""
+        with self._index_lock:
+            if self._search_index is None:
+                search_index = FullTextIndex()
+                search_index.build(self._substring_index.items())
+                self._search_index = search_index
+            return self._search_index
+
+    @property
+    def fuzzy_index_ready(self) -> bool:
+        """True si la recherche approximative peut répondre sans construire son index"""
+        return self._fuzzy_index is not None
+
+    def build_fuzzy_index(self) -> bool:
+        """
+        Construire l'index approximatif à partir de l'index de trigrammes
+
+        Coûteux sur un grand coffre (plusieurs secondes pour 100k comptes) :
+        à appeler depuis un thread d'arrière-plan. Une construction dépassée
+        par une modification des index est recommencée ; elle est abandonnée
+        si le coffre est verrouillé entre-temps.
+
+        Returns:
+            True si l'index est installé
+        """
+        while True:
+            with self._index_lock:
+                changes, substring_index = self._index_changes, self._substring_index
+            if substring_index is None:
+                return False
+            fuzzy_index = FuzzyIndex()
+            fuzzy_index.build(substring_index.items())
+            with self._index_lock:
+                if changes == self._index_changes:
+                    self._fuzzy_index = fuzzy_index
+                    return True
+
+    def search_accounts(self, query: str, search_type: str = "all", mode: str = "contains",
+                        limit: Optional[int] = None,
+                        candidates: Optional[Iterable[int]] = None) -> List[Tuple[str, str, None, int]]:
+        """
+        Rechercher des comptes dans les index en mémoire (aucun déchiffrement)
+
+        Args:
+            query: Saisie de l'utilisateur
+            search_type: "all", "site" ou "login"
+            mode: "contains" (sous-chaîne exacte, index de trigrammes, triée par ID)
+                  ou "fulltext" (préfixe/phrase FTS5, classée par pertinence)
+            limit: Nombre maximum de résultats
+            candidates: IDs auxquels restreindre une recherche "contains"
+
+        Returns:
+            Liste des comptes (site, login, None, id)
+        """
+        if self._substring_index is None:
+            self.build_search_index()
+
+        if mode == "fulltext":
+            results = self._fulltext_index().search(query, search_type, limit)
+        elif mode == "contains":
+            results = self._substring_index.search(query, search_type, candidates)
+            if limit:
+                results = results[:limit]
+        else:
+            raise ValueError(f"Mode de recherche inconnu : {mode}")
+
+        return [(site, login, None, account_id) for site, login, account_id in results]
+
+    def fuzzy_search_accounts(self, query: str, search_type: str = "all",
+                              max_distance: Optional[int] = None,
+                              limit: Optional[int] = None) -> List[Tuple[str, str, None, int]]:
+        """
+        Rechercher des comptes malgré les fautes de frappe ("gihtub" -> "github.com")
+
+        L'index approximatif est construit au premier appel à partir des
+        valeurs déjà en mémoire (aucun déchiffrement), puis tenu à jour. Depuis
+        l'interface, le construire d'abord en arrière-plan (build_fuzzy_index)
+        et vérifier fuzzy_index_ready.
+
+        Args:
+            query: Saisie de l'utilisateur
+            search_type: "all", "site" ou "login"
+            max_distance: Distance d'édition maximale (SEARCH['fuzzy_max_distance'] par défaut)
+            limit: Nombre maximum de résultats (SEARCH['fuzzy_max_results'] par défaut)
+
+        Returns:
+            Liste des comptes (site, login, None, id), les plus proches en premier
+        """
+        if self._substring_index is None:
+            self.build_search_index()
+        fuzzy_index = self._fuzzy_index
+        if fuzzy_index is None:
+            self.build_fuzzy_index()
+            fuzzy_index = self._fuzzy_index
+            if fuzzy_index is None:
+                return []
+
+        if max_distance is None:
+            max_distance = SEARCH['fuzzy_max_distance']
+        if limit is None:
+            limit = SEARCH['fuzzy_max_results']
+        return [(site, login, None, account_id)
+                for site, login, account_id, _ in fuzzy_index.search(query, search_type,
+                                                                     max_distance, limit)]
+
+    def _cache_account(self, account: Tuple[str, str, str, int], version: int):
+        """Conserver les champs déchiffrés d'un compte dans le cache"""
+        for field, value in zip(ACCOUNT_FIELDS, account):
+            self._plaintext_cache.put(account[3], field, value, version)
+
+    def get_account(self, account_id: int) -> Optional[Tuple[str, str, str, int]]:
+        """
+        Récupérer un compte par son ID (seule cette ligne est déchiffrée)
+
+        Un compte consulté récemment est servi par le cache des valeurs
+        déchiffrées, sans accès disque ni déchiffrement.
+
+        Args:
+            account_id: ID du compte
+
+        Returns:
+            Compte (site, login, password, id) ou None s'il n'existe pas
+        """
+        cached = self._plaintext_cache.get_many(account_id, ACCOUNT_FIELDS)
+        if cached is not None:
+            return tuple(cached[field] for field in ACCOUNT_FIELDS) + (int(account_id),)
+        version = self._plaintext_cache.version
+        try:
+            with self._query("get_account") as cursor:
+                cursor.execute(f"SELECT {self._select_columns(ACCOUNT_FIELDS)}, id FROM Accounts "
+                               "WHERE id = ?", (int(account_id),))
+                row = cursor.fetchone()
+
+                if row is None:
+                    return None
+
+            account = self._decrypt_row(row)
+            self._cache_account(account, version)
+            return account
+        except sqlite3.Error as e:
+            logging.error(f"Erreur lors de la récupération du compte : {e}")
+            return None
+
+    def get_password(self, account_id: int) -> Optional[str]:
+        """
+        Déchiffrer à la demande le mot de passe d'un compte
+
+        Args:
+            account_id: ID du compte
+
+        Returns:
+            Mot de passe en clair ou None si le compte n'existe pas
+        """
+        password = self._plaintext_cache.get(account_id, 'password')
+        if password is not None:
+            return password
+        version = self._plaintext_cache.version
+        try:
+            with self._query("get_password") as cursor:
+                cursor.execute(f"SELECT {self._select_columns(('password',))}, id FROM Accounts "
+                               "WHERE id = ?", (int(account_id),))
+                row = cursor.fetchone()
+
+                if row is None:
+                    return None
+            password = self._decrypt_row(row)[2]
+            self._plaintext_cache.put(account_id, 'password', password, version)
+            return password
+        except sqlite3.Error as e:
+            logging.error(f"Erreur lors de la récupération du mot de passe : {e}")
+            return None
+
+    def get_metadata(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        """
+        Lire un paramètre du coffre
+
+        Args:
+            key: Nom du paramètre
+            default: Valeur retournée si le paramètre n'existe pas
+
+        Returns:
+            Valeur du paramètre
+        """
+        try:
+            with self._query("get_metadata") as cursor:
+                cursor.execute("SELECT value FROM VaultMetadata WHERE key = ?", (key,))
+                row = cursor.fetchone()
+                return row[0] if row else default
+        except sqlite3.Error as e:
+            logging.error(f"Erreur lors de la lecture du paramètre {key} : {e}")
+            return default
+
+    def _set_metadata(self, cursor: sqlite3.Cursor, key: str, value: Optional[str]):
+        """Écrire (ou supprimer si None) un paramètre dans la transaction courante"""
+        if value is None:
+            cursor.execute("DELETE FROM VaultMetadata WHERE key = ?", (key,))
+        else:
+            cursor.execute("INSERT OR REPLACE INTO VaultMetadata (key, value) VALUES (?, ?)",
+                           (key, value))
+
+    def rebuild_blind_indexes(self, force: bool = False, batch_size: Optional[int] = None) -> int:
+        """
+        Calculer les index aveugles manquants (ou tous si la clé a changé)
+
+        Les lignes sont traitées par lots, une transaction par lot : une
+        reconstruction interrompue reprend là où elle s'était arrêtée.
+
+        Args:
+            force: Recalculer tous les index
+            batch_size: Nombre de lignes par transaction
+
+        Returns:
+            Nombre de lignes indexées
+        """
+        batch_size = batch_size or DATABASE['batch_size']
+        key_id = self.encryption.blind_index_key_id()
+        indexed = 0
+        try:
+            if force or self.get_metadata('blind_index_key_id') != key_id:
+                with self._transaction("reset_blind_indexes") as cursor:
+                    cursor.execute("UPDATE Accounts SET site_index = NULL, login_index = NULL")
+                    self._set_metadata(cursor, 'blind_index_key_id', key_id)
+
+            while True:
+                with self._transaction("rebuild_blind_indexes") as cursor:
+                    cursor.execute(f"""
+                        SELECT {self._select_columns(LISTING_FIELDS)}, id FROM Accounts
+                        WHERE site_index IS NULL OR login_index IS NULL
+                        LIMIT ?
+                    """, (batch_size,))
+                    rows = self._decrypt_rows(cursor.fetchall())
+                    cursor.executemany("""
+                        UPDATE Accounts SET site_index = ?, login_index = ?
+                        WHERE id = ?
+                    """, [(
+                        self.encryption.blind_index(site),
+                        self.encryption.blind_index(login),
                         account_id
-                    ))
-                
-                return decrypted_accounts
+                    ) for site, login, _, account_id in rows])
+                indexed += len(rows)
+                if len(rows) < batch_size:
+                    break
+            self._blind_indexes_ready = True
+            return indexed
         except sqlite3.Error as e:
-            logging.error(f"Erreur lors de la récupération des comptes : {e}")
+            logging.error(f"Erreur lors de la reconstruction des index : {e}")
+            raise
+
+    def find_accounts(self, site: Optional[str] = None, login: Optional[str] = None,
+                      fields: Iterable[str] = ACCOUNT_FIELDS) -> List[Tuple[str, str, str, int]]:
+        """
+        Rechercher les comptes par site et/ou login exacts (via les index aveugles)
+
+        La comparaison ignore la casse et les espaces en début/fin de valeur.
+
+        Args:
+            site: Site recherché
+            login: Login recherché
+            fields: Champs à déchiffrer (les autres sont retournés à None)
+
+        Returns:
+            Liste des comptes (site, login, password, id) correspondants
+        """
+        if site is None and login is None:
             return []
-    
+        if not self._blind_indexes_ready:
+            self.rebuild_blind_indexes()
+
+        # Pendant une rotation, une ligne pas encore convertie garde l'index de l'ancienne clé
+        conditions, params = [], []
+        for column, value in (("site_index", site), ("login_index", login)):
+            if value is not None:
+                candidates = self.encryption.blind_index_candidates(value)
+                conditions.append(f"{column} IN ({', '.join('?' * len(candidates))})")
+                params.extend(candidates)
+
+        fields = tuple(fields)
+        columns = self._select_columns(fields)
+        try:
+            with self._query("find_accounts") as cursor:
+                cursor.execute(f"""
+                    SELECT {columns}, id FROM Accounts
+                    WHERE {' AND '.join(conditions)}
+                    ORDER BY id
+                """, params)
+                rows = cursor.fetchall()
+            if not fields:
+                # Seule l'existence compte : rien à déchiffrer
+                return [(None, None, None, row[-1]) for row in rows]
+            return self._decrypt_rows(rows)
+        except sqlite3.Error as e:
+            logging.error(f"Erreur lors de la recherche des comptes : {e}")
+            return []
+
+    def account_exists(self, site: str, login: str) -> bool:
+        """
+        Vérifier si un compte existe déjà pour ce site et ce login
+
+        Args:
+            site: Nom du site
+            login: Nom d'utilisateur
+
+        Returns:
+            True si un compte correspondant existe
+        """
+        return bool(self.find_accounts(site=site, login=login, fields=()))
+
     def update_account(self, account_id: int, site: str, login: str, password: str):
         """
         Mettre à jour un compte
-        
+
         Args:
             account_id: ID du compte
             site: Nouveau nom du site
             login: Nouveau nom d'utilisateur
             password: Nouveau mot de passe
         """
+        self.update_accounts([(account_id, site, login, password)])
+
+    def update_accounts(self, accounts: Iterable[Tuple[int, str, str, str]],
+                        chunk_size: Optional[int] = None):
+        """
+        Mettre à jour plusieurs comptes en une seule transaction
+
+        Args:
+            accounts: Itérable de tuples (account_id, site, login, password)
+            chunk_size: Nombre de lignes par commit (None = une seule transaction)
+        """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    UPDATE Accounts 
-                    SET site = ?, login = ?, password = ?
-                    WHERE id = ?
-                """, (
-                    self.encryption.encrypt(site),
-                    self.encryption.encrypt(login),
-                    self.encryption.encrypt(password),
-                    account_id
-                ))
-                conn.commit()
-        except sqlite3.Error as e:
-            logging.error(f"Erreur lors de la mise à jour du compte : {e}")
+            for chunk in self._chunks(accounts, chunk_size):
+                if not chunk:
+                    continue
+                encrypted = self._encrypt_rows(row[1:] for row in chunk)
+                rows = [values + (row[0],) for values, row in zip(encrypted, chunk)]
+                with self._transaction("update_accounts") as cursor:
+                    cursor.executemany("""
+                        UPDATE Accounts
+                        SET site = ?, login = ?, password = ?, record = ?,
+                            site_index = ?, login_index = ?
+                        WHERE id = ?
+                    """, rows)
+                self._on_accounts_changed(
+                    upserted=[(site, login, account_id) for account_id, site, login, _ in chunk]
+                )
+        except sqlite3.Error as e:
+            logging.error(f"Erreur lors de la mise à jour des comptes : {e}")
             raise
-    
+
     def delete_account(self, account_id: int):
         """
         Supprimer un compte
-        
+
         Args:
             account_id: ID du compte à supprimer
         """
+        self.delete_accounts([account_id])
+
+    def delete_accounts(self, account_ids: Iterable[int], chunk_size: Optional[int] = None):
+        """
+        Supprimer plusieurs comptes en une seule transaction
+
+        Args:
+            account_ids: IDs des comptes à supprimer
+            chunk_size: Nombre de suppressions par commit (None = une seule transaction)
+        """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM Accounts WHERE id = ?", (account_id,))
-                conn.commit()
+            for chunk in self._chunks(account_ids, chunk_size):
+                if not chunk:
+                    continue
+                with self._transaction("delete_accounts") as cursor:
+                    cursor.executemany("DELETE FROM Accounts WHERE id = ?",
+                                       [(account_id,) for account_id in chunk])
+                self._on_accounts_changed(deleted=chunk)
         except sqlite3.Error as e:
-            logging.error(f"Erreur lors de la suppression du compte : {e}")
+            logging.error(f"Erreur lors de la suppression des comptes : {e}")
             raise
-    
-    def set_master_password(self, password: str):
+
+    def _read_password_hash(self) -> Optional[str]:
+        """Hash du mot de passe maître, ou None s'il n'est pas défini"""
+        try:
+            with self._query("read_password_hash") as cursor:
+                cursor.execute("SELECT password_hash FROM MasterPassword WHERE id = 1")
+                row = cursor.fetchone()
+                return row[0] if row else None
+        except sqlite3.Error as e:
+            logging.error(f"Erreur lors de la lecture du mot de passe maître : {e}")
+            return None
+
+    def _current_encryption(self) -> EncryptionManager:
+        """Chiffrement des données actuellement stockées (clé de session ou clé historique)"""
+        if self.encryption.is_unlocked:
+            return self.encryption
+        if self.get_metadata('wrapped_key') is not None or self._legacy_vault_kdf() is not None:
+            raise VaultLockedError("Le coffre doit être déverrouillé pour changer de clé")
+        legacy_session = SessionKeyManager()
+        legacy_session.unlock(legacy_key())
+        return EncryptionManager(legacy_session)
+
+    def _reencrypt_accounts(self, cursor: sqlite3.Cursor, source: EncryptionManager,
+                            target: EncryptionManager):
+        """Rechiffrer tous les comptes (et leurs index aveugles) dans la transaction courante"""
+        cursor.execute(f"SELECT {self._select_columns(ACCOUNT_FIELDS)}, id FROM Accounts")
+        rows = cursor.fetchall()
+        for chunk in self._chunks(rows, DATABASE['batch_size']):
+            accounts = self._decrypt_rows(chunk, source)
+            encrypted = self._encrypt_rows((account[:3] for account in accounts), target)
+            cursor.executemany("""
+                UPDATE Accounts
+                SET site = ?, login = ?, password = ?, record = ?,
+                    site_index = ?, login_index = ?
+                WHERE id = ?
+            """, [values + (account[3],) for values, account in zip(encrypted, accounts)])
+        self._set_metadata(cursor, 'blind_index_key_id', target.blind_index_key_id())
+
+    def _kek_params(self) -> Optional[Tuple[KDF, bytes]]:
+        """Paramètres de dérivation et salt de la clé qui enveloppe la clé de données"""
+        encoded = self.get_metadata('kek_kdf')
+        if encoded is None:
+            return None
+        kek_kdf, salt, _ = kdf_format.decode(encoded)
+        return kek_kdf, salt
+
+    def _legacy_vault_kdf(self) -> Optional[Tuple[KDF, bytes]]:
+        """Paramètres d'une clé de données dérivée directement du mot de passe (avant l'enveloppe)"""
+        encoded = self.get_metadata('vault_kdf')
+        if encoded is not None:
+            vault_kdf, salt, _ = kdf_format.decode(encoded)
+            return vault_kdf, salt
+        # Coffres créés avant l'enregistrement des paramètres
+        salt = self.get_metadata('kdf_salt')
+        if salt is not None:
+            return LEGACY_KDF, base64.b64decode(salt)
+        return None
+
+    def _stored_target_kdf(self) -> Optional[KDF]:
+        """Calibration enregistrée, si elle correspond encore à la configuration"""
+        encoded = self.get_metadata('kdf_target')
+        if encoded is None or self.get_metadata('kdf_target_ms') != str(KDF_CONFIG['target_ms']):
+            return None
+        try:
+            target, _, _ = kdf_format.decode(encoded)
+        except ValueError:
+            return None
+        return target if target.name == KDF_CONFIG['algorithm'] else None
+
+    def target_kdf(self, recalibrate: bool = False) -> KDF:
         """
-        Définir ou mettre à jour le mot de passe maître
-        
+        Paramètres de dérivation visés pour ce coffre
+
+        La calibration n'est faite qu'une fois puis enregistrée : les
+        déverrouillages suivants n'ont pas à mesurer la machine.
+
         Args:
-            password: Nouveau mot de passe maître
+            recalibrate: Mesurer à nouveau la machine (après un changement
+                         de matériel ; un changement de KDF['target_ms'] ou
+                         de KDF['algorithm'] est détecté automatiquement)
+
+        Returns:
+            KDF calibrée
         """
+        target = None if recalibrate else self._stored_target_kdf()
+        if target is not None:
+            return target
+
+        target = calibrate()
         try:
-            hashed_password = self.encryption.hash_password(password)
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            with self._transaction("calibrate_kdf") as cursor:
+                self._set_metadata(cursor, 'kdf_target', kdf_format.encode(target))
+                self._set_metadata(cursor, 'kdf_target_ms', str(KDF_CONFIG['target_ms']))
+        except sqlite3.Error as e:
+            logging.error(f"Erreur lors de l'enregistrement de la calibration : {e}")
+        return target
+
+    @staticmethod
+    def _derive_kek(password: str, kek_kdf: KDF) -> Tuple[bytes, str]:
+        """Dériver une KEK du mot de passe (nouveau salt) et encoder ses paramètres"""
+        salt = EncryptionManager.generate_salt()
+        return EncryptionManager.derive_key(password, salt, kek_kdf), kdf_format.encode(kek_kdf, salt)
+
+    @staticmethod
+    def _wrap_data_key(kek: bytes, encoded_kdf: str, data_key: bytes,
+                       previous_key: Optional[bytes] = None) -> Dict[str, Optional[str]]:
+        """
+        Envelopper la clé de données (et l'ancienne clé d'une rotation en cours)
+        sous la KEK
+        """
+        return {
+            'kek_kdf': encoded_kdf,
+            'wrapped_key': base64.b64encode(EncryptionManager.wrap_key(kek, data_key)).decode('ascii'),
+            'previous_wrapped_key': base64.b64encode(
+                EncryptionManager.wrap_key(kek, previous_key)
+            ).decode('ascii') if previous_key is not None else None,
+            # Paramètres d'avant l'enveloppe, devenus inutiles
+            'vault_kdf': None,
+            'kdf_salt': None
+        }
+
+    def _install_data_key(self, password: str, data_key: Optional[bytes] = None,
+                          hashed_password: Optional[str] = None, kek_kdf: Optional[KDF] = None) -> bytes:
+        """
+        Envelopper la clé de données sous le mot de passe maître
+
+        Avec une clé fournie, seule l'enveloppe change (coût constant, quelle que
+        soit la taille du coffre). Sans clé, une clé aléatoire est créée et les
+        comptes existants y sont rechiffrés. Le hash du mot de passe maître,
+        l'enveloppe et les données sont écrits dans une seule transaction.
+
+        Returns:
+            Clé de données installée
+        """
+        kek, encoded_kdf = self._derive_kek(password, kek_kdf or self.target_kdf())
+        source = target = None
+        if data_key is None:
+            data_key = EncryptionManager.generate_data_key()
+            source = self._current_encryption()
+            target_session = SessionKeyManager()
+            target_session.unlock(data_key)
+            target = EncryptionManager(target_session)
+
+        with self._transaction("install_data_key") as cursor:
+            if hashed_password is not None:
                 cursor.execute("""
                     INSERT OR REPLACE INTO MasterPassword (id, password_hash)
                     VALUES (1, ?)
                 """, (hashed_password,))
-                conn.commit()
+            if target is not None:
+                self._reencrypt_accounts(cursor, source, target)
+                metadata = self._wrap_data_key(kek, encoded_kdf, data_key)
+                # Toutes les lignes sont rechiffrées : une rotation en cours est terminée
+                metadata['rotation_checkpoint'] = None
+            else:
+                # État de la rotation relu sous le verrou d'écriture : une rotation
+                # terminée entre-temps par rotate_batch ne doit pas renaître
+                cursor.execute("SELECT 1 FROM VaultMetadata WHERE key = 'rotation_checkpoint'")
+                previous_key = self.encryption.session.get_previous_key() if cursor.fetchone() else None
+                metadata = self._wrap_data_key(kek, encoded_kdf, data_key, previous_key)
+            for key, value in metadata.items():
+                self._set_metadata(cursor, key, value)
+        if target is not None:
+            target.session.lock()
+        return data_key
+
+    def unlock(self, password: str) -> bool:
+        """
+        Vérifier le mot de passe maître et déverrouiller la session
+
+        La clé qui enveloppe la clé de données n'est dérivée qu'ici, une fois
+        par session. Un coffre d'une version précédente est converti au
+        premier déverrouillage (la clé dérivée du mot de passe devient la clé
+        de données, sans rechiffrement ; seul un coffre encore chiffré avec
+        l'ancienne clé fixe est rechiffré), et un hash ou une enveloppe dont
+        les paramètres sont plus faibles que la cible calibrée sont recalculés.
+
+        Args:
+            password: Mot de passe maître
+
+        Returns:
+            True si le coffre est déverrouillé
+        """
+        password_hash = self._read_password_hash()
+        if not password_hash or not self.encryption.verify_password(password, password_hash):
+            return False
+
+        previous_key = None
+        try:
+            kek_params = self._kek_params()
+            if kek_params is not None:
+                kek_kdf, salt = kek_params
+                kek = EncryptionManager.derive_key(password, salt, kek_kdf)
+                data_key = EncryptionManager.unwrap_key(
+                    kek, base64.b64decode(self.get_metadata('wrapped_key'))
+                )
+                previous_wrapped_key = self.get_metadata('previous_wrapped_key')
+                if previous_wrapped_key is not None:
+                    # Rotation interrompue : l'ancienne clé reste nécessaire pour la reprendre
+                    previous_key = EncryptionManager.unwrap_key(kek, base64.b64decode(previous_wrapped_key))
+            else:
+                legacy_params = self._legacy_vault_kdf()
+                if legacy_params is not None:
+                    legacy_kdf, salt = legacy_params
+                    data_key = self._install_data_key(
+                        password, EncryptionManager.derive_key(password, salt, legacy_kdf)
+                    )
+                else:
+                    data_key = self._install_data_key(password)
+        except (sqlite3.Error, ValueError, InvalidTag) as e:
+            logging.error(f"Erreur lors du déverrouillage du coffre : {e}")
+            return False
+
+        self.encryption.session.unlock(data_key, previous_key)
+        self.encryption.session.record_verification()
+        self._blind_indexes_ready = False
+        self._upgrade_kek(password, data_key)
+        self._schedule_rehash(password, password_hash)
+        return True
+
+    def unlock_with_data_key(self, data_key: bytes, previous_key: Optional[bytes] = None) -> bool:
+        """
+        Déverrouiller la session avec une clé de données déjà connue
+        (déverrouillage rapide), sans dériver de clé à partir du mot de passe
+
+        Args:
+            data_key: Clé de données
+            previous_key: Ancienne clé d'une rotation en cours
+
+        Returns:
+            True si la clé est celle du coffre
+        """
+        candidate_session = SessionKeyManager()
+        candidate_session.unlock(data_key)
+        key_id = EncryptionManager(candidate_session).blind_index_key_id()
+        candidate_session.lock()
+        if self.get_metadata('wrapped_key') is None or self.get_metadata('blind_index_key_id') != key_id:
+            return False
+
+        rotation_pending = self.rotation_pending()
+        if rotation_pending and previous_key is None:
+            # Les comptes pas encore rechiffrés seraient illisibles
+            return False
+
+        self.encryption.session.unlock(data_key, previous_key if rotation_pending else None)
+        self._blind_indexes_ready = False
+        return True
+
+    def rotation_pending(self) -> bool:
+        """
+        Vérifier si une rotation de la clé de données est en cours
+
+        Returns:
+            True si des comptes peuvent encore être chiffrés avec l'ancienne clé
+        """
+        return self.get_metadata('previous_wrapped_key') is not None
+
+    def rotation_progress(self) -> Tuple[int, int]:
+        """
+        Avancement de la rotation en cours
+
+        Returns:
+            Tuple (comptes rechiffrés, total des comptes)
+        """
+        checkpoint = int(self.get_metadata('rotation_checkpoint', '0'))
+        try:
+            with self._query("rotation_progress") as cursor:
+                cursor.execute("""
+                    SELECT COALESCE(SUM(id <= ?), 0), COUNT(*) FROM Accounts
+                """, (checkpoint,))
+                done, total = cursor.fetchone()
+                return done, total
+        except sqlite3.Error as e:
+            logging.error(f"Erreur lors de la lecture de l'avancement de la rotation : {e}")
+            return 0, 0
+
+    def begin_key_rotation(self, password: str) -> bool:
+        """
+        Démarrer la rotation de la clé de données
+
+        Une nouvelle clé aléatoire devient la clé de données (toutes les
+        écritures l'utilisent immédiatement) ; l'ancienne est conservée,
+        enveloppée sous la même KEK, pour relire les comptes pas encore
+        rechiffrés. Les comptes sont ensuite convertis par rotate_batch.
+        Sans effet si une rotation est déjà en cours.
+
+        Args:
+            password: Mot de passe maître (la KEK n'est pas conservée en mémoire)
+
+        Returns:
+            True si une rotation est en cours, False si le mot de passe est incorrect
+
+        Raises:
+            VaultLockedError: Si le coffre est verrouillé
+        """
+        if self.rotation_pending():
+            return True
+        old_key = self.encryption.session.get_key()
+        if not self.verify_master_password(password):
+            return False
+
+        kek_kdf, _ = self._kek_params()
+        data_key = EncryptionManager.generate_data_key()
+        kek, encoded_kdf = self._derive_kek(password, kek_kdf)
+        metadata = self._wrap_data_key(kek, encoded_kdf, data_key, old_key)
+        metadata['rotation_checkpoint'] = '0'
+        target_session = SessionKeyManager()
+        target_session.unlock(data_key)
+        metadata['blind_index_key_id'] = EncryptionManager(target_session).blind_index_key_id()
+        target_session.lock()
+        try:
+            with self._transaction("begin_key_rotation") as cursor:
+                for key, value in metadata.items():
+                    self._set_metadata(cursor, key, value)
+        except sqlite3.Error as e:
+            logging.error(f"Erreur lors du démarrage de la rotation de clé : {e}")
+            raise
+
+        self.encryption.session.unlock(data_key, old_key)
+        return True
+
+    def rotate_batch(self, batch_size: Optional[int] = None) -> int:
+        """
+        Rechiffrer le lot suivant de comptes avec la nouvelle clé
+
+        Les comptes sont parcourus par ID croissant. Chaque lot est validé
+        avec son point de reprise dans une seule transaction : après une
+        interruption, la rotation reprend au premier compte non converti.
+        Le dernier lot termine la rotation (l'ancienne clé est oubliée), de
+        même qu'un appel sans point de reprise.
+
+        Args:
+            batch_size: Nombre de comptes par transaction
+
+        Returns:
+            Nombre de comptes rechiffrés par ce lot
+        """
+        batch_size = batch_size or DATABASE['batch_size']
+        try:
+            with self._transaction("rotate_batch") as cursor:
+                cursor.execute("SELECT value FROM VaultMetadata WHERE key = 'rotation_checkpoint'")
+                row = cursor.fetchone()
+                accounts = []
+                if row is not None:
+                    cursor.execute(f"""
+                        SELECT {self._select_columns(ACCOUNT_FIELDS)}, id FROM Accounts
+                        WHERE id > ?
+                        ORDER BY id
+                        LIMIT ?
+                    """, (int(row[0]), batch_size))
+                    accounts = self._decrypt_rows(cursor.fetchall())
+                encrypted = self._encrypt_rows(account[:3] for account in accounts)
+                cursor.executemany("""
+                    UPDATE Accounts
+                    SET site = ?, login = ?, password = ?, record = ?,
+                        site_index = ?, login_index = ?
+                    WHERE id = ?
+                """, [values + (account[3],) for values, account in zip(encrypted, accounts)])
+
+                finished = len(accounts) < batch_size
+                if finished:
+                    self._set_metadata(cursor, 'previous_wrapped_key', None)
+                    self._set_metadata(cursor, 'rotation_checkpoint', None)
+                else:
+                    self._set_metadata(cursor, 'rotation_checkpoint', str(accounts[-1][3]))
+        except sqlite3.Error as e:
+            logging.error(f"Erreur lors de la rotation de clé : {e}")
+            raise
+
+        if finished and self.encryption.session.get_previous_key() is not None:
+            self.encryption.session.unlock(self.encryption.session.get_key())
+        return len(accounts)
+
+    def _upgrade_kek(self, password: str, data_key: bytes):
+        """Envelopper à nouveau la clé de données si les paramètres de la KEK sont dépassés"""
+        try:
+            kek_kdf, _ = self._kek_params()
+            target = self.target_kdf()
+            if kek_kdf.is_weaker_than(target):
+                self._install_data_key(password, data_key, kek_kdf=target)
+        except (sqlite3.Error, ValueError) as e:
+            # Le coffre reste utilisable avec les anciens paramètres
+            logging.error(f"Erreur lors de la mise à niveau de l'enveloppe : {e}")
+
+    def _schedule_rehash(self, password: str, password_hash: str) -> Optional[threading.Thread]:
+        """Recalculer en arrière-plan un hash du mot de passe maître aux paramètres dépassés"""
+        # Sans calibration enregistrée, la mesure est faite par le thread
+        target = self._stored_target_kdf()
+        if target is not None and not self.encryption.needs_rehash(password_hash, target):
+            return None
+        with self._lock:
+            if self._rehash_thread is not None and self._rehash_thread.is_alive():
+                return None
+            self._rehash_thread = threading.Thread(
+                target=self._rehash_master_password,
+                args=(password, password_hash, self.encryption.session.generation),
+                name="rehash-master-password", daemon=True
+            )
+            self._rehash_thread.start()
+            return self._rehash_thread
+
+    def _rehash_master_password(self, password: str, password_hash: str, generation: int):
+        """
+        Remplacer le hash du mot de passe maître (thread d'arrière-plan)
+
+        Abandonné si la session a changé depuis la vérification (verrouillage,
+        changement de mot de passe) : le travail sera refait au prochain
+        déverrouillage.
+        """
+        session = self.encryption.session
+        try:
+            target = self.target_kdf()
+            if session.generation != generation or not self.encryption.needs_rehash(password_hash, target):
+                return
+            new_hash = self.encryption.hash_password(password, target)
+            if session.generation != generation:
+                return
+            with self._transaction("rehash_master_password") as cursor:
+                # Ne rien écraser si le mot de passe a changé entre-temps
+                cursor.execute("""
+                    UPDATE MasterPassword SET password_hash = ?
+                    WHERE id = 1 AND password_hash = ?
+                """, (new_hash, password_hash))
+        except (sqlite3.Error, ValueError) as e:
+            logging.error(f"Erreur lors de la mise à niveau du hash du mot de passe maître : {e}")
+
+    def lock(self):
+        """Verrouiller la session et oublier les données déchiffrées en mémoire"""
+        self.encryption.session.lock()
+        with self._index_lock:
+            self._search_index = None
+            self._substring_index = None
+            self._fuzzy_index = None
+            self._index_changes += 1
+
+    @property
+    def is_unlocked(self) -> bool:
+        """True si la session est déverrouillée"""
+        return self.encryption.is_unlocked
+
+    def set_master_password(self, password: str):
+        """
+        Définir ou mettre à jour le mot de passe maître
+
+        Seule l'enveloppe de la clé de données change : le coût ne dépend pas
+        de la taille du coffre. La session reste déverrouillée.
+
+        Args:
+            password: Nouveau mot de passe maître
+
+        Raises:
+            VaultLockedError: Si le coffre existe mais n'est pas déverrouillé
+        """
+        try:
+            data_key = None
+            if self.encryption.is_unlocked:
+                data_key = self.encryption.session.get_key()
+            elif self.get_metadata('wrapped_key') is not None or self._legacy_vault_kdf() is not None:
+                raise VaultLockedError("Le coffre doit être déverrouillé pour changer de mot de passe")
+
+            target = self.target_kdf()
+            hashed_password = self.encryption.hash_password(password, target)
+            data_key = self._install_data_key(password, data_key, hashed_password, target)
         except sqlite3.Error as e:
             logging.error(f"Erreur lors de la définition du mot de passe maître : {e}")
             raise
-    
+
+        self.encryption.session.unlock(data_key, self.encryption.session.get_previous_key())
+        # Le délai de grâce accordé à l'ancien mot de passe ne survit pas au changement
+        self.encryption.session.revoke_reauthentication()
+
     def verify_master_password(self, password: str) -> bool:
         """
         Vérifier le mot de passe maître
-        
+
+        Un hash aux paramètres dépassés est recalculé en arrière-plan après
+        une vérification réussie, et la session ouvre son délai de grâce
+        (voir SessionKeyManager.reauthentication_valid).
+
         Args:
             password: Mot de passe à vérifier
-            
+
         Returns:
             True si le mot de passe est correct
         """
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT password_hash FROM MasterPassword WHERE id = 1")
-                result = cursor.fetchone()
-                
-                if result:
-                    return self.encryption.verify_password(password, result[0])
-                return False
-        except sqlite3.Error as e:
-            logging.error(f"Erreur lors de la vérification du mot de passe maître : {e}")
+        password_hash = self._read_password_hash()
+        if not password_hash or not self.encryption.verify_password(password, password_hash):
             return False
-    
+        self.encryption.session.record_verification()
+        self._schedule_rehash(password, password_hash)
+        return True
+
     def has_master_password(self) -> bool:
         """
         Vérifier si un mot de passe maître existe
-        
+
         Returns:
             True si un mot de passe maître existe
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            with self._query("has_master_password") as cursor:
                 cursor.execute("SELECT COUNT(*) FROM MasterPassword WHERE id = 1")
                 count = cursor.fetchone()[0]
                 return count > 0
         except sqlite3.Error as e:
             logging.error(f"Erreur lors de la vérification de l'existence du mot de passe maître : {e}")
-            return False
\ No newline at end of file
+            return False
@@ -3,38 +3,288 @@ Gestionnaire de chiffrement et de hachage pour le password manager
 """
 
 import hashlib
+import hmac
 import base64
+import json
 import secrets
-from cryptography.fernet import Fernet
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
 from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 import logging
 
+from config.settings import ENCRYPTION
+from core import kdf as kdf_format
+from core.ciphers import AES_GCM, CIPHERS_BY_NAME, CIPHERS_BY_VERSION, cipher_for, is_fernet
+from core.kdf import KDF, LEGACY_KDF, calibrate
+from core.parallel import map_chunks
+from core.session import SessionKeyManager, session
+
+def normalize_lookup(value: str) -> str:
+    """
+    Normaliser une valeur pour les recherches exactes (site, login)
+
+    Args:
+        value: Valeur saisie
+
+    Returns:
+        Valeur sans espaces superflus et en minuscules
+    """
+    return (value or "").strip().lower()
+
+# Taille des salts (clé du coffre et hash du mot de passe maître)
+VAULT_SALT_SIZE = 16
+
+# Clé de données (enveloppée par une clé dérivée du mot de passe maître)
+DATA_KEY_SIZE = 32
+KEY_WRAP_ASSOCIATED_DATA = b"password-manager/data-key"
+
+# Données associées des comptes scellés (un bloc ne peut pas passer pour un champ)
+RECORD_ASSOCIATED_DATA = b"password-manager/record"
+
+@lru_cache(maxsize=1)
+def legacy_key() -> bytes:
+    """
+    Clé fixe des versions précédentes (données chiffrées avant l'introduction
+    de la clé dérivée du mot de passe maître). Dérivée une seule fois par
+    processus et uniquement si une ancienne donnée est rencontrée.
+    """
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=b"salt_",
+        iterations=LEGACY_KDF.iterations,
+    )
+    return kdf.derive(b"default_password")
+
+@lru_cache(maxsize=1)
+def _legacy_fernet() -> Fernet:
+    """Objet Fernet de la clé fixe historique"""
+    return Fernet(base64.urlsafe_b64encode(legacy_key()))
+
+def _open_aead(field_keys: Sequence[bytes], token: bytes, associated_data: Optional[bytes] = None) -> bytes:
+    """Déchiffrer un champ AEAD avec la clé courante, puis l'ancienne pendant une rotation"""
+    cipher = cipher_for(token)
+    if cipher is None:
+        raise ValueError("Version de champ inconnue")
+    for field_key in field_keys[:-1]:
+        try:
+            return cipher.decrypt(field_key, token, associated_data)
+        except InvalidTag:
+            continue
+    return cipher.decrypt(field_keys[-1], token, associated_data)
+
+def _fernet_for(vault_keys: Sequence[bytes]) -> MultiFernet:
+    """Fernet des clés de la session (relecture de l'ancien format)"""
+    return MultiFernet([Fernet(base64.urlsafe_b64encode(key)) for key in vault_keys])
+
+def _decrypt_value(field_keys: Sequence[bytes], fernet: MultiFernet,
+                   encrypted_data: Optional[bytes]) -> Optional[str]:
+    """Déchiffrer un champ (AEAD ou ancien jeton Fernet) avec des clés déjà préparées"""
+    if encrypted_data is None:
+        return None
+    if not encrypted_data:
+        return ""
+    
+    token = bytes(encrypted_data)
+    try:
+        if cipher_for(token) is not None:
+            return _open_aead(field_keys, token).decode('utf-8')
+        
+        if is_fernet(token):
+            # Ancien format : jeton Fernet, avec la clé de session ou l'ancienne clé fixe
+            fernet_token = base64.urlsafe_b64encode(token)
+            try:
+                return fernet.decrypt(fernet_token).decode('utf-8')
+            except InvalidToken:
+                return _legacy_fernet().decrypt(fernet_token).decode('utf-8')
+    except Exception as e:
+        logging.error(f"Erreur lors du déchiffrement : {e}")
+    # Retourner les données telles quelles (valeur jamais chiffrée ou illisible)
+    return token.decode('utf-8', errors='replace')
+
+def _encrypt_chunk(cipher_version: int, field_key: bytes, values: Sequence[str]) -> List[bytes]:
+    """Chiffrer un lot de champs (exécutable sur un thread du pool)"""
+    cipher = CIPHERS_BY_VERSION[cipher_version]
+    return [cipher.encrypt(field_key, value.encode('utf-8')) if value else b"" for value in values]
+
+def _decrypt_chunk(field_keys: Sequence[bytes], fernet: MultiFernet,
+                   tokens: Sequence[Optional[bytes]]) -> List[Optional[str]]:
+    """Déchiffrer un lot de champs (exécutable sur un thread du pool)"""
+    return [_decrypt_value(field_keys, fernet, token) for token in tokens]
+
 class EncryptionManager:
     """Gestionnaire des opérations de chiffrement et hachage"""
     
-    def __init__(self):
-        self._key = None
-        self._fernet = None
-        self._initialize_key()
+    def __init__(self, key_session: Optional[SessionKeyManager] = None):
+        # Aucune dérivation ici : la clé est celle de la session déverrouillée
+        self._session = key_session or session
+        self._cipher = CIPHERS_BY_NAME[ENCRYPTION['cipher']]
+        self._clear_keys()
+        # Les sous-clés ne survivent pas au verrouillage de la session
+        self._session.add_lock_listener(self._clear_keys)
+    
+    @property
+    def session(self) -> SessionKeyManager:
+        """Session qui fournit la clé du coffre"""
+        return self._session
+    
+    @property
+    def is_unlocked(self) -> bool:
+        """True si la clé du coffre est disponible"""
+        return self._session.is_unlocked
+    
+    @staticmethod
+    def generate_salt() -> bytes:
+        """
+        Générer le salt aléatoire propre à un coffre
+        
+        Returns:
+            Salt de VAULT_SALT_SIZE octets
+        """
+        return secrets.token_bytes(VAULT_SALT_SIZE)
     
-    def _initialize_key(self):
-        """Initialiser la clé de chiffrement"""
-        # En production, cette clé devrait être dérivée du mot de passe maître
-        # Pour la compatibilité avec le code existant, on utilise une clé fixe
-        password = b"default_password"  # À remplacer par le mot de passe maître
-        salt = b"salt_"  # En production, utiliser un salt aléatoire stocké
+    @staticmethod
+    def derive_key(password: str, salt: bytes, kdf: KDF = LEGACY_KDF) -> bytes:
+        """
+        Dériver la clé du coffre à partir du mot de passe maître
+        
+        Opération coûteuse : à n'appeler qu'au déverrouillage.
         
-        kdf = PBKDF2HMAC(
+        Args:
+            password: Mot de passe maître
+            salt: Salt du coffre
+            kdf: Fonction de dérivation et ses paramètres
+            
+        Returns:
+            Clé de 32 octets
+        """
+        return kdf.derive(password, salt)
+    
+    @staticmethod
+    def generate_data_key() -> bytes:
+        """
+        Générer une clé de données aléatoire (chiffrement des comptes)
+        
+        Returns:
+            Clé de DATA_KEY_SIZE octets
+        """
+        return secrets.token_bytes(DATA_KEY_SIZE)
+    
+    @staticmethod
+    def wrap_key(kek: bytes, data_key: bytes) -> bytes:
+        """
+        Envelopper la clé de données avec une clé de chiffrement de clé (KEK)
+        
+        Args:
+            kek: Clé dérivée du mot de passe maître
+            data_key: Clé de données
+            
+        Returns:
+            Clé de données chiffrée (AES-GCM)
+        """
+        return AES_GCM.encrypt(kek, data_key, KEY_WRAP_ASSOCIATED_DATA)
+    
+    @staticmethod
+    def unwrap_key(kek: bytes, wrapped_key: bytes) -> bytes:
+        """
+        Retrouver la clé de données
+        
+        Args:
+            kek: Clé dérivée du mot de passe maître
+            wrapped_key: Résultat de wrap_key
+            
+        Returns:
+            Clé de données
+            
+        Raises:
+            cryptography.exceptions.InvalidTag: Si la KEK est incorrecte
+        """
+        return AES_GCM.decrypt(kek, wrapped_key, KEY_WRAP_ASSOCIATED_DATA)
+    
+    def _clear_keys(self):
+        """Oublier les clés dérivées et les objets de chiffrement en cache"""
+        self._cached_generation = None
+        self._fernet = None
+        self._field_key = None
+        self._field_keys = []
+        self._index_key = None
+        self._index_keys = []
+
+    def _ensure_keys(self):
+        """Préparer les objets de chiffrement pour la clé courante de la session"""
+        generation = self._session.generation
+        if generation == self._cached_generation and self._fernet is not None:
+            return
+        # Clé courante, puis l'ancienne clé tant qu'une rotation est en cours
+        keys = [self._session.get_key()]
+        previous_key = self._session.get_previous_key()
+        if previous_key is not None:
+            keys.append(previous_key)
+        # Fernet n'est conservé que pour relire les champs de l'ancien format
+        self._fernet = _fernet_for(keys)
+        self._field_keys = [self._derive_subkey(key, b"field-encryption") for key in keys]
+        self._index_keys = [self._derive_subkey(key, b"blind-index") for key in keys]
+        self._field_key = self._field_keys[0]
+        self._index_key = self._index_keys[0]
+        self._cached_generation = generation
+
+    @staticmethod
+    def _derive_subkey(key: bytes, purpose: bytes) -> bytes:
+        """Dériver une sous-clé indépendante de la clé du coffre (HKDF)"""
+        return HKDF(
             algorithm=hashes.SHA256(),
             length=32,
-            salt=salt,
-            iterations=100000,
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(password))
-        self._fernet = Fernet(key)
+            salt=None,
+            info=b"password-manager/" + purpose,
+        ).derive(key)
+
+    def blind_index(self, value: str) -> str:
+        """
+        Calculer l'index aveugle (HMAC-SHA256) d'une valeur normalisée
+
+        Permet les recherches exactes en base sans déchiffrer les colonnes.
+
+        Args:
+            value: Valeur en clair (site ou login)
+
+        Returns:
+            HMAC hexadécimal de la valeur normalisée
+        """
+        self._ensure_keys()
+        return hmac.new(self._index_key, normalize_lookup(value).encode('utf-8'),
+                        hashlib.sha256).hexdigest()
+
+    def blind_index_candidates(self, value: str) -> List[str]:
+        """
+        Index aveugles possibles d'une valeur (clé courante, puis ancienne clé
+        pendant une rotation, tant que toutes les lignes ne sont pas converties)
+
+        Args:
+            value: Valeur en clair (site ou login)
+
+        Returns:
+            HMAC hexadécimaux de la valeur normalisée
+        """
+        self._ensure_keys()
+        normalized = normalize_lookup(value).encode('utf-8')
+        return [hmac.new(index_key, normalized, hashlib.sha256).hexdigest()
+                for index_key in self._index_keys]
+
+    def blind_index_key_id(self) -> str:
+        """
+        Identifiant de la clé d'index (pour détecter un changement de clé)
+
+        Returns:
+            Empreinte courte et non réversible de la clé d'index
+        """
+        self._ensure_keys()
+        return hmac.new(self._index_key, b"key-id", hashlib.sha256).hexdigest()[:16]
     
-    def encrypt(self, data: str) -> str:
+    def encrypt(self, data: str) -> bytes:
         """
         Chiffrer une chaîne de caractères
         
@@ -42,65 +292,165 @@ class EncryptionManager:
             data: Données à chiffrer
             
         Returns:
-            Données chiffrées encodées en base64
+            Champ AEAD brut (en-tête versionné + texte chiffré), à stocker en BLOB
         """
+        if not data:
+            return b""
+        self._ensure_keys()  # VaultLockedError si le coffre est verrouillé
+        
         try:
-            if not data:
-                return data
-            
-            encrypted_data = self._fernet.encrypt(data.encode())
-            return base64.urlsafe_b64encode(encrypted_data).decode()
+            return self._cipher.encrypt(self._field_key, data.encode('utf-8'))
         except Exception as e:
             logging.error(f"Erreur lors du chiffrement : {e}")
-            return data  # Retourner les données non chiffrées en cas d'erreur
+            raise
     
-    def decrypt(self, encrypted_data: str) -> str:
+    def decrypt(self, encrypted_data: bytes) -> Optional[str]:
         """
-        Déchiffrer une chaîne de caractères
+        Déchiffrer un champ
+        
+        Les champs AEAD et les anciens jetons Fernet sont reconnus à leur
+        premier octet.
         
         Args:
-            encrypted_data: Données chiffrées en base64
+            encrypted_data: Champ chiffré brut (BLOB)
             
         Returns:
-            Données déchiffrées
+            Données déchiffrées (None si le champ est NULL)
         """
-        try:
-            if not encrypted_data:
-                return encrypted_data
+        if encrypted_data is None:
+            return None
+        if not encrypted_data:
+            return ""
+        self._ensure_keys()  # VaultLockedError si le coffre est verrouillé
+        return _decrypt_value(self._field_keys, self._fernet, encrypted_data)
+    
+    def encrypt_many(self, values: Sequence[str], chunk_size: Optional[int] = None,
+                     workers: Optional[int] = None, executor: Optional[str] = None) -> List[bytes]:
+        """
+        Chiffrer une séquence de champs par lots, en parallèle si possible
+        
+        Args:
+            values: Champs en clair
+            chunk_size: Champs par lot (défaut : ENCRYPTION['chunk_size'])
+            workers: Nombre de workers (défaut : ENCRYPTION['workers'])
+            executor: 'auto', 'thread' ou 'none'
+            
+        Returns:
+            Champs chiffrés, dans l'ordre
+        """
+        self._ensure_keys()  # VaultLockedError si le coffre est verrouillé
+        return map_chunks(_encrypt_chunk, list(values), (self._cipher.version, self._field_key),
+                          chunk_size, workers, executor)
+    
+    def decrypt_many(self, tokens: Sequence[Optional[bytes]], chunk_size: Optional[int] = None,
+                     workers: Optional[int] = None, executor: Optional[str] = None) -> List[Optional[str]]:
+        """
+        Déchiffrer une séquence de champs par lots, en parallèle si possible
+        
+        Args:
+            tokens: Champs chiffrés (None pour un champ NULL)
+            chunk_size: Champs par lot (défaut : ENCRYPTION['chunk_size'])
+            workers: Nombre de workers (défaut : ENCRYPTION['workers'])
+            executor: 'auto', 'thread' ou 'none'
             
-            decoded_data = base64.urlsafe_b64decode(encrypted_data.encode())
-            decrypted_data = self._fernet.decrypt(decoded_data)
-            return decrypted_data.decode()
+        Returns:
+            Champs en clair, dans l'ordre
+        """
+        tokens = [bytes(token) if token is not None else None for token in tokens]
+        if not any(tokens):
+            return [None if token is None else "" for token in tokens]
+        self._ensure_keys()  # VaultLockedError si le coffre est verrouillé
+        return map_chunks(_decrypt_chunk, tokens, (self._field_keys, self._fernet),
+                          chunk_size, workers, executor)
+    
+    def seal_record(self, fields: Dict[str, str]) -> bytes:
+        """
+        Chiffrer tous les champs d'un compte en une seule opération AEAD
+        
+        Les champs sont sérialisés en JSON compact : ajouter un champ ne
+        demande ni colonne ni chiffrement supplémentaire.
+        
+        Args:
+            fields: Champs du compte (nom -> valeur)
+            
+        Returns:
+            Bloc chiffré brut, à stocker en BLOB
+        """
+        self._ensure_keys()  # VaultLockedError si le coffre est verrouillé
+        payload = json.dumps(fields, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        return self._cipher.encrypt(self._field_key, payload, RECORD_ASSOCIATED_DATA)
+    
+    def open_record(self, record: bytes) -> Dict[str, str]:
+        """
+        Déchiffrer un bloc produit par seal_record
+        
+        Args:
+            record: Bloc chiffré brut
+            
+        Returns:
+            Champs du compte (vide si le bloc est illisible)
+        """
+        self._ensure_keys()  # VaultLockedError si le coffre est verrouillé
+        token = bytes(record)
+        try:
+            payload = _open_aead(self._field_keys, token, RECORD_ASSOCIATED_DATA)
+            return json.loads(payload.decode('utf-8'))
         except Exception as e:
-            logging.error(f"Erreur lors du déchiffrement : {e}")
-            return encrypted_data  # Retourner les données telles quelles en cas d'erreur
+            logging.error(f"Erreur lors du déchiffrement du compte : {e}")
+            return {}
     
-    def hash_password(self, password: str) -> str:
+    def hash_password(self, password: str, kdf: Optional[KDF] = None) -> str:
         """
         Hacher un mot de passe avec salt
         
         Args:
             password: Mot de passe à hacher
+            kdf: Fonction de dérivation (défaut : calibrée pour cette machine)
             
         Returns:
-            Hash du mot de passe avec salt
+            Hash auto-descriptif (algorithme, paramètres, salt, hash)
         """
         try:
-            # Générer un salt aléatoire
-            salt = secrets.token_hex(16)
-            
-            # Créer le hash avec le salt
-            pwd_hash = hashlib.pbkdf2_hmac('sha256', 
-                                         password.encode('utf-8'), 
-                                         salt.encode('utf-8'), 
-                                         100000)
-            
-            # Retourner le salt + hash encodé en base64
-            return salt + base64.b64encode(pwd_hash).decode('utf-8')
+            kdf = kdf or calibrate()
+            salt = secrets.token_bytes(VAULT_SALT_SIZE)
+            return kdf_format.encode(kdf, salt, kdf.derive(password, salt))
         except Exception as e:
             logging.error(f"Erreur lors du hachage du mot de passe : {e}")
             raise
     
+    @staticmethod
+    def hash_kdf(hashed_password: str) -> KDF:
+        """
+        Retrouver la fonction de dérivation utilisée pour un hash
+        
+        Args:
+            hashed_password: Hash stocké
+            
+        Returns:
+            KDF du hash (paramètres historiques pour l'ancien format)
+        """
+        if kdf_format.is_encoded(hashed_password):
+            return kdf_format.decode(hashed_password)[0]
+        return LEGACY_KDF
+    
+    def needs_rehash(self, hashed_password: str, target: KDF) -> bool:
+        """
+        Indiquer si un hash doit être recalculé avec les paramètres cibles
+        
+        Args:
+            hashed_password: Hash stocké
+            target: Paramètres visés
+            
+        Returns:
+            True pour l'ancien format ou des paramètres plus faibles que la cible
+        """
+        if not kdf_format.is_encoded(hashed_password):
+            return True
+        try:
+            return self.hash_kdf(hashed_password).is_weaker_than(target)
+        except ValueError:
+            return True
+    
     def verify_password(self, password: str, hashed_password: str) -> bool:
         """
         Vérifier un mot de passe contre son hash
@@ -113,7 +463,11 @@ class EncryptionManager:
             True si le mot de passe correspond
         """
         try:
-            # Extraire le salt (32 premiers caractères)
+            if kdf_format.is_encoded(hashed_password):
+                kdf, salt, stored_hash = kdf_format.decode(hashed_password)
+                return hmac.compare_digest(kdf.derive(password, salt, len(stored_hash)), stored_hash)
+            
+            # Ancien format : 32 caractères de salt hexadécimal puis le hash en base64
             salt = hashed_password[:32]
             stored_hash = hashed_password[32:]
             
@@ -121,11 +475,12 @@ class EncryptionManager:
             pwd_hash = hashlib.pbkdf2_hmac('sha256',
                                          password.encode('utf-8'),
                                          salt.encode('utf-8'),
-                                         100000)
+                                         LEGACY_KDF.iterations)
             
             calculated_hash = base64.b64encode(pwd_hash).decode('utf-8')
             
-            return calculated_hash == stored_hash
+            # Comparaison en temps constant
+            return hmac.compare_digest(calculated_hash.encode('utf-8'), stored_hash.encode('utf-8'))
         except Exception as e:
             logging.error(f"Erreur lors de la vérification du mot de passe : {e}")
             return False
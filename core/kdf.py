@@ -0,0 +1,217 @@
+"""
+Fonctions de dérivation de clé (KDF) interchangeables
+
+Les paramètres sont enregistrés avec le résultat dans une chaîne
+auto-descriptive de style PHC :
+
+    $pbkdf2-sha256$i=600000$<salt base64>$<hash base64>
+    $scrypt$ln=15,r=8,p=1$<salt base64>$<hash base64>
+
+Le hash est omis quand seule la configuration est stockée (paramètres de la
+clé du coffre). Le coût peut ainsi évoluer sans casser les coffres existants :
+une valeur dont les paramètres sont plus faibles que la cible courante est
+recalculée au déverrouillage suivant.
+"""
+
+import base64
+import hashlib
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple
+
+from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+
+from config.settings import KDF as KDF_CONFIG
+
+class KDF(ABC):
+    """Fonction de dérivation de clé et ses paramètres de coût"""
+
+    name = None
+
+    @abstractmethod
+    def derive(self, password: str, salt: bytes, length: int = 32) -> bytes:
+        """
+        Dériver une clé à partir d'un mot de passe
+
+        Args:
+            password: Mot de passe
+            salt: Salt aléatoire
+            length: Taille de la clé en octets
+
+        Returns:
+            Clé dérivée
+        """
+
+    @abstractmethod
+    def params(self) -> Dict[str, int]:
+        """Paramètres de coût, dans l'ordre de la chaîne encodée"""
+
+    @abstractmethod
+    def is_weaker_than(self, other: "KDF") -> bool:
+        """True si ces paramètres doivent être remplacés par ceux de other"""
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, KDF) and self.name == other.name and self.params() == other.params()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.params()})"
+
+class PBKDF2(KDF):
+    """PBKDF2-HMAC-SHA256"""
+
+    name = "pbkdf2-sha256"
+
+    def __init__(self, iterations: int):
+        self.iterations = int(iterations)
+
+    @classmethod
+    def from_params(cls, params: Dict[str, int]) -> "PBKDF2":
+        """Construire depuis les paramètres décodés"""
+        return cls(params['i'])
+
+    def derive(self, password: str, salt: bytes, length: int = 32) -> bytes:
+        return hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt,
+                                   self.iterations, dklen=length)
+
+    def params(self) -> Dict[str, int]:
+        return {'i': self.iterations}
+
+    def is_weaker_than(self, other: KDF) -> bool:
+        if not isinstance(other, PBKDF2):
+            return True
+        # Marge de 20 % pour absorber le bruit de la calibration
+        return self.iterations < other.iterations * 0.8
+
+class ScryptKDF(KDF):
+    """scrypt (résistant aux attaques matérielles grâce au coût mémoire)"""
+
+    name = "scrypt"
+
+    def __init__(self, log_n: int, r: int = 8, p: int = 1):
+        self.log_n = int(log_n)
+        self.r = int(r)
+        self.p = int(p)
+
+    @classmethod
+    def from_params(cls, params: Dict[str, int]) -> "ScryptKDF":
+        """Construire depuis les paramètres décodés"""
+        return cls(params['ln'], params.get('r', 8), params.get('p', 1))
+
+    def derive(self, password: str, salt: bytes, length: int = 32) -> bytes:
+        kdf = Scrypt(salt=salt, length=length, n=2 ** self.log_n, r=self.r, p=self.p)
+        return kdf.derive(password.encode('utf-8'))
+
+    def params(self) -> Dict[str, int]:
+        return {'ln': self.log_n, 'r': self.r, 'p': self.p}
+
+    def is_weaker_than(self, other: KDF) -> bool:
+        if not isinstance(other, ScryptKDF):
+            return True
+        return (self.log_n, self.r * self.p) < (other.log_n, other.r * other.p)
+
+# Algorithmes reconnus dans les chaînes encodées
+KDF_ALGORITHMS = {
+    PBKDF2.name: PBKDF2,
+    ScryptKDF.name: ScryptKDF
+}
+
+# Paramètres historiques (hash et clé du coffre antérieurs à ce module)
+LEGACY_KDF = PBKDF2(100000)
+
+def _b64encode(data: bytes) -> str:
+    """Base64 sans remplissage (format PHC)"""
+    return base64.b64encode(data).decode('ascii').rstrip('=')
+
+def _b64decode(data: str) -> bytes:
+    """Inverse de _b64encode"""
+    return base64.b64decode(data + '=' * (-len(data) % 4))
+
+def encode(kdf: KDF, salt: Optional[bytes] = None, digest: Optional[bytes] = None) -> str:
+    """
+    Encoder un algorithme, ses paramètres et éventuellement salt et hash
+
+    Args:
+        kdf: Fonction de dérivation
+        salt: Salt utilisé
+        digest: Résultat de la dérivation
+
+    Returns:
+        Chaîne de style PHC
+    """
+    parts = ['', kdf.name, ','.join(f"{key}={value}" for key, value in kdf.params().items())]
+    if salt is not None:
+        parts.append(_b64encode(salt))
+        if digest is not None:
+            parts.append(_b64encode(digest))
+    return '$'.join(parts)
+
+def decode(encoded: str) -> Tuple[KDF, Optional[bytes], Optional[bytes]]:
+    """
+    Décoder une chaîne produite par encode
+
+    Args:
+        encoded: Chaîne de style PHC
+
+    Returns:
+        (kdf, salt, hash) ; salt et hash valent None s'ils sont absents
+
+    Raises:
+        ValueError: Si la chaîne n'est pas reconnue
+    """
+    parts = encoded.split('$')
+    if len(parts) < 3 or parts[0] != '' or parts[1] not in KDF_ALGORITHMS:
+        raise ValueError(f"Format de dérivation inconnu : {encoded[:20]}")
+    try:
+        params = {key: int(value) for key, value in
+                  (item.split('=', 1) for item in parts[2].split(',') if item)}
+        kdf = KDF_ALGORITHMS[parts[1]].from_params(params)
+        salt = _b64decode(parts[3]) if len(parts) > 3 else None
+        digest = _b64decode(parts[4]) if len(parts) > 4 else None
+    except (KeyError, ValueError) as e:
+        raise ValueError(f"Paramètres de dérivation invalides : {e}")
+    return kdf, salt, digest
+
+def is_encoded(value: str) -> bool:
+    """True si la valeur est une chaîne de style PHC (et non un ancien format)"""
+    return value.startswith('$')
+
+def _measure(kdf: KDF) -> float:
+    """Durée d'une dérivation en secondes"""
+    start = time.perf_counter()
+    kdf.derive("calibration", b"\x00" * 16)
+    return time.perf_counter() - start
+
+def calibrate(algorithm: Optional[str] = None, target_ms: Optional[float] = None) -> KDF:
+    """
+    Choisir le coût qui approche la latence visée sur cette machine
+
+    Une dérivation peu coûteuse est mesurée puis extrapolée (le temps est
+    proportionnel aux itérations pour PBKDF2, à N pour scrypt).
+
+    Args:
+        algorithm: Nom de l'algorithme (défaut : configuration)
+        target_ms: Durée visée pour une dérivation en millisecondes
+
+    Returns:
+        KDF paramétrée pour la machine courante
+    """
+    algorithm = algorithm or KDF_CONFIG['algorithm']
+    target = (target_ms or KDF_CONFIG['target_ms']) / 1000
+
+    if algorithm == PBKDF2.name:
+        probe = PBKDF2(20000)
+        per_iteration = _measure(probe) / probe.iterations
+        iterations = int(target / per_iteration) // 10000 * 10000
+        return PBKDF2(max(KDF_CONFIG['pbkdf2_min_iterations'], iterations))
+
+    if algorithm == ScryptKDF.name:
+        r, p = KDF_CONFIG['scrypt_r'], KDF_CONFIG['scrypt_p']
+        log_n = KDF_CONFIG['scrypt_min_log_n']
+        elapsed = _measure(ScryptKDF(log_n, r, p))
+        # Doubler N tant que la durée estimée reste sous la cible
+        while log_n < KDF_CONFIG['scrypt_max_log_n'] and elapsed * 2 <= target:
+            log_n += 1
+            elapsed *= 2
+        return ScryptKDF(log_n, r, p)
+
+    raise ValueError(f"Algorithme de dérivation inconnu : {algorithm}")
@@ -0,0 +1,239 @@
+"""
+Migrations du schéma de la base de données
+
+Le schéma est versionné par PRAGMA user_version. Chaque migration porte un
+numéro de version strictement croissant et s'exécute dans sa propre
+transaction ; user_version est mis à jour dans cette même transaction, si
+bien qu'une migration interrompue est simplement rejouée au démarrage suivant.
+
+Les migrations qui réécrivent des lignes le font par lots (une transaction
+par lot) : la fonction de lot ne doit sélectionner que les lignes pas encore
+converties, ce qui rend la reprise après un arrêt naturelle. Pour la même
+raison, la partie DDL d'une migration doit être idempotente (IF NOT EXISTS,
+add_column_if_missing...).
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, List, Optional
+import logging
+
+from config.settings import DATABASE
+from core.ciphers import legacy_text_to_blob
+
+class Migration:
+    """Étape de migration du schéma"""
+
+    def __init__(self, version: int, description: str,
+                 upgrade: Optional[Callable[[sqlite3.Cursor], None]] = None,
+                 rewrite_batch: Optional[Callable[[sqlite3.Cursor, int], int]] = None):
+        """
+        Args:
+            version: Version du schéma atteinte après cette étape
+            description: Description courte de l'étape
+            upgrade: Modifications du schéma (idempotentes), None pour une
+                     étape qui ne fait que réécrire des lignes
+            rewrite_batch: Réécriture d'un lot de lignes, retourne le nombre
+                           de lignes traitées (0 quand il n'en reste plus)
+        """
+        self.version = version
+        self.description = description
+        self.upgrade = upgrade
+        self.rewrite_batch = rewrite_batch
+
+def add_column_if_missing(cursor: sqlite3.Cursor, table: str, column: str, declaration: str):
+    """
+    Ajouter une colonne si elle n'existe pas encore
+
+    Args:
+        cursor: Curseur de la transaction en cours
+        table: Nom de la table
+        column: Nom de la colonne
+        declaration: Type et contraintes de la colonne
+    """
+    cursor.execute(f"PRAGMA table_info({table})")
+    if column not in {row[1] for row in cursor.fetchall()}:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+
+def _create_initial_schema(cursor: sqlite3.Cursor):
+    """Version 1 : tables des comptes et du mot de passe maître"""
+    # Table des comptes : champs chiffrés bruts. Les bases créées avant la
+    # version 3 gardent leurs colonnes TEXT, dont les valeurs sont converties
+    # par _convert_fields_to_blob
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Accounts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            site BLOB NOT NULL,
+            login BLOB NOT NULL,
+            password BLOB NOT NULL
+        )
+    """)
+
+    # Table pour le mot de passe maître
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS MasterPassword (
+            id INTEGER PRIMARY KEY,
+            password_hash TEXT NOT NULL
+        )
+    """)
+
+def _add_blind_indexes(cursor: sqlite3.Cursor):
+    """Version 2 : colonnes d'index aveugles et métadonnées du coffre"""
+    add_column_if_missing(cursor, "Accounts", "site_index", "TEXT")
+    add_column_if_missing(cursor, "Accounts", "login_index", "TEXT")
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_accounts_site_login
+        ON Accounts (site_index, login_index)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_accounts_login
+        ON Accounts (login_index)
+    """)
+
+    # Paramètres du coffre (clé/valeur)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS VaultMetadata (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        )
+    """)
+
+def _convert_fields_to_blob(cursor: sqlite3.Cursor, batch_size: int) -> int:
+    """
+    Version 3 : remplacer le base64 (double pour Fernet) par le chiffré brut
+
+    Aucune clé n'est nécessaire. Seules les lignes encore au format TEXT sont
+    sélectionnées, ce qui rend la conversion reprenable.
+    """
+    cursor.execute("""
+        SELECT id, site, login, password FROM Accounts
+        WHERE typeof(site) = 'text' OR typeof(login) = 'text' OR typeof(password) = 'text'
+        LIMIT ?
+    """, (batch_size,))
+    rows = cursor.fetchall()
+
+    def convert(value):
+        return legacy_text_to_blob(value) if isinstance(value, str) else value
+
+    cursor.executemany("""
+        UPDATE Accounts SET site = ?, login = ?, password = ? WHERE id = ?
+    """, [(convert(site), convert(login), convert(password), account_id)
+          for account_id, site, login, password in rows])
+    return len(rows)
+
+def _add_sealed_record(cursor: sqlite3.Cursor):
+    """Version 4 : colonne du compte scellé en un seul bloc chiffré"""
+    add_column_if_missing(cursor, "Accounts", "record", "BLOB")
+
+# Liste ordonnée des migrations : ne jamais modifier une étape publiée,
+# toujours en ajouter une nouvelle
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Schéma initial", _create_initial_schema),
+    Migration(2, "Index aveugles site/login", _add_blind_indexes),
+    # Aucun DDL : une colonne TEXT conserve telles quelles les valeurs BLOB
+    Migration(3, "Champs chiffrés stockés en BLOB", rewrite_batch=_convert_fields_to_blob),
+    Migration(4, "Comptes scellés (un bloc chiffré par ligne)", _add_sealed_record),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+# Bases déjà vérifiées dans ce processus (évite de rejouer le DDL)
+_checked_databases = set()
+_checked_lock = threading.Lock()
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """
+    Lire la version du schéma
+
+    Args:
+        conn: Connexion à la base de données
+
+    Returns:
+        Valeur de PRAGMA user_version
+    """
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def _run_in_transaction(conn: sqlite3.Connection, step: Callable[[sqlite3.Cursor], object]):
+    """Exécuter une étape dans une transaction explicite"""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        result = step(conn.cursor())
+        conn.execute("COMMIT")
+        return result
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+
+def run_migrations(conn: sqlite3.Connection, migrations: List[Migration] = MIGRATIONS,
+                   batch_size: Optional[int] = None) -> int:
+    """
+    Appliquer les migrations en attente
+
+    Args:
+        conn: Connexion en mode autocommit (isolation_level=None)
+        migrations: Migrations ordonnées par version
+        batch_size: Nombre de lignes réécrites par transaction
+
+    Returns:
+        Version du schéma après migration
+    """
+    batch_size = batch_size or DATABASE['batch_size']
+    current_version = get_schema_version(conn)
+
+    for migration in migrations:
+        if migration.version <= current_version:
+            continue
+
+        logging.info(f"Migration du schéma vers la version {migration.version} : {migration.description}")
+        try:
+            if migration.rewrite_batch is None:
+                def step(cursor, migration=migration):
+                    if migration.upgrade is not None:
+                        migration.upgrade(cursor)
+                    cursor.execute(f"PRAGMA user_version = {int(migration.version)}")
+                _run_in_transaction(conn, step)
+            else:
+                if migration.upgrade is not None:
+                    _run_in_transaction(conn, migration.upgrade)
+
+                # Une transaction par lot, jusqu'à épuisement des lignes à convertir
+                while _run_in_transaction(
+                    conn, lambda cursor, migration=migration: migration.rewrite_batch(cursor, batch_size)
+                ):
+                    pass
+
+                _run_in_transaction(
+                    conn, lambda cursor, migration=migration:
+                        cursor.execute(f"PRAGMA user_version = {int(migration.version)}")
+                )
+        except sqlite3.Error as e:
+            logging.error(f"Erreur lors de la migration vers la version {migration.version} : {e}")
+            raise
+
+        current_version = migration.version
+
+    return current_version
+
+def ensure_schema(conn: sqlite3.Connection, db_path: Path) -> int:
+    """
+    Mettre le schéma à jour une seule fois par base et par processus
+
+    Args:
+        conn: Connexion en mode autocommit (isolation_level=None)
+        db_path: Chemin de la base (clé du cache)
+
+    Returns:
+        Version du schéma
+    """
+    key = str(Path(db_path).resolve()) if str(db_path) != ":memory:" else None
+
+    with _checked_lock:
+        if key is not None and key in _checked_databases:
+            return SCHEMA_VERSION
+
+        version = run_migrations(conn)
+        if key is not None:
+            _checked_databases.add(key)
+        return version
@@ -0,0 +1,135 @@
+"""
+Exécution parallèle des traitements par lots (chiffrement, déchiffrement)
+
+Par défaut ('auto'), le traitement reste dans le thread appelant. Les lots
+ne sont répartis sur un pool de threads partagé que pour un volume d'au moins
+ENCRYPTION['parallel_min_items'] éléments, sur une machine à plusieurs cœurs
+et si le backend de chiffrement libère le GIL (mesuré une fois par
+processus). Aucun pool de processus n'est utilisé : les clés ne quittent
+jamais le processus.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, List, Optional, Sequence
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from config.settings import ENCRYPTION
+
+EXECUTOR_KINDS = ('auto', 'thread', 'none')
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+def _probe_work(buffer: bytes):
+    """Chiffrer un tampon (charge de la mesure du GIL)"""
+    AESGCM(b"\x00" * 32).encrypt(b"\x00" * 12, buffer, None)
+
+@lru_cache(maxsize=1)
+def backend_releases_gil() -> bool:
+    """
+    Mesurer si le backend de chiffrement s'exécute en parallèle sur des threads
+
+    Returns:
+        True si deux threads vont nettement plus vite qu'un seul
+    """
+    if (os.cpu_count() or 1) < 2:
+        return False
+    buffers = [os.urandom(1 << 20)] * 8
+
+    start = time.perf_counter()
+    for buffer in buffers:
+        _probe_work(buffer)
+    serial = time.perf_counter() - start
+
+    with ThreadPoolExecutor(2) as executor:
+        start = time.perf_counter()
+        list(executor.map(_probe_work, buffers))
+        threaded = time.perf_counter() - start
+
+    return threaded < serial * 0.75
+
+def resolve_executor_kind(kind: Optional[str] = None, item_count: Optional[int] = None) -> str:
+    """
+    Choisir le type d'exécuteur effectif
+
+    Args:
+        kind: 'auto', 'thread' ou 'none' (défaut : configuration)
+        item_count: Nombre d'éléments à traiter (seuil du mode 'auto')
+
+    Returns:
+        'thread' ou 'none'
+    """
+    kind = kind or ENCRYPTION['executor']
+    if kind not in EXECUTOR_KINDS:
+        raise ValueError(f"Type d'exécuteur inconnu : {kind}")
+    if kind != 'auto':
+        return kind
+    if item_count is not None and item_count < ENCRYPTION['parallel_min_items']:
+        return 'none'
+    if (os.cpu_count() or 1) < 2:
+        return 'none'
+    return 'thread' if backend_releases_gil() else 'none'
+
+def default_workers() -> int:
+    """Nombre de workers configuré (défaut : nombre de cœurs)"""
+    return ENCRYPTION['workers'] or os.cpu_count() or 1
+
+def get_executor(workers: int) -> Executor:
+    """
+    Récupérer (ou créer) le pool de threads partagé d'une taille donnée
+
+    Args:
+        workers: Nombre de threads
+
+    Returns:
+        Exécuteur réutilisé entre les appels
+    """
+    with _executors_lock:
+        executor = _executors.get(workers)
+        if executor is None:
+            executor = ThreadPoolExecutor(workers, thread_name_prefix="crypto")
+            _executors[workers] = executor
+        return executor
+
+def shutdown_executors():
+    """Arrêter les pools partagés (verrouillage du coffre, fermeture de l'application)"""
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def map_chunks(func: Callable, items: Sequence, args: tuple = (),
+               chunk_size: Optional[int] = None, workers: Optional[int] = None,
+               kind: Optional[str] = None) -> List:
+    """
+    Appliquer func(*args, lot) à chaque lot et concaténer les résultats dans l'ordre
+
+    Args:
+        func: Fonction appliquée à chaque lot
+        items: Éléments à traiter
+        args: Arguments placés avant le lot
+        chunk_size: Éléments par lot
+        workers: Nombre de workers
+        kind: Type d'exécuteur ('auto', 'thread', 'none')
+
+    Returns:
+        Résultats de tous les lots, dans l'ordre des éléments
+    """
+    chunk_size = chunk_size or ENCRYPTION['chunk_size']
+    workers = workers or default_workers()
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+    kind = resolve_executor_kind(kind, len(items)) if len(chunks) > 1 and workers > 1 else 'none'
+    if kind == 'none':
+        results = [func(*args, chunk) for chunk in chunks]
+    else:
+        executor = get_executor(workers)
+        results = executor.map(func, *zip(*[args + (chunk,) for chunk in chunks]))
+
+    return [result for chunk_result in results for result in chunk_result]
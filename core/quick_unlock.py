@@ -0,0 +1,192 @@
+"""
+Déverrouillage rapide par code PIN
+
+Après un déverrouillage complet, la clé de données peut être enveloppée sous
+une clé dérivée d'un code PIN, avec une dérivation volontairement peu
+coûteuse (QUICK_UNLOCK['target_ms']). Le résultat est écrit dans un fichier
+local avec une date d'expiration et un compteur d'échecs. Le fichier est
+supprimé à l'expiration ou après QUICK_UNLOCK['max_attempts'] codes erronés.
+
+Un PIN a peu d'entropie : la protection repose sur la courte durée de
+validité et sur le fichier lui-même (droits restreints, jamais versionné).
+Le compteur limite les essais dans l'application, pas une attaque hors ligne
+sur une copie du fichier ; c'est pourquoi ce mode est désactivé par défaut.
+"""
+
+import base64
+import binascii
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import logging
+
+from cryptography.exceptions import InvalidTag
+
+from config.settings import QUICK_UNLOCK
+from core import kdf as kdf_format
+from core.encryption import EncryptionManager
+from core.kdf import calibrate
+
+FORMAT_VERSION = 1
+
+# Champs du fichier et leurs types (previous_wrapped_key est None hors rotation)
+_STATE_FIELDS = {
+    'kdf': str,
+    'wrapped_key': str,
+    'previous_wrapped_key': (str, type(None)),
+    'expires_at': (int, float),
+    'attempts': int
+}
+
+class QuickUnlockStore:
+    """Fichier de déverrouillage rapide d'un coffre"""
+
+    def __init__(self, path: Optional[Path] = None, vault_id: str = ""):
+        """
+        Args:
+            path: Fichier de déverrouillage rapide
+            vault_id: Identifiant du coffre (un fichier ne sert qu'à ce coffre)
+        """
+        self.path = Path(path or QUICK_UNLOCK['path'])
+        self.vault_id = vault_id
+
+    def _read(self) -> Optional[Dict]:
+        """Lire le fichier (None s'il est absent, illisible ou mal formé)"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if not isinstance(state, dict):
+                raise ValueError("contenu inattendu")
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logging.error(f"Erreur lors de la lecture du déverrouillage rapide : {e}")
+            self.clear()
+            return None
+        if state.get('version') != FORMAT_VERSION or state.get('vault') != self.vault_id:
+            return None
+        for field, expected_type in _STATE_FIELDS.items():
+            value = state.get(field)
+            if not isinstance(value, expected_type) or isinstance(value, bool):
+                logging.error(f"Erreur lors de la lecture du déverrouillage rapide : champ {field} invalide")
+                self.clear()
+                return None
+        return state
+
+    def _write(self, state: Dict):
+        """Écrire le fichier de façon atomique, lisible par le seul utilisateur"""
+        temp_path = self.path.with_suffix('.tmp')
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(temp_path, self.path)
+
+    def _valid_state(self) -> Optional[Dict]:
+        """État du fichier s'il est encore utilisable (un fichier expiré est supprimé)"""
+        state = self._read()
+        if state is None:
+            return None
+        if time.time() >= state['expires_at'] or state['attempts'] >= QUICK_UNLOCK['max_attempts']:
+            self.clear()
+            return None
+        return state
+
+    def is_available(self) -> bool:
+        """
+        Vérifier si un déverrouillage rapide est possible
+
+        Returns:
+            True si le fichier existe, n'a pas expiré et accepte encore des essais
+        """
+        return self._valid_state() is not None
+
+    def enable(self, pin: str, data_key: bytes, previous_key: Optional[bytes] = None):
+        """
+        Envelopper la clé de données sous le code PIN
+
+        Args:
+            pin: Code PIN
+            data_key: Clé de données de la session
+            previous_key: Ancienne clé d'une rotation en cours
+
+        Raises:
+            OSError: Si le fichier ne peut pas être écrit
+        """
+        pin_kdf = calibrate(QUICK_UNLOCK['algorithm'], QUICK_UNLOCK['target_ms'])
+        salt = EncryptionManager.generate_salt()
+        kek = EncryptionManager.derive_key(pin, salt, pin_kdf)
+        state = {
+            'version': FORMAT_VERSION,
+            'vault': self.vault_id,
+            'kdf': kdf_format.encode(pin_kdf, salt),
+            'wrapped_key': base64.b64encode(EncryptionManager.wrap_key(kek, data_key)).decode('ascii'),
+            'previous_wrapped_key': base64.b64encode(
+                EncryptionManager.wrap_key(kek, previous_key)
+            ).decode('ascii') if previous_key is not None else None,
+            'expires_at': time.time() + QUICK_UNLOCK['validity_minutes'] * 60,
+            'attempts': 0
+        }
+        self._write(state)
+
+    def unlock(self, pin: str) -> Optional[Tuple[bytes, Optional[bytes]]]:
+        """
+        Retrouver la clé de données avec le code PIN
+
+        Un échec incrémente le compteur ; le fichier est supprimé au dernier
+        essai autorisé.
+
+        Args:
+            pin: Code PIN
+
+        Returns:
+            Tuple (clé de données, ancienne clé ou None), ou None si le code est
+            incorrect ou le déverrouillage rapide indisponible
+        """
+        state = self._valid_state()
+        if state is None:
+            return None
+        try:
+            pin_kdf, salt, _ = kdf_format.decode(state['kdf'])
+            kek = EncryptionManager.derive_key(pin, salt, pin_kdf)
+            data_key = EncryptionManager.unwrap_key(kek, base64.b64decode(state['wrapped_key']))
+            previous_key = None
+            if state.get('previous_wrapped_key'):
+                previous_key = EncryptionManager.unwrap_key(
+                    kek, base64.b64decode(state['previous_wrapped_key'])
+                )
+            return data_key, previous_key
+        except InvalidTag:
+            self._record_failure(state)
+        except (KeyError, ValueError, binascii.Error) as e:
+            logging.error(f"Erreur lors du déverrouillage rapide : {e}")
+            self.clear()
+        return None
+
+    def remaining_attempts(self) -> int:
+        """Nombre de codes PIN encore acceptés (0 si indisponible)"""
+        state = self._valid_state()
+        return QUICK_UNLOCK['max_attempts'] - state['attempts'] if state else 0
+
+    def _record_failure(self, state: Dict):
+        """Compter un code erroné (suppression du fichier au dernier essai)"""
+        state['attempts'] += 1
+        if state['attempts'] >= QUICK_UNLOCK['max_attempts']:
+            self.clear()
+            return
+        try:
+            self._write(state)
+        except OSError as e:
+            # Sans compteur fiable, le fichier ne doit pas rester utilisable
+            logging.error(f"Erreur lors de l'enregistrement de l'essai : {e}")
+            self.clear()
+
+    def clear(self):
+        """Supprimer le fichier (désactivation, expiration, trop d'échecs)"""
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logging.error(f"Erreur lors de la suppression du déverrouillage rapide : {e}")
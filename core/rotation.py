@@ -0,0 +1,104 @@
+"""
+Rotation de la clé de données du coffre
+
+Les comptes sont rechiffrés lot par lot (une transaction par lot, avec son
+point de reprise) : la rotation peut être interrompue à tout moment, le
+coffre reste lisible et la rotation reprend au déverrouillage suivant.
+Chaque appel à step() ne traite qu'un lot, ce qui permet à l'interface de
+l'appeler depuis after() sans se figer.
+"""
+
+import time
+from typing import Callable, Dict, Optional
+
+from config.settings import DATABASE
+from core.database import DatabaseManager
+
+class KeyRotationJob:
+    """Rotation de clé pilotée lot par lot, avec mesure de l'avancement"""
+
+    def __init__(self, database: DatabaseManager, batch_size: Optional[int] = None,
+                 on_progress: Optional[Callable[[Dict], None]] = None):
+        """
+        Args:
+            database: Base du coffre (déverrouillé)
+            batch_size: Nombre de comptes par transaction
+            on_progress: Fonction appelée après chaque lot avec l'avancement
+        """
+        self.database = database
+        self.batch_size = batch_size or DATABASE['batch_size']
+        self.on_progress = on_progress
+        self._rotated = 0
+        self._elapsed = 0.0
+        self._counts = None
+
+    @property
+    def pending(self) -> bool:
+        """True tant que des comptes restent à rechiffrer"""
+        return self.database.rotation_pending()
+
+    def start(self, password: str) -> bool:
+        """
+        Démarrer une rotation (ou reprendre celle qui est en cours)
+
+        Args:
+            password: Mot de passe maître
+
+        Returns:
+            True si la rotation peut avancer, False si le mot de passe est incorrect
+        """
+        return self.database.begin_key_rotation(password)
+
+    def progress(self) -> Dict:
+        """
+        Avancement de la rotation
+
+        Returns:
+            Dictionnaire avec done, total, percent, rows_per_second (comptes
+            rechiffrés par ce job) et finished
+        """
+        finished = not self.pending
+        if self._counts is None:
+            # Compté une seule fois, puis suivi lot par lot
+            self._counts = self.database.rotation_progress()
+        done, total = self._counts
+        done = total if finished else min(done, total)
+        return {
+            'done': done,
+            'total': total,
+            'percent': 100.0 if not total else done * 100.0 / total,
+            'rows_per_second': self._rotated / self._elapsed if self._elapsed else 0.0,
+            'finished': finished
+        }
+
+    def step(self) -> bool:
+        """
+        Rechiffrer un lot de comptes
+
+        Returns:
+            True s'il reste des comptes à traiter
+        """
+        if self._counts is None:
+            self._counts = self.database.rotation_progress()
+        start = time.perf_counter()
+        rotated = self.database.rotate_batch(self.batch_size)
+        self._elapsed += time.perf_counter() - start
+        self._rotated += rotated
+        done, total = self._counts
+        self._counts = (done + rotated, total)
+
+        progress = self.progress()
+        if self.on_progress:
+            self.on_progress(progress)
+        return not progress['finished']
+
+    def run(self) -> Dict:
+        """
+        Rechiffrer tous les comptes restants
+
+        Returns:
+            Avancement final
+        """
+        while self.step():
+            pass
+        return self.progress()
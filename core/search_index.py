@@ -0,0 +1,609 @@
+"""
+Index de recherche en mémoire sur les métadonnées déchiffrées (site, login)
+
+- FullTextIndex : FTS5, recherche par préfixe/phrase classée par pertinence
+- TrigramIndex : recherche « contient » exacte en temps sous-linéaire
+- FuzzyIndex : recherche tolérante aux fautes de frappe (distance d'édition)
+
+Les index sont construits une fois après le déverrouillage puis tenus à jour
+à chaque création, modification ou suppression. Ils ne sont jamais écrits sur
+disque : la base FTS5 est une base SQLite ":memory:".
+"""
+
+import re
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+# Champs indexés et modes de recherche acceptés
+SEARCH_FIELDS = ('site', 'login')
+SEARCH_TYPES = ('all',) + SEARCH_FIELDS
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+class FullTextIndex:
+    """Index plein texte FTS5 en mémoire (recherche par préfixe/phrase, classée)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows: Dict[int, Tuple[str, str]] = {}
+        self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self.fts_available = self._create_table()
+
+    def _create_table(self) -> bool:
+        """Créer la table FTS5 (False si SQLite est compilé sans FTS5)"""
+        try:
+            self._conn.execute("""
+                CREATE VIRTUAL TABLE account_search USING fts5(
+                    site, login,
+                    tokenize = 'unicode61 remove_diacritics 2'
+                )
+            """)
+            return True
+        except sqlite3.OperationalError as e:
+            logging.warning(f"FTS5 indisponible, recherche linéaire en mémoire : {e}")
+            return False
+
+    def __len__(self):
+        return len(self._rows)
+
+    def build(self, accounts: Iterable[Tuple[str, str, int]]):
+        """
+        (Re)construire l'index
+
+        Args:
+            accounts: Itérable de tuples (site, login, id) déchiffrés
+        """
+        with self._lock:
+            self._rows.clear()
+            if self.fts_available:
+                self._conn.execute("DELETE FROM account_search")
+            self._add_locked(accounts)
+
+    def add(self, accounts: Iterable[Tuple[str, str, int]]):
+        """
+        Ajouter (ou remplacer) des comptes dans l'index
+
+        Args:
+            accounts: Itérable de tuples (site, login, id) déchiffrés
+        """
+        with self._lock:
+            accounts = list(accounts)
+            self._remove_locked(account_id for _, _, account_id in accounts)
+            self._add_locked(accounts)
+
+    def remove(self, account_ids: Iterable[int]):
+        """
+        Retirer des comptes de l'index
+
+        Args:
+            account_ids: IDs des comptes supprimés
+        """
+        with self._lock:
+            self._remove_locked(account_ids)
+
+    def clear(self):
+        """Vider l'index (verrouillage du coffre)"""
+        with self._lock:
+            self._rows.clear()
+            if self.fts_available:
+                self._conn.execute("DELETE FROM account_search")
+                self._conn.commit()
+
+    def get(self, account_id: int) -> Optional[Tuple[str, str]]:
+        """
+        Récupérer le site et le login indexés d'un compte
+
+        Args:
+            account_id: ID du compte
+
+        Returns:
+            Tuple (site, login) ou None
+        """
+        return self._rows.get(account_id)
+
+    def _add_locked(self, accounts: Iterable[Tuple[str, str, int]]):
+        rows = []
+        for site, login, account_id in accounts:
+            self._rows[account_id] = (site or "", login or "")
+            rows.append((account_id, site or "", login or ""))
+        if self.fts_available and rows:
+            self._conn.executemany(
+                "INSERT INTO account_search (rowid, site, login) VALUES (?, ?, ?)", rows
+            )
+            self._conn.commit()
+
+    def _remove_locked(self, account_ids: Iterable[int]):
+        ids = [account_id for account_id in account_ids if self._rows.pop(account_id, None) is not None]
+        if self.fts_available and ids:
+            self._conn.executemany("DELETE FROM account_search WHERE rowid = ?",
+                                   [(account_id,) for account_id in ids])
+            self._conn.commit()
+
+    @staticmethod
+    def _build_match_query(query: str, search_type: str) -> Optional[str]:
+        """
+        Traduire la saisie utilisateur en requête FTS5
+
+        Chaque mot devient un préfixe ("git" trouve "github") ; une saisie
+        entre guillemets est cherchée comme une phrase exacte.
+        """
+        query = query.strip()
+        phrase = len(query) >= 2 and query[0] == query[-1] == '"'
+        tokens = _TOKEN_PATTERN.findall(query)
+        if not tokens:
+            return None
+
+        if phrase:
+            expression = '"' + " ".join(tokens) + '"'
+        else:
+            expression = " ".join(f'"{token}"*' for token in tokens)
+
+        if search_type in SEARCH_FIELDS:
+            return f"{search_type} : ({expression})"
+        return expression
+
+    def search(self, query: str, search_type: str = "all",
+               limit: Optional[int] = None) -> List[Tuple[str, str, int]]:
+        """
+        Rechercher par préfixe ou phrase, résultats classés par pertinence (bm25)
+
+        Args:
+            query: Saisie de l'utilisateur
+            search_type: "all", "site" ou "login"
+            limit: Nombre maximum de résultats
+
+        Returns:
+            Liste de tuples (site, login, id)
+        """
+        if search_type not in SEARCH_TYPES:
+            raise ValueError(f"Type de recherche inconnu : {search_type}")
+
+        match_query = self._build_match_query(query, search_type)
+        if match_query is None:
+            return []
+
+        with self._lock:
+            if not self.fts_available:
+                return self._linear_search(query, search_type, limit)
+
+            sql = "SELECT rowid FROM account_search WHERE account_search MATCH ? ORDER BY rank"
+            params = [match_query]
+            if limit:
+                sql += " LIMIT ?"
+                params.append(limit)
+            try:
+                ids = [row[0] for row in self._conn.execute(sql, params)]
+            except sqlite3.Error as e:
+                logging.error(f"Erreur lors de la recherche plein texte : {e}")
+                return []
+            return [self._rows[account_id] + (account_id,) for account_id in ids]
+
+    def _linear_search(self, query: str, search_type: str,
+                       limit: Optional[int]) -> List[Tuple[str, str, int]]:
+        """Repli sans FTS5 : préfixe de mot sur les valeurs en mémoire"""
+        tokens = [token.lower() for token in _TOKEN_PATTERN.findall(query)]
+        results = []
+        for account_id, (site, login) in self._rows.items():
+            values = {'site': site, 'login': login}
+            fields = SEARCH_FIELDS if search_type == "all" else (search_type,)
+            words = [word.lower() for field in fields for word in _TOKEN_PATTERN.findall(values[field])]
+            if all(any(word.startswith(token) for word in words) for token in tokens):
+                results.append((site, login, account_id))
+                if limit and len(results) >= limit:
+                    break
+        return results
+
+class TrigramIndex:
+    """
+    Index inversé de trigrammes pour la recherche « contient » exacte
+
+    Reproduit exactement la sémantique `terme in valeur.lower()` : les listes
+    de trigrammes de la requête sont intersectées pour obtenir quelques
+    candidats, puis chaque candidat est vérifié par une vraie recherche de
+    sous-chaîne.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows: Dict[int, Tuple[str, str]] = {}
+        self._normalized: Dict[int, Tuple[str, str]] = {}
+        self._postings: Dict[str, Dict[str, set]] = {field: {} for field in SEARCH_FIELDS}
+
+    def __len__(self):
+        return len(self._rows)
+
+    @staticmethod
+    def _trigrams(value: str) -> set:
+        """Ensemble des trigrammes d'une valeur normalisée"""
+        return {value[i:i + 3] for i in range(len(value) - 2)}
+
+    def build(self, accounts: Iterable[Tuple[str, str, int]]):
+        """
+        (Re)construire l'index
+
+        Args:
+            accounts: Itérable de tuples (site, login, id) déchiffrés
+        """
+        with self._lock:
+            self._rows.clear()
+            self._normalized.clear()
+            self._postings = {field: {} for field in SEARCH_FIELDS}
+            for site, login, account_id in accounts:
+                self._add_locked(site, login, account_id)
+
+    def add(self, accounts: Iterable[Tuple[str, str, int]]):
+        """
+        Ajouter (ou remplacer) des comptes dans l'index
+
+        Args:
+            accounts: Itérable de tuples (site, login, id) déchiffrés
+        """
+        with self._lock:
+            for site, login, account_id in accounts:
+                self._remove_locked(account_id)
+                self._add_locked(site, login, account_id)
+
+    def remove(self, account_ids: Iterable[int]):
+        """
+        Retirer des comptes de l'index
+
+        Args:
+            account_ids: IDs des comptes supprimés
+        """
+        with self._lock:
+            for account_id in account_ids:
+                self._remove_locked(account_id)
+
+    def clear(self):
+        """Vider l'index (verrouillage du coffre)"""
+        self.build(())
+
+    def items(self) -> List[Tuple[str, str, int]]:
+        """
+        Copie des valeurs indexées (pour construire un autre index sans déchiffrer)
+
+        Returns:
+            Liste de tuples (site, login, id)
+        """
+        with self._lock:
+            return [(site, login, account_id) for account_id, (site, login) in self._rows.items()]
+
+    def _add_locked(self, site: str, login: str, account_id: int):
+        site, login = site or "", login or ""
+        normalized = (site.lower(), login.lower())
+        self._rows[account_id] = (site, login)
+        self._normalized[account_id] = normalized
+        for field, value in zip(SEARCH_FIELDS, normalized):
+            postings = self._postings[field]
+            for trigram in self._trigrams(value):
+                postings.setdefault(trigram, set()).add(account_id)
+
+    def _remove_locked(self, account_id: int):
+        normalized = self._normalized.pop(account_id, None)
+        self._rows.pop(account_id, None)
+        if normalized is None:
+            return
+        for field, value in zip(SEARCH_FIELDS, normalized):
+            postings = self._postings[field]
+            for trigram in self._trigrams(value):
+                ids = postings.get(trigram)
+                if ids is not None:
+                    ids.discard(account_id)
+                    if not ids:
+                        del postings[trigram]
+
+    def _field_candidates(self, field: str, trigrams: set) -> set:
+        """Intersection des listes de trigrammes, en commençant par la plus courte"""
+        postings = self._postings[field]
+        lists = sorted((postings.get(trigram, set()) for trigram in trigrams), key=len)
+        if not lists or not lists[0]:
+            return set()
+        candidates = set(lists[0])
+        for ids in lists[1:]:
+            candidates &= ids
+            if not candidates:
+                break
+        return candidates
+
+    def search(self, query: str, search_type: str = "all",
+               candidates: Optional[Iterable[int]] = None) -> List[Tuple[str, str, int]]:
+        """
+        Rechercher les comptes dont le site et/ou le login contient la requête
+
+        Args:
+            query: Saisie de l'utilisateur (comparée en minuscules)
+            search_type: "all", "site" ou "login"
+            candidates: Restreindre la recherche à ces IDs (affinage d'un
+                        résultat précédent)
+
+        Returns:
+            Liste de tuples (site, login, id) triés par ID
+        """
+        if search_type not in SEARCH_TYPES:
+            raise ValueError(f"Type de recherche inconnu : {search_type}")
+
+        term = query.strip().lower()
+        if not term:
+            return []
+        fields = SEARCH_FIELDS if search_type == "all" else (search_type,)
+        positions = [SEARCH_FIELDS.index(field) for field in fields]
+
+        with self._lock:
+            if candidates is not None:
+                pool = set(candidates)
+            elif len(term) < 3:
+                # Trop court pour des trigrammes : vérification directe en mémoire
+                pool = self._normalized.keys()
+            else:
+                trigrams = self._trigrams(term)
+                pool = set()
+                for field in fields:
+                    pool |= self._field_candidates(field, trigrams)
+
+            matches = []
+            for account_id in pool:
+                normalized = self._normalized.get(account_id)
+                if normalized and any(term in normalized[position] for position in positions):
+                    matches.append(account_id)
+
+            return [self._rows[account_id] + (account_id,) for account_id in sorted(matches)]
+
+class _TrieNode:
+    """Noeud du dictionnaire de termes"""
+
+    __slots__ = ('children', 'term', 'min_length', 'max_length')
+
+    def __init__(self):
+        self.children: Dict[str, '_TrieNode'] = {}
+        self.term: Optional[str] = None
+        # Longueurs extrêmes des termes du sous-arbre (bornes conservées
+        # après un retrait : elles restent valides pour l'élagage)
+        self.min_length = 0
+        self.max_length = 0
+
+class LevenshteinTrie:
+    """
+    Dictionnaire de termes parcouru par un automate de Levenshtein
+
+    La requête est comparée au trie en calculant une ligne de la matrice
+    d'édition par noeud : les préfixes communs ne sont calculés qu'une fois et
+    une branche est abandonnée dès que toute la ligne dépasse la distance
+    maximale, ou dès que la longueur de ses termes s'écarte trop de celle de
+    la requête. Seule la bande diagonale de chaque ligne est calculée, et
+    seule une petite partie du dictionnaire est visitée.
+    """
+
+    def __init__(self):
+        self._root = _TrieNode()
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, term: str):
+        """
+        Ajouter un terme
+
+        Args:
+            term: Terme normalisé
+        """
+        length = len(term)
+        node = self._root
+        for char in term:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _TrieNode()
+                child.min_length = length
+            node = child
+            if length < node.min_length:
+                node.min_length = length
+            if length > node.max_length:
+                node.max_length = length
+        if node.term is None:
+            node.term = term
+            self._size += 1
+
+    def discard(self, term: str):
+        """
+        Retirer un terme (les noeuds restent, seul le marqueur est effacé)
+
+        Args:
+            term: Terme normalisé
+        """
+        node = self._root
+        for char in term:
+            node = node.children.get(char)
+            if node is None:
+                return
+        if node.term is not None:
+            node.term = None
+            self._size -= 1
+
+    def search(self, query: str, max_distance: int) -> List[Tuple[int, str]]:
+        """
+        Trouver les termes à distance d'édition <= max_distance
+
+        Args:
+            query: Terme recherché (normalisé)
+            max_distance: Distance d'édition maximale
+
+        Returns:
+            Liste de tuples (distance, terme)
+        """
+        results = []
+        length = len(query)
+        # Cellules hors de la bande diagonale |ligne - colonne| <= max_distance :
+        # elles dépassent forcément la borne et ne sont jamais calculées
+        bound = max_distance + 1
+        first_row = [column if column < bound else bound for column in range(length + 1)]
+        stack = [(child, char, 1, first_row) for char, child in self._root.children.items()
+                 if child.min_length - length <= max_distance and length - child.max_length <= max_distance]
+
+        while stack:
+            node, char, depth, previous = stack.pop()
+            start = max(1, depth - max_distance)
+            end = min(length, depth + max_distance)
+            current = [bound] * (length + 1)
+            current[0] = depth if depth < bound else bound
+            row_min = current[0]
+            # Minimum calculé sans min() : c'est la boucle la plus chaude de la recherche
+            for column in range(start, end + 1):
+                cost = previous[column - 1] + (query[column - 1] != char)   # substitution
+                other = previous[column] + 1                                # suppression
+                if other < cost:
+                    cost = other
+                other = current[column - 1] + 1                             # insertion
+                if other < cost:
+                    cost = other
+                if cost > bound:
+                    cost = bound
+                current[column] = cost
+                if cost < row_min:
+                    row_min = cost
+
+            if node.term is not None and current[length] <= max_distance:
+                results.append((current[length], node.term))
+            # Plus aucune cellule sous la borne : aucun descendant ne peut convenir
+            if row_min > max_distance:
+                continue
+            for child_char, child in node.children.items():
+                # Écart de longueur trop grand pour tous les termes du sous-arbre
+                if child.min_length - length <= max_distance and length - child.max_length <= max_distance:
+                    stack.append((child, child_char, depth + 1, current))
+
+        return results
+
+class FuzzyIndex:
+    """
+    Recherche approximative (fautes de frappe) sur les sites et logins
+
+    Le dictionnaire contient la valeur complète normalisée et chacun de ses
+    mots ("github.com" -> "github.com", "github", "com") ; un automate de
+    Levenshtein sur ce dictionnaire retrouve les termes proches sans comparer
+    la requête à chaque ligne.
+    """
+
+    MIN_TERM_LENGTH = 3
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows: Dict[int, Tuple[str, str]] = {}
+        self._terms: Dict[str, Dict[str, set]] = {}
+        self._trie = LevenshteinTrie()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _extract_terms(self, value: str) -> set:
+        """Termes indexés pour une valeur"""
+        normalized = (value or "").strip().lower()
+        terms = {normalized} | set(_TOKEN_PATTERN.findall(normalized))
+        return {term for term in terms if len(term) >= self.MIN_TERM_LENGTH}
+
+    def build(self, accounts: Iterable[Tuple[str, str, int]]):
+        """
+        (Re)construire l'index
+
+        Args:
+            accounts: Itérable de tuples (site, login, id) déchiffrés
+        """
+        with self._lock:
+            self._rows.clear()
+            self._terms.clear()
+            self._trie = LevenshteinTrie()
+            for site, login, account_id in accounts:
+                self._add_locked(site, login, account_id)
+
+    def add(self, accounts: Iterable[Tuple[str, str, int]]):
+        """
+        Ajouter (ou remplacer) des comptes dans l'index
+
+        Args:
+            accounts: Itérable de tuples (site, login, id) déchiffrés
+        """
+        with self._lock:
+            for site, login, account_id in accounts:
+                self._remove_locked(account_id)
+                self._add_locked(site, login, account_id)
+
+    def remove(self, account_ids: Iterable[int]):
+        """
+        Retirer des comptes de l'index
+
+        Args:
+            account_ids: IDs des comptes supprimés
+        """
+        with self._lock:
+            for account_id in account_ids:
+                self._remove_locked(account_id)
+
+    def clear(self):
+        """Vider l'index (verrouillage du coffre)"""
+        self.build(())
+
+    def _add_locked(self, site: str, login: str, account_id: int):
+        self._rows[account_id] = (site or "", login or "")
+        for field, value in zip(SEARCH_FIELDS, (site, login)):
+            for term in self._extract_terms(value):
+                postings = self._terms.get(term)
+                if postings is None:
+                    postings = self._terms[term] = {name: set() for name in SEARCH_FIELDS}
+                    self._trie.add(term)
+                postings[field].add(account_id)
+
+    def _remove_locked(self, account_id: int):
+        row = self._rows.pop(account_id, None)
+        if row is None:
+            return
+        for field, value in zip(SEARCH_FIELDS, row):
+            for term in self._extract_terms(value):
+                postings = self._terms.get(term)
+                if postings is None:
+                    continue
+                postings[field].discard(account_id)
+                if not any(postings.values()):
+                    del self._terms[term]
+                    self._trie.discard(term)
+
+    def search(self, query: str, search_type: str = "all", max_distance: int = 2,
+               limit: Optional[int] = None) -> List[Tuple[str, str, int, int]]:
+        """
+        Rechercher les comptes dont un terme est proche de la requête
+
+        Args:
+            query: Saisie de l'utilisateur
+            search_type: "all", "site" ou "login"
+            max_distance: Distance d'édition maximale
+            limit: Nombre maximum de résultats
+
+        Returns:
+            Liste de tuples (site, login, id, distance) triés par distance
+        """
+        if search_type not in SEARCH_TYPES:
+            raise ValueError(f"Type de recherche inconnu : {search_type}")
+
+        term = query.strip().lower()
+        if len(term) < self.MIN_TERM_LENGTH:
+            return []
+        fields = SEARCH_FIELDS if search_type == "all" else (search_type,)
+
+        with self._lock:
+            # Termes les plus proches d'abord : la première distance vue pour un
+            # compte est la meilleure, et la collecte s'arrête dès `limit`
+            # candidats au lieu de classer toutes les correspondances
+            matches = ((distance, account_id)
+                       for distance, found in sorted(self._trie.search(term, max_distance))
+                       for field in fields
+                       for account_id in self._terms[found][field])
+            best: Dict[int, int] = {}
+            for distance, account_id in matches:
+                best.setdefault(account_id, distance)
+                if limit and len(best) >= limit:
+                    break
+
+            ranked = sorted(best.items(), key=lambda item: (item[1], item[0]))
+            if limit:
+                ranked = ranked[:limit]
+            return [self._rows[account_id] + (account_id, distance) for account_id, distance in ranked]
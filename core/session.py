@@ -0,0 +1,180 @@
+"""
+Session de déverrouillage du coffre
+
+La clé du coffre est dérivée une seule fois, au déverrouillage, puis partagée
+par tous les composants (chaque EncryptionManager lit la clé de la session au
+lieu de relancer une dérivation). Elle est oubliée au verrouillage.
+
+La session retient aussi la dernière vérification réussie du mot de passe
+maître : pendant SESSION['reauth_grace_seconds'], les consultations de
+données sensibles n'en redemandent pas. Ce délai de grâce est révoqué au
+verrouillage, après SESSION['reauth_idle_seconds'] sans activité, ou
+explicitement (changement de paramètres).
+"""
+
+import threading
+import time
+import weakref
+from typing import Callable, Optional
+import logging
+
+from config.settings import SESSION
+
+class VaultLockedError(Exception):
+    """Opération de chiffrement demandée alors que le coffre est verrouillé"""
+    pass
+
+class SessionKeyManager:
+    """Détenteur de la clé du coffre pour la durée d'une session"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._key: Optional[bytearray] = None
+        self._previous_key: Optional[bytearray] = None
+        self._generation = 0
+        self._lock_listeners = []
+        self._verified_at: Optional[float] = None
+        self._last_activity: Optional[float] = None
+
+    @property
+    def is_unlocked(self) -> bool:
+        """True si une clé est disponible"""
+        return self._key is not None
+
+    @property
+    def generation(self) -> int:
+        """Compteur incrémenté à chaque changement de clé (invalidation des caches)"""
+        return self._generation
+
+    def get_key(self) -> bytes:
+        """
+        Récupérer la clé du coffre
+
+        Returns:
+            Clé de 32 octets
+
+        Raises:
+            VaultLockedError: Si le coffre est verrouillé
+        """
+        key = self._key
+        if key is None:
+            raise VaultLockedError("Le coffre est verrouillé")
+        return bytes(key)
+
+    def get_previous_key(self) -> Optional[bytes]:
+        """
+        Ancienne clé conservée pendant une rotation (déchiffrement seulement)
+
+        Returns:
+            Clé de 32 octets, ou None hors rotation
+        """
+        previous_key = self._previous_key
+        return bytes(previous_key) if previous_key is not None else None
+
+    def unlock(self, key: bytes, previous_key: Optional[bytes] = None):
+        """
+        Installer la clé du coffre pour la session
+
+        Args:
+            key: Clé de données (chiffrement et déchiffrement)
+            previous_key: Ancienne clé encore utilisée par une partie des
+                          lignes pendant une rotation (déchiffrement seulement)
+        """
+        with self._lock:
+            self._wipe_locked()
+            self._key = bytearray(key)
+            self._previous_key = bytearray(previous_key) if previous_key is not None else None
+            self._generation += 1
+
+    def lock(self):
+        """Oublier la clé et prévenir les composants qui gardent des données en clair"""
+        with self._lock:
+            was_unlocked = self._key is not None
+            self._wipe_locked()
+            self._verified_at = None
+            self._last_activity = None
+            self._generation += 1
+            listeners = list(self._lock_listeners)
+
+        if not was_unlocked:
+            return
+        for reference in listeners:
+            callback = reference()
+            if callback is None:
+                continue
+            try:
+                callback()
+            except Exception as e:
+                logging.error(f"Erreur lors du verrouillage : {e}")
+
+    def record_verification(self):
+        """Noter une vérification réussie du mot de passe maître (ouvre le délai de grâce)"""
+        now = time.monotonic()
+        with self._lock:
+            if self._key is None:
+                return
+            self._verified_at = now
+            self._last_activity = now
+
+    def touch(self):
+        """Noter une activité de l'utilisateur (repousse l'expiration par inactivité)"""
+        with self._lock:
+            if self._verified_at is not None:
+                self._last_activity = time.monotonic()
+
+    def revoke_reauthentication(self):
+        """Fermer le délai de grâce : la prochaine consultation redemande le mot de passe"""
+        with self._lock:
+            self._verified_at = None
+            self._last_activity = None
+
+    def reauthentication_valid(self) -> bool:
+        """
+        Vérifier si une consultation peut se passer du mot de passe maître
+
+        Returns:
+            True si la session est déverrouillée, qu'une vérification a réussi
+            depuis moins de SESSION['reauth_grace_seconds'] et que l'utilisateur
+            n'est pas resté inactif plus de SESSION['reauth_idle_seconds']
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._key is None or self._verified_at is None:
+                return False
+            if (now - self._verified_at > SESSION['reauth_grace_seconds']
+                    or now - self._last_activity > SESSION['reauth_idle_seconds']):
+                self._verified_at = None
+                self._last_activity = None
+                return False
+            self._last_activity = now
+            return True
+
+    def add_lock_listener(self, callback: Callable[[], None]):
+        """
+        Enregistrer une fonction appelée au verrouillage
+
+        Seule une référence faible est conservée : l'enregistrement ne
+        prolonge pas la durée de vie de l'objet propriétaire.
+
+        Args:
+            callback: Méthode ou fonction sans argument
+        """
+        if hasattr(callback, '__self__'):
+            reference = weakref.WeakMethod(callback)
+        else:
+            reference = weakref.ref(callback)
+        with self._lock:
+            self._lock_listeners = [ref for ref in self._lock_listeners if ref() is not None]
+            self._lock_listeners.append(reference)
+
+    def _wipe_locked(self):
+        """Effacer les copies modifiables des clés"""
+        for key in (self._key, self._previous_key):
+            if key is not None:
+                for i in range(len(key)):
+                    key[i] = 0
+        self._key = None
+        self._previous_key = None
+
+# Session partagée par toute l'application
+session = SessionKeyManager()
@@ -0,0 +1,304 @@
+"""
+Service du coffre partagé par toute l'application
+
+Créé une seule fois par main.py puis transmis à la fenêtre principale et à
+chaque dialog : la connexion, la clé de session et les index de recherche
+sont ainsi préparés une seule fois, et l'ouverture d'un dialog ne coûte ni
+accès disque ni dérivation de clé.
+
+Les opérations qui dérivent une clé à partir du mot de passe maître existent
+aussi en version *_async : elles s'exécutent sur un worker dédié (une seule
+dérivation à la fois) et retournent un Future, pour que l'interface ne se
+fige pas pendant la dérivation.
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from config.settings import DATABASE_PATH
+from core.database import DatabaseManager
+from core.parallel import shutdown_executors
+from core.quick_unlock import QuickUnlockStore
+from core.session import SessionKeyManager
+
+class VaultService:
+    """Point d'accès unique au coffre (base de données, clé de session, caches)"""
+
+    def __init__(self, db_path: Path = DATABASE_PATH, profile: Optional[str] = None):
+        self.session = SessionKeyManager()
+        self.database = DatabaseManager(db_path, profile, key_session=self.session)
+        self.quick_unlock = QuickUnlockStore(vault_id=str(Path(db_path).resolve()))
+        self._auth_executor: Optional[ThreadPoolExecutor] = None
+        # Index de recherche construits à part : ils ne retardent pas l'authentification
+        self._index_executor: Optional[ThreadPoolExecutor] = None
+        self._auth_lock = threading.Lock()
+        # Les threads de chiffrement par lots ne survivent pas au verrouillage
+        self.session.add_lock_listener(shutdown_executors)
+
+    def _submit(self, func, *args) -> Future:
+        """Exécuter une opération coûteuse sur le worker d'authentification"""
+        with self._auth_lock:
+            if self._auth_executor is None:
+                self._auth_executor = ThreadPoolExecutor(1, thread_name_prefix="vault-auth")
+            return self._auth_executor.submit(func, *args)
+
+    def _submit_index(self, func, *args) -> Future:
+        """Exécuter la construction ou l'interrogation d'un index de recherche sur son worker"""
+        with self._auth_lock:
+            if self._index_executor is None:
+                self._index_executor = ThreadPoolExecutor(1, thread_name_prefix="vault-index")
+            return self._index_executor.submit(func, *args)
+
+    @property
+    def is_unlocked(self) -> bool:
+        """True si la session est déverrouillée"""
+        return self.session.is_unlocked
+
+    def has_master_password(self) -> bool:
+        """
+        Vérifier si le coffre est déjà initialisé
+
+        Returns:
+            True si un mot de passe maître existe
+        """
+        return self.database.has_master_password()
+
+    def unlock(self, password: str) -> bool:
+        """
+        Déverrouiller le coffre
+
+        Args:
+            password: Mot de passe maître
+
+        Returns:
+            True si le mot de passe est correct
+        """
+        return self.database.unlock(password)
+
+    def unlock_async(self, password: str) -> Future:
+        """
+        Déverrouiller le coffre sur un worker
+
+        Args:
+            password: Mot de passe maître
+
+        Returns:
+            Future dont le résultat est True si le mot de passe est correct
+        """
+        return self._submit(self.database.unlock, password)
+
+    def verify_master_password_async(self, password: str) -> Future:
+        """
+        Vérifier le mot de passe maître sur un worker
+
+        Args:
+            password: Mot de passe à vérifier
+
+        Returns:
+            Future dont le résultat est True si le mot de passe est correct
+        """
+        return self._submit(self.database.verify_master_password, password)
+
+    def set_master_password_async(self, password: str) -> Future:
+        """
+        Définir ou changer le mot de passe maître sur un worker
+
+        Args:
+            password: Nouveau mot de passe maître
+
+        Returns:
+            Future terminé quand le mot de passe est enregistré (l'exception
+            éventuelle de set_master_password y est conservée)
+        """
+        return self._submit(self._set_master_password, password)
+
+    def _set_master_password(self, password: str):
+        """Changer le mot de passe maître (le déverrouillage rapide est révoqué)"""
+        self.quick_unlock.clear()
+        self.database.set_master_password(password)
+
+    def begin_key_rotation_async(self, password: str) -> Future:
+        """
+        Démarrer la rotation de la clé de données sur un worker
+
+        Args:
+            password: Mot de passe maître
+
+        Returns:
+            Future dont le résultat est True si la rotation peut avancer
+        """
+        return self._submit(self._begin_key_rotation, password)
+
+    def _begin_key_rotation(self, password: str) -> bool:
+        """Démarrer la rotation (le PIN enveloppait l'ancienne clé : il est révoqué)"""
+        started = self.database.begin_key_rotation(password)
+        if started:
+            self.quick_unlock.clear()
+        return started
+
+    def quick_unlock_available(self) -> bool:
+        """
+        Vérifier si le coffre peut être déverrouillé par code PIN
+
+        Returns:
+            True si un déverrouillage rapide valide existe pour ce coffre
+        """
+        return self.quick_unlock.is_available()
+
+    def enable_quick_unlock(self, pin: str):
+        """
+        Activer le déverrouillage rapide pour la clé de la session courante
+
+        Args:
+            pin: Code PIN
+
+        Raises:
+            VaultLockedError: Si le coffre est verrouillé
+            OSError: Si le fichier ne peut pas être écrit
+        """
+        # La clé est reconnue au déverrouillage rapide par son identifiant enregistré
+        self.database.rebuild_blind_indexes()
+        self.quick_unlock.enable(pin, self.session.get_key(), self.session.get_previous_key())
+
+    def enable_quick_unlock_async(self, pin: str) -> Future:
+        """
+        Activer le déverrouillage rapide sur un worker
+
+        Args:
+            pin: Code PIN
+
+        Returns:
+            Future terminé quand le fichier est écrit
+        """
+        return self._submit(self.enable_quick_unlock, pin)
+
+    def disable_quick_unlock(self):
+        """Supprimer le déverrouillage rapide"""
+        self.quick_unlock.clear()
+
+    def unlock_with_pin(self, pin: str) -> bool:
+        """
+        Déverrouiller le coffre par code PIN
+
+        Args:
+            pin: Code PIN
+
+        Returns:
+            True si le coffre est déverrouillé
+        """
+        keys = self.quick_unlock.unlock(pin)
+        if keys is None:
+            return False
+        if not self.database.unlock_with_data_key(*keys):
+            # Fichier périmé (clé de données remplacée entre-temps)
+            self.quick_unlock.clear()
+            return False
+        return True
+
+    def unlock_with_pin_async(self, pin: str) -> Future:
+        """
+        Déverrouiller le coffre par code PIN sur un worker
+
+        Args:
+            pin: Code PIN
+
+        Returns:
+            Future dont le résultat est True si le coffre est déverrouillé
+        """
+        return self._submit(self.unlock_with_pin, pin)
+
+    def build_search_indexes(self, accounts: Optional[List[Tuple[str, str, int]]] = None,
+                             generation: Optional[int] = None) -> bool:
+        """
+        Construire l'index de recherche exacte puis l'index approximatif
+
+        Args:
+            accounts: Tuples (site, login, id) déjà déchiffrés
+            generation: database.index_generation relevé lors de la lecture de accounts
+
+        Returns:
+            True si l'index approximatif est prêt
+        """
+        self.database.build_search_index(accounts, generation)
+        return self.database.build_fuzzy_index()
+
+    def build_search_indexes_async(self, accounts: Optional[List[Tuple[str, str, int]]] = None,
+                                   generation: Optional[int] = None) -> Future:
+        """
+        Construire les index de recherche sans bloquer l'interface
+
+        Returns:
+            Future dont le résultat est celui de build_search_indexes
+        """
+        return self._submit_index(self.build_search_indexes, accounts, generation)
+
+    def search_accounts(self, query: str, search_type: str = "all") -> List[Tuple[str, str, None, int]]:
+        """
+        Recherche exacte, puis approximative si aucun compte ne correspond
+
+        Args:
+            query: Saisie de l'utilisateur
+            search_type: "all", "site" ou "login"
+
+        Returns:
+            Liste des comptes (site, login, None, id)
+        """
+        results = self.database.search_accounts(query, search_type)
+        if not results:
+            results = self.database.fuzzy_search_accounts(query, search_type)
+        return results
+
+    def search_accounts_async(self, query: str, search_type: str = "all") -> Future:
+        """
+        Rechercher sur le worker des index : une recherche lancée pendant leur
+        construction attend qu'ils soient prêts au lieu de les construire sur
+        le thread Tk
+
+        Returns:
+            Future dont le résultat est celui de search_accounts
+        """
+        return self._submit_index(self.search_accounts, query, search_type)
+
+    def fuzzy_search_async(self, query: str, search_type: str = "all") -> Future:
+        """
+        Recherche approximative sur le worker des index (jamais sur le thread Tk)
+
+        Args:
+            query: Saisie de l'utilisateur
+            search_type: "all", "site" ou "login"
+
+        Returns:
+            Future dont le résultat est celui de database.fuzzy_search_accounts
+        """
+        return self._submit_index(self.database.fuzzy_search_accounts, query, search_type)
+
+    def reauthentication_valid(self) -> bool:
+        """
+        Vérifier si une consultation peut se passer du mot de passe maître
+
+        Returns:
+            True pendant le délai de grâce qui suit une vérification réussie
+        """
+        return self.session.reauthentication_valid()
+
+    def revoke_reauthentication(self):
+        """Redemander le mot de passe maître à la prochaine consultation"""
+        self.session.revoke_reauthentication()
+
+    def lock(self):
+        """Verrouiller le coffre (la clé et les index en mémoire sont oubliés)"""
+        self.database.lock()
+
+    def close(self):
+        """Verrouiller le coffre, fermer les connexions et arrêter les workers"""
+        with self._auth_lock:
+            executors = (self._auth_executor, self._index_executor)
+            self._auth_executor = self._index_executor = None
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+        self.lock()
+        self.database.close()
+        shutdown_executors()
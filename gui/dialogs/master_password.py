@@ -8,23 +8,26 @@ from PIL import ImageTk, Image
 from customtkinter import CTkButton
 
 from config.settings import COLORS, WINDOW_CONFIG, IMAGES_DIR, MESSAGES
+from utils.background import call_when_done
 from utils.geometry import GeometryUtils
 from utils.validators import Validator
 from gui.widgets.custom_widgets import CustomEntry, show_error, show_success
-from core.database import DatabaseManager
 
 class MasterPasswordDialog:
     """Dialog pour définir/modifier le mot de passe maître"""
     
-    def __init__(self, parent, on_success_callback=None):
+    def __init__(self, parent, vault, on_success_callback=None):
         self.parent = parent
         self.on_success_callback = on_success_callback
         self.validator = Validator()
-        self.db_manager = DatabaseManager()
+        self.vault = vault
+        self.db_manager = vault.database
         
         self.dialog = None
         self.password_entry = None
         self.confirmation_entry = None
+        self.save_btn = None
+        self._busy = False
         
         self._create_dialog()
         self._setup_ui()
@@ -130,7 +133,7 @@ class MasterPasswordDialog:
     def _create_save_button(self):
         """Créer les boutons"""
         # Bouton Sauvegarder
-        save_btn = CTkButton(
+        self.save_btn = CTkButton(
             self.dialog,
             text="💾 Sauvegarder",
             font=("Segoe UI", 12, "bold"),
@@ -144,7 +147,7 @@ class MasterPasswordDialog:
             border_color="black",
             border_width=1
         )
-        save_btn.place(x=30, y=220)
+        self.save_btn.place(x=30, y=220)
         
         # Bouton Annuler
         cancel_btn = CTkButton(
@@ -187,8 +190,22 @@ class MasterPasswordDialog:
         except Exception as e:
             print(f"Impossible d'ajouter l'icône : {e}")
     
+    def _set_busy(self, busy: bool):
+        """Afficher l'état d'enregistrement en cours (les saisies sont bloquées)"""
+        self._busy = busy
+        self.save_btn.configure(
+            state="disabled" if busy else "normal",
+            text="⏳ Chiffrement..." if busy else "💾 Sauvegarder"
+        )
+        for entry in (self.password_entry, self.confirmation_entry):
+            entry.configure(state="disabled" if busy else "normal")
+        self.dialog.configure(cursor="watch" if busy else "")
+    
     def _on_save(self):
         """Gestionnaire du bouton sauvegarder"""
+        if self._busy:
+            return
+        
         password = self.password_entry.get()
         confirmation = self.confirmation_entry.get()
         
@@ -200,20 +217,31 @@ class MasterPasswordDialog:
             self._clear_entries()
             return
         
-        try:
-            # Sauvegarder le mot de passe maître
-            self.db_manager.set_master_password(password)
-            show_success(self.dialog, MESSAGES['success']['master_changed'])
-            
-            # Appeler le callback de succès
-            if self.on_success_callback:
-                self.on_success_callback()
-            
-            self._close()
-            
-        except Exception as e:
-            print(f"Erreur lors de la sauvegarde du mot de passe maître : {e}")
-            show_error(self.dialog, "Erreur lors de la sauvegarde")
+        # Sauvegarder le mot de passe maître (dérivations sur un worker)
+        self._set_busy(True)
+        call_when_done(
+            self.dialog,
+            self.vault.set_master_password_async(password),
+            self._on_saved,
+            self._on_save_error
+        )
+    
+    def _on_saved(self, _result=None):
+        """Mot de passe maître enregistré (thread Tk)"""
+        self._set_busy(False)
+        show_success(self.dialog, MESSAGES['success']['master_changed'])
+        
+        # Appeler le callback de succès
+        if self.on_success_callback:
+            self.on_success_callback()
+        
+        self._close()
+    
+    def _on_save_error(self, error: BaseException):
+        """Échec de l'enregistrement (thread Tk)"""
+        print(f"Erreur lors de la sauvegarde du mot de passe maître : {error}")
+        self._set_busy(False)
+        show_error(self.dialog, "Erreur lors de la sauvegarde")
     
     def _clear_entries(self):
         """Vider les champs de saisie"""
@@ -233,14 +261,20 @@ class MasterPasswordDialog:
 class MasterPasswordVerificationDialog:
     """Dialog pour vérifier le mot de passe maître"""
     
-    def __init__(self, parent, on_success_callback=None, title="Vérification du mot de passe maître"):
+    def __init__(self, parent, vault, on_success_callback=None, title="Vérification du mot de passe maître",
+                 pass_password=False):
         self.parent = parent
         self.on_success_callback = on_success_callback
-        self.db_manager = DatabaseManager()
+        # Transmettre le mot de passe vérifié au callback (opérations qui dérivent la KEK)
+        self.pass_password = pass_password
+        self.vault = vault
+        self.db_manager = vault.database
         self.dialog_title = title
         
         self.dialog = None
         self.password_entry = None
+        self.verify_btn = None
+        self._busy = False
         
         self._create_dialog()
         self._setup_ui()
@@ -316,7 +350,7 @@ class MasterPasswordVerificationDialog:
     def _create_buttons(self):
         """Créer les boutons"""
         # Bouton Vérifier
-        verify_btn = CTkButton(
+        self.verify_btn = CTkButton(
             self.dialog,
             text="✅ Vérifier",
             font=("Segoe UI", 12, "bold"),
@@ -330,7 +364,7 @@ class MasterPasswordVerificationDialog:
             border_color="black",
             border_width=1
         )
-        verify_btn.place(x=15, y=180)
+        self.verify_btn.place(x=15, y=180)
         
         # Bouton Annuler
         cancel_btn = CTkButton(
@@ -363,23 +397,56 @@ class MasterPasswordVerificationDialog:
         except Exception as e:
             print(f"Impossible d'ajouter l'icône : {e}")
     
+    def _set_busy(self, busy: bool):
+        """Afficher l'état de vérification en cours (les saisies sont bloquées)"""
+        self._busy = busy
+        self.verify_btn.configure(
+            state="disabled" if busy else "normal",
+            text="⏳ Vérification..." if busy else "✅ Vérifier"
+        )
+        self.password_entry.configure(state="disabled" if busy else "normal")
+        self.dialog.configure(cursor="watch" if busy else "")
+    
     def _on_verify(self):
         """Vérifier le mot de passe maître"""
+        if self._busy:
+            return
+        
         password = self.password_entry.get()
         
         if not password.strip():
             show_error(self.dialog, "Veuillez saisir le mot de passe")
             return
         
-        if self.db_manager.verify_master_password(password):
+        self._set_busy(True)
+        call_when_done(
+            self.dialog,
+            self.vault.verify_master_password_async(password),
+            lambda valid: self._on_verify_result(password, valid),
+            self._on_verify_error
+        )
+    
+    def _on_verify_result(self, password: str, valid: bool):
+        """Résultat de la vérification (thread Tk)"""
+        self._set_busy(False)
+        if valid:
             if self.on_success_callback:
-                self.on_success_callback()
+                if self.pass_password:
+                    self.on_success_callback(password)
+                else:
+                    self.on_success_callback()
             self._close()
         else:
             show_error(self.dialog, MESSAGES['error']['invalid_master'])
             self.password_entry.delete(0, tk.END)
             self.password_entry.focus_set()
     
+    def _on_verify_error(self, error: BaseException):
+        """Échec inattendu de la vérification (thread Tk)"""
+        print(f"Erreur lors de la vérification du mot de passe maître : {error}")
+        self._set_busy(False)
+        show_error(self.dialog, "Erreur lors de la vérification")
+    
     def _close(self):
         """Fermer le dialogue"""
         self.dialog.destroy()
@@ -0,0 +1,291 @@
+"""
+Dialogs du déverrouillage rapide par code PIN
+"""
+
+import tkinter as tk
+from tkinter import Toplevel, Label, Canvas
+from customtkinter import CTkButton
+
+from config.settings import COLORS, WINDOW_CONFIG, QUICK_UNLOCK
+from utils.background import call_when_done
+from utils.geometry import GeometryUtils
+from utils.validators import Validator
+from gui.widgets.custom_widgets import CustomEntry, show_error, show_success
+
+def _create_title(dialog, text: str):
+    """Créer le titre et sa ligne décorative"""
+    title_label = Label(
+        dialog,
+        text=text,
+        fg=COLORS['text_primary'],
+        bg=COLORS['primary_bg'],
+        font=('Segoe UI', 16, 'bold')
+    )
+    title_label.place(x=70, y=30)
+
+    line = Canvas(
+        dialog,
+        width=250,
+        height=2,
+        bg=COLORS['line_color'],
+        highlightthickness=0
+    )
+    line.place(x=50, y=65)
+
+def _create_pin_field(dialog, label_text: str, y: int) -> CustomEntry:
+    """Créer un champ de saisie masqué pour le code PIN"""
+    pin_label = Label(
+        dialog,
+        text=label_text,
+        fg=COLORS['text_secondary'],
+        bg=COLORS['primary_bg'],
+        font=('Segoe UI', 12, 'bold')
+    )
+    pin_label.place(x=40, y=y)
+
+    entry = CustomEntry(dialog, show_text=True)
+    entry.place(x=70, y=y + 30, width=200)
+
+    line = Canvas(
+        dialog,
+        width=250,
+        height=2,
+        bg=COLORS['line_color'],
+        highlightthickness=0
+    )
+    line.place(x=70, y=y + 55)
+    return entry
+
+def _create_button(dialog, text: str, command, color: str, x: int, y: int, width: int = 120) -> CTkButton:
+    """Créer un bouton au style des dialogs du mot de passe maître"""
+    button = CTkButton(
+        dialog,
+        text=text,
+        font=("Segoe UI", 12, "bold"),
+        command=command,
+        text_color=COLORS['text_primary'],
+        fg_color=color,
+        hover_color=COLORS['button_hover'],
+        corner_radius=15,
+        width=width,
+        height=40,
+        border_color="black",
+        border_width=1
+    )
+    button.place(x=x, y=y)
+    return button
+
+class QuickUnlockSetupDialog:
+    """Dialog d'activation du déverrouillage rapide (coffre déverrouillé)"""
+
+    def __init__(self, parent, vault, on_success_callback=None):
+        self.parent = parent
+        self.vault = vault
+        self.on_success_callback = on_success_callback
+        self.validator = Validator()
+
+        self.dialog = None
+        self.pin_entry = None
+        self.confirmation_entry = None
+        self.save_btn = None
+        self._busy = False
+
+        self._create_dialog()
+        self._setup_ui()
+
+    def _create_dialog(self):
+        """Créer la fenêtre de dialogue"""
+        self.dialog = Toplevel(self.parent, bg=COLORS['primary_bg'])
+        config = WINDOW_CONFIG['master_password'].copy()
+        config['title'] = "Déverrouillage rapide"
+        GeometryUtils.apply_window_config(self.dialog, config)
+
+    def _setup_ui(self):
+        """Configurer l'interface utilisateur"""
+        _create_title(self.dialog, "🔢 Code PIN")
+        self.pin_entry = _create_pin_field(self.dialog, "Nouveau code PIN :", 80)
+        self.confirmation_entry = _create_pin_field(self.dialog, "Confirmation :", 150)
+        self.pin_entry.focus_set()
+        self.confirmation_entry.bind('<Return>', lambda e: self._on_save())
+
+        self.save_btn = _create_button(self.dialog, "💾 Activer", self._on_save,
+                                       COLORS['button_primary'], x=30, y=240)
+        _create_button(self.dialog, "🗑️ Désactiver", self._on_disable,
+                       COLORS['button_secondary'], x=160, y=240)
+
+        info_label = Label(
+            self.dialog,
+            text=f"Valable {QUICK_UNLOCK['validity_minutes'] // 60} h, "
+                 f"supprimé après {QUICK_UNLOCK['max_attempts']} codes erronés",
+            fg=COLORS['text_secondary'],
+            bg=COLORS['primary_bg'],
+            font=('Segoe UI', 9)
+        )
+        info_label.place(x=40, y=295)
+
+    def _set_busy(self, busy: bool):
+        """Afficher l'état d'enregistrement en cours"""
+        self._busy = busy
+        self.save_btn.configure(
+            state="disabled" if busy else "normal",
+            text="⏳ Chiffrement..." if busy else "💾 Activer"
+        )
+        self.dialog.configure(cursor="watch" if busy else "")
+
+    def _on_save(self):
+        """Activer le déverrouillage rapide"""
+        if self._busy:
+            return
+
+        pin = self.pin_entry.get()
+        is_valid, error_message = self.validator.validate_pin(pin, self.confirmation_entry.get())
+        if not is_valid:
+            show_error(self.dialog, error_message)
+            self.pin_entry.delete(0, tk.END)
+            self.confirmation_entry.delete(0, tk.END)
+            self.pin_entry.focus_set()
+            return
+
+        self._set_busy(True)
+        call_when_done(self.dialog, self.vault.enable_quick_unlock_async(pin),
+                       self._on_saved, self._on_save_error)
+
+    def _on_saved(self, _result=None):
+        """Déverrouillage rapide activé (thread Tk)"""
+        self._set_busy(False)
+        show_success(self.dialog, "Déverrouillage rapide activé")
+        if self.on_success_callback:
+            self.on_success_callback()
+        self._close()
+
+    def _on_save_error(self, error: BaseException):
+        """Échec de l'activation (thread Tk)"""
+        print(f"Erreur lors de l'activation du déverrouillage rapide : {error}")
+        self._set_busy(False)
+        show_error(self.dialog, "Erreur lors de l'activation du déverrouillage rapide")
+
+    def _on_disable(self):
+        """Supprimer le déverrouillage rapide"""
+        self.vault.disable_quick_unlock()
+        show_success(self.dialog, "Déverrouillage rapide désactivé")
+        self._close()
+
+    def _close(self):
+        """Fermer le dialogue"""
+        self.dialog.destroy()
+
+    def show(self):
+        """Afficher le dialogue"""
+        self.dialog.grab_set()  # Modal
+        self.dialog.wait_window()
+
+class QuickUnlockDialog:
+    """Dialog de déverrouillage par code PIN au démarrage"""
+
+    def __init__(self, parent, vault, on_success_callback=None, on_use_password_callback=None,
+                 on_cancel_callback=None):
+        self.parent = parent
+        self.vault = vault
+        self.on_success_callback = on_success_callback
+        self.on_use_password_callback = on_use_password_callback
+        self.on_cancel_callback = on_cancel_callback
+
+        self.dialog = None
+        self.pin_entry = None
+        self.unlock_btn = None
+        self._busy = False
+
+        self._create_dialog()
+        self._setup_ui()
+
+    def _create_dialog(self):
+        """Créer la fenêtre de dialogue"""
+        self.dialog = Toplevel(self.parent, bg=COLORS['primary_bg'])
+        config = WINDOW_CONFIG['master_password'].copy()
+        config['title'] = "Password Vault - Déverrouillage rapide"
+        config['height'] = 300
+        GeometryUtils.apply_window_config(self.dialog, config)
+        self.dialog.protocol("WM_DELETE_WINDOW", self._on_cancel)
+
+    def _setup_ui(self):
+        """Configurer l'interface utilisateur"""
+        _create_title(self.dialog, "🔢 Code PIN")
+        self.pin_entry = _create_pin_field(self.dialog, "Code PIN :", 90)
+        self.pin_entry.focus_set()
+        self.pin_entry.bind('<Return>', lambda e: self._on_unlock())
+
+        self.unlock_btn = _create_button(self.dialog, "🔓 Déverrouiller", self._on_unlock,
+                                         COLORS['button_success'], x=15, y=180, width=140)
+        _create_button(self.dialog, "🔑 Mot de passe", self._on_use_password,
+                       COLORS['button_secondary'], x=165, y=180, width=140)
+
+    def _set_busy(self, busy: bool):
+        """Afficher l'état de vérification en cours"""
+        self._busy = busy
+        self.unlock_btn.configure(
+            state="disabled" if busy else "normal",
+            text="⏳ Vérification..." if busy else "🔓 Déverrouiller"
+        )
+        self.pin_entry.configure(state="disabled" if busy else "normal")
+        self.dialog.configure(cursor="watch" if busy else "")
+
+    def _on_unlock(self):
+        """Déverrouiller le coffre avec le code PIN"""
+        if self._busy:
+            return
+
+        pin = self.pin_entry.get()
+        if not pin.strip():
+            show_error(self.dialog, "Veuillez saisir votre code PIN")
+            return
+
+        self._set_busy(True)
+        call_when_done(self.dialog, self.vault.unlock_with_pin_async(pin),
+                       self._on_unlock_result, self._on_unlock_error)
+
+    def _on_unlock_result(self, success: bool):
+        """Résultat du déverrouillage (thread Tk)"""
+        self._set_busy(False)
+        if success:
+            if self.on_success_callback:
+                self.on_success_callback()
+            self._close()
+            return
+
+        remaining = self.vault.quick_unlock.remaining_attempts()
+        if remaining == 0:
+            # Trop d'échecs ou clé périmée : retour au mot de passe maître
+            show_error(self.dialog, "Déverrouillage rapide désactivé, saisissez le mot de passe maître")
+            self._on_use_password()
+            return
+        show_error(self.dialog, f"Code PIN incorrect ({remaining} essai(s) restant(s))")
+        self.pin_entry.delete(0, tk.END)
+        self.pin_entry.focus_set()
+
+    def _on_unlock_error(self, error: BaseException):
+        """Échec inattendu du déverrouillage (thread Tk)"""
+        print(f"Erreur lors du déverrouillage rapide : {error}")
+        self._set_busy(False)
+        self._on_use_password()
+
+    def _on_use_password(self):
+        """Revenir au déverrouillage par mot de passe maître"""
+        self._close()
+        if self.on_use_password_callback:
+            self.on_use_password_callback()
+
+    def _on_cancel(self):
+        """Gestionnaire d'annulation"""
+        if self.on_cancel_callback:
+            self.on_cancel_callback()
+        self._close()
+
+    def _close(self):
+        """Fermer le dialogue"""
+        self.dialog.destroy()
+
+    def show(self):
+        """Afficher le dialogue"""
+        self.dialog.grab_set()  # Modal
+        self.dialog.focus_set()
+        self.dialog.wait_window()
@@ -7,19 +7,22 @@ import customtkinter as ctk
 from customtkinter import CTkButton, CTkEntry, CTkLabel, CTkFrame
 
 from config.settings import COLORS, WINDOW_CONFIG
+from utils.background import call_when_done
 from utils.geometry import GeometryUtils
-from core.database import DatabaseManager
 
 class SearchAccountsDialog:
     """Dialog pour rechercher des comptes"""
     
-    def __init__(self, parent, on_search_callback=None):
+    def __init__(self, parent, vault, on_search_callback=None):
         self.parent = parent
         self.on_search_callback = on_search_callback
-        self.db_manager = DatabaseManager()
+        # Gestionnaire partagé de l'application (et son index de recherche)
+        self.vault = vault
+        self.db_manager = vault.database
         
         self.dialog = None
         self.search_entry = None
+        self.search_btn = None
         self.search_type = "all"  # all, site, login
         
         self._create_dialog()
@@ -121,7 +124,7 @@ class SearchAccountsDialog:
 
         
         # Boutons d'action
-        search_btn = CTkButton(
+        self.search_btn = CTkButton(
             main_card,
             text="🔍 Rechercher",
             command=self._on_search,
@@ -149,7 +152,7 @@ class SearchAccountsDialog:
         )
         
         # Et décaler les boutons d'action plus bas :
-        search_btn.place(x=20, y=230)  # Changé de y=210
+        self.search_btn.place(x=20, y=230)  # Changé de y=210
         clear_btn.place(x=130, y=230)  # Changé de y=210
         cancel_btn.place(x=240, y=230)  # Changé de y=210
     
@@ -161,26 +164,20 @@ class SearchAccountsDialog:
         if not search_term:
             return
         
+        # Recherche exacte puis approximative sur le worker des index : jamais
+        # de construction d'index (déchiffrement du coffre) sur le thread Tk
+        if self.db_manager.search_index_ready and self.db_manager.fuzzy_index_ready:
+            self.search_btn.configure(text="⏳ Recherche...", state="disabled")
+        else:
+            self.search_btn.configure(text="⏳ Indexation...", state="disabled")
+        future = self.vault.search_accounts_async(search_term, search_type)
+        call_when_done(self.dialog, future,
+                       lambda accounts: self._on_search_done(accounts, search_term),
+                       self._on_search_error)
+    
+    def _on_search_done(self, filtered_accounts, search_term):
+        """Transmettre les résultats puis fermer le dialogue"""
         try:
-            # Récupérer tous les comptes
-            all_accounts = self.db_manager.get_all_accounts()
-            filtered_accounts = []
-            
-            for account in all_accounts:
-                site, login, password, account_id = account
-                
-                # Effectuer la recherche selon le type
-                if search_type == "all":
-                    if (search_term in site.lower() or 
-                        search_term in login.lower()):
-                        filtered_accounts.append(account)
-                elif search_type == "site":
-                    if search_term in site.lower():
-                        filtered_accounts.append(account)
-                elif search_type == "login":
-                    if search_term in login.lower():
-                        filtered_accounts.append(account)
-            
             # Appeler le callback avec les résultats
             if self.on_search_callback:
                 self.on_search_callback(filtered_accounts, search_term)
@@ -190,12 +187,17 @@ class SearchAccountsDialog:
         except Exception as e:
             print(f"Erreur lors de la recherche : {e}")
     
+    def _on_search_error(self, error):
+        """Échec de la recherche : le dialogue reste ouvert"""
+        print(f"Erreur lors de la recherche : {error}")
+        self.search_btn.configure(text="🔍 Rechercher", state="normal")
+    
     def _on_clear(self):
         """Effacer les filtres et afficher tous les comptes"""
         if self.on_search_callback:
             try:
-                all_accounts = self.db_manager.get_all_accounts()
-                self.on_search_callback(all_accounts, "")
+                # Sans terme de recherche, le tableau réaffiche ses lignes : rien à relire
+                self.on_search_callback([], "")
                 self._close()
             except Exception as e:
                 print(f"Erreur lors de l'effacement : {e}")
@@ -8,18 +8,20 @@ from customtkinter import CTkButton, CTkFrame, CTkLabel, CTkSwitch, CTkOptionMen
 from PIL import ImageTk, Image
 
 from config.settings import COLORS, WINDOW_CONFIG, IMAGES_DIR, MESSAGES
+from utils.background import call_when_done
 from utils.geometry import GeometryUtils
 from gui.widgets.custom_widgets import ModernCard, ModernButton, ModernLabel, show_success, show_error
 from gui.dialogs.master_password import MasterPasswordDialog, MasterPasswordVerificationDialog
-from core.database import DatabaseManager
 
 class SettingsDialog:
     """Dialog des paramètres de l'application"""
     
-    def __init__(self, parent, on_settings_changed=None):
+    def __init__(self, parent, vault, on_settings_changed=None, on_key_rotation_started=None):
         self.parent = parent
         self.on_settings_changed = on_settings_changed
-        self.db_manager = DatabaseManager()
+        self.on_key_rotation_started = on_key_rotation_started
+        self.vault = vault
+        self.db_manager = vault.database
         
         self.dialog = None
         self.theme_var = tk.StringVar(value="dark")
@@ -69,7 +71,7 @@ class SettingsDialog:
     def _create_security_section(self):
         """Créer la section sécurité"""
         # Card pour la sécurité
-        security_card = ModernCard(self.dialog, width=440, height=120)
+        security_card = ModernCard(self.dialog, width=440, height=160)
         security_card.place(x=30, y=80)
         
         # Titre de section
@@ -90,6 +92,28 @@ class SettingsDialog:
         )
         change_master_btn.place(x=20, y=50)
         
+        # Bouton renouveler la clé de chiffrement
+        rotate_key_btn = ModernButton(
+            security_card,
+            text="Renouveler la clé de chiffrement",
+            command=self._rotate_data_key,
+            style="secondary",
+            width=200,
+            height=35
+        )
+        rotate_key_btn.place(x=20, y=100)
+        
+        # Bouton déverrouillage rapide par code PIN
+        quick_unlock_btn = ModernButton(
+            security_card,
+            text="Déverrouillage par code PIN",
+            command=self._configure_quick_unlock,
+            style="secondary",
+            width=180,
+            height=35
+        )
+        quick_unlock_btn.place(x=240, y=100)
+        
         # Switch pour verrouillage automatique
         auto_lock_label = ModernLabel(
             security_card,
@@ -115,7 +139,7 @@ class SettingsDialog:
         """Créer la section apparence"""
         # Card pour l'apparence
         appearance_card = ModernCard(self.dialog, width=440, height=80)
-        appearance_card.place(x=30, y=220)
+        appearance_card.place(x=30, y=260)
         
         # Titre de section
         appearance_title = ModernLabel(
@@ -150,7 +174,7 @@ class SettingsDialog:
         """Créer la section presse-papiers"""
         # Card pour le presse-papiers
         clipboard_card = ModernCard(self.dialog, width=440, height=80)
-        clipboard_card.place(x=30, y=320)
+        clipboard_card.place(x=30, y=360)
         
         # Titre de section
         clipboard_title = ModernLabel(
@@ -191,7 +215,7 @@ class SettingsDialog:
             style="success",
             width=120
         )
-        save_btn.place(x=220, y=420)
+        save_btn.place(x=220, y=460)
         
         # Bouton Annuler
         cancel_btn = ModernButton(
@@ -201,7 +225,7 @@ class SettingsDialog:
             style="secondary",
             width=120
         )
-        cancel_btn.place(x=350, y=420)
+        cancel_btn.place(x=350, y=460)
         
         # Bouton À propos
         about_btn = ModernButton(
@@ -211,23 +235,66 @@ class SettingsDialog:
             style="secondary",
             width=120
         )
-        about_btn.place(x=30, y=420)
+        about_btn.place(x=30, y=460)
     
     def _change_master_password(self):
         """Changer le mot de passe maître"""
         def on_verification_success():
             """Callback appelé après vérification réussie"""
-            dialog = MasterPasswordDialog(self.dialog, self._on_master_password_changed)
+            dialog = MasterPasswordDialog(self.dialog, self.vault, self._on_master_password_changed)
             dialog.show()
         
         # D'abord vérifier l'ancien mot de passe
         verification_dialog = MasterPasswordVerificationDialog(
-            self.dialog, 
+            self.dialog,
+            self.vault,
             on_verification_success,
             "Vérification - Ancien mot de passe"
         )
         verification_dialog.show()
     
+    def _rotate_data_key(self):
+        """Renouveler la clé de données (les comptes sont rechiffrés en arrière-plan)"""
+        if self.db_manager.rotation_pending():
+            show_error(self.dialog, "Une rotation de clé est déjà en cours")
+            return
+        
+        def on_rotation_started(started):
+            """Résultat du démarrage de la rotation (thread Tk)"""
+            if not started:
+                show_error(self.dialog, MESSAGES['error']['invalid_master'])
+                return
+            # La fenêtre principale rechiffre les comptes lot par lot
+            if self.on_key_rotation_started:
+                self.on_key_rotation_started()
+            show_success(self.dialog, "Rotation de la clé démarrée")
+        
+        def on_rotation_error(error):
+            """Échec du démarrage de la rotation (thread Tk)"""
+            print(f"Erreur lors du démarrage de la rotation : {error}")
+            show_error(self.dialog, "Erreur lors du démarrage de la rotation")
+        
+        def on_verification_success(password):
+            """Callback appelé après vérification réussie"""
+            # Dérivation de la KEK sur le worker du coffre
+            call_when_done(self.dialog, self.vault.begin_key_rotation_async(password),
+                           on_rotation_started, on_rotation_error)
+        
+        verification_dialog = MasterPasswordVerificationDialog(
+            self.dialog,
+            self.vault,
+            on_verification_success,
+            "Vérification - Rotation de la clé",
+            pass_password=True
+        )
+        verification_dialog.show()
+    
+    def _configure_quick_unlock(self):
+        """Activer ou désactiver le déverrouillage rapide par code PIN"""
+        from gui.dialogs.quick_unlock import QuickUnlockSetupDialog
+        dialog = QuickUnlockSetupDialog(self.dialog, self.vault)
+        dialog.show()
+    
     def _on_master_password_changed(self):
         """Callback appelé quand le mot de passe maître est changé"""
         show_success(self.dialog, "Mot de passe maître modifié avec succès !")
@@ -246,6 +313,9 @@ class SettingsDialog:
             
             print(f"Sauvegarde des paramètres : {settings}")
             
+            # Un changement de paramètres redemande le mot de passe pour consulter
+            self.vault.revoke_reauthentication()
+            
             # Callback pour informer la fenêtre parent
             if self.on_settings_changed:
                 self.on_settings_changed(settings)
@@ -8,21 +8,23 @@ import customtkinter as ctk
 from customtkinter import CTkButton, CTkLabel, CTkFrame
 
 from config.settings import COLORS, WINDOW_CONFIG
+from utils.background import call_when_done
 from utils.geometry import GeometryUtils
 from gui.widgets.custom_widgets import CustomEntry, show_error
-from core.database import DatabaseManager
 
 class StartupLoginDialog:
     """Dialog de connexion personnalisé pour le démarrage"""
     
-    def __init__(self, parent, on_success_callback=None, on_cancel_callback=None):
+    def __init__(self, parent, vault, on_success_callback=None, on_cancel_callback=None):
         self.parent = parent
         self.on_success_callback = on_success_callback
         self.on_cancel_callback = on_cancel_callback
-        self.db_manager = DatabaseManager()
+        self.vault = vault
         
         self.dialog = None
         self.password_entry = None
+        self.login_btn = None
+        self._busy = False
         
         self._create_dialog()
         self._setup_ui()
@@ -138,7 +140,7 @@ class StartupLoginDialog:
         main_card = self.dialog.winfo_children()[0]
         
         # Bouton Se connecter
-        login_btn = ctk.CTkButton(
+        self.login_btn = ctk.CTkButton(
             main_card,
             text="🚪 Se connecter",
             font=ctk.CTkFont(family="Segoe UI", size=14, weight="bold"),
@@ -149,7 +151,7 @@ class StartupLoginDialog:
             hover_color=COLORS['button_hover'],
             corner_radius=15
         )
-        login_btn.place(x=50, y=270)
+        self.login_btn.place(x=50, y=270)
         
         # Bouton Quitter
         quit_btn = ctk.CTkButton(
@@ -176,8 +178,22 @@ class StartupLoginDialog:
         )
         footer_label.place(x=120, y=500)
     
+    def _set_busy(self, busy: bool):
+        """Afficher l'état de vérification en cours (les saisies sont bloquées)"""
+        self._busy = busy
+        self.login_btn.configure(
+            state="disabled" if busy else "normal",
+            text="⏳ Vérification..." if busy else "🚪 Se connecter"
+        )
+        self.password_entry.configure(state="disabled" if busy else "normal")
+        self.dialog.configure(cursor="watch" if busy else "")
+    
     def _on_login(self):
         """Gestionnaire de connexion"""
+        # Une vérification est déjà en cours (double clic, Entrée répétée)
+        if self._busy:
+            return
+        
         password = self.password_entry.get()
         
         if not password.strip():
@@ -185,8 +201,19 @@ class StartupLoginDialog:
             self.password_entry.focus_set()
             return
         
-        # Vérifier le mot de passe
-        if self.db_manager.verify_master_password(password):
+        # Vérifier le mot de passe et déverrouiller la session sur un worker
+        self._set_busy(True)
+        call_when_done(
+            self.dialog,
+            self.vault.unlock_async(password),
+            self._on_login_result,
+            self._on_login_error
+        )
+    
+    def _on_login_result(self, success: bool):
+        """Résultat du déverrouillage (thread Tk)"""
+        self._set_busy(False)
+        if success:
             print("[✓] Connexion réussie")
             if self.on_success_callback:
                 self.on_success_callback()
@@ -196,6 +223,13 @@ class StartupLoginDialog:
             self.password_entry.delete(0, tk.END)
             self.password_entry.focus_set()
     
+    def _on_login_error(self, error: BaseException):
+        """Échec inattendu du déverrouillage (thread Tk)"""
+        print(f"Erreur lors du déverrouillage : {error}")
+        self._set_busy(False)
+        show_error(self.dialog, "Erreur lors du déverrouillage du coffre")
+        self.password_entry.focus_set()
+    
     def _on_cancel(self):
         """Gestionnaire d'annulation"""
         if self.on_cancel_callback:
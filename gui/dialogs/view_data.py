@@ -10,15 +10,15 @@ from config.settings import COLORS, WINDOW_CONFIG, IMAGES_DIR
 from utils.geometry import GeometryUtils
 from gui.widgets.custom_widgets import CustomEntry
 from gui.dialogs.master_password import MasterPasswordVerificationDialog
-from core.database import DatabaseManager
 
 class ViewDataDialog:
     """Dialog pour visualiser les données d'un compte"""
     
-    def __init__(self, parent, account_data):
+    def __init__(self, parent, vault, account_data):
         self.parent = parent
+        self.vault = vault
         self.account_data = account_data
-        self.db_manager = DatabaseManager()
+        self.db_manager = vault.database
         
         self.dialog = None
         self.site_entry = None
@@ -30,8 +30,14 @@ class ViewDataDialog:
     
     def _verify_master_password(self):
         """Vérifier le mot de passe maître avant d'afficher les données"""
+        # Vérification récente : pas de nouvelle saisie ni de dérivation
+        if self.vault.reauthentication_valid():
+            self._on_master_password_verified()
+            return
+        
         verification_dialog = MasterPasswordVerificationDialog(
             self.parent,
+            self.vault,
             on_success_callback=self._on_master_password_verified,
             title="Confirmation - Master Password"
         )
@@ -191,8 +197,7 @@ class ViewDataDialog:
             
             try:
                 # Récupérer les vraies données depuis la base de données
-                accounts = self.db_manager.get_all_accounts()
-                account = next((acc for acc in accounts if acc[3] == int(account_id)), None)
+                account = self.db_manager.get_account(int(account_id))
                 
                 if account:
                     site, login, password, _ = account
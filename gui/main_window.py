@@ -8,19 +8,24 @@ from customtkinter import CTkButton
 import customtkinter as ctk
 
 from config.settings import WINDOW_CONFIG, COLORS
+from utils.background import call_when_done
 from utils.geometry import GeometryUtils
-from core.database import DatabaseManager
+from core.database import LISTING_FIELDS
+from core.rotation import KeyRotationJob
 from gui.widgets.account_table import AccountTable
+from gui.widgets.live_search import LiveSearchBar
 from gui.widgets.custom_widgets import show_error, show_success
 
 class PasswordManagerApp:
     """Application principale du gestionnaire de mots de passe"""
     
-    def __init__(self):
+    def __init__(self, vault):
         self.root = None
-        self.db_manager = DatabaseManager()
+        self.vault = vault
+        self.db_manager = vault.database
         self.account_table = None
         self.current_count = 1
+        self.rotation_job = None
         
         self._initialize_app()
     
@@ -33,6 +38,10 @@ class PasswordManagerApp:
         self._setup_main_window()
         self._setup_ui()
         self._load_accounts()
+        
+        # Reprendre une rotation de clé interrompue
+        if self.db_manager.rotation_pending():
+            self._start_key_rotation()
     
     def _setup_main_window(self):
         """Configurer la fenêtre principale"""
@@ -47,11 +56,20 @@ class PasswordManagerApp:
         
         # Couleur de fond moderne
         self.root.configure(fg_color=COLORS['primary_bg'])
+        
+        # Activité de l'utilisateur : repousse l'expiration du délai de grâce
+        self.root.bind_all('<Any-KeyPress>', self._on_user_activity, add='+')
+        self.root.bind_all('<Any-ButtonPress>', self._on_user_activity, add='+')
+    
+    def _on_user_activity(self, event=None):
+        """Noter une activité de l'utilisateur"""
+        self.vault.session.touch()
     
     def _setup_ui(self):
         """Configurer l'interface utilisateur"""
         self._create_background()
         self._create_header()
+        self._create_search_status_label()
         self._create_account_table()
         self._create_action_buttons()
     
@@ -108,6 +126,15 @@ class PasswordManagerApp:
             hover_color=COLORS['button_primary']
         )
         settings_btn.place(x=620, y=25)
+        
+        # Filtre instantané
+        self.live_search = LiveSearchBar(
+            self.main_panel,
+            search_func=self._live_search,
+            on_results=self._on_live_search_results,
+            fallback_func=self._live_fuzzy_search
+        )
+        self.live_search.place(x=400, y=25)
     
     def _create_account_table(self):
         """Créer le tableau des comptes"""
@@ -122,7 +149,11 @@ class PasswordManagerApp:
             )
             table_frame.place(x=30, y=100)
             
-            self.account_table = AccountTable(table_frame, on_view_data=self._view_account_data)
+            self.account_table = AccountTable(
+                table_frame,
+                on_view_data=self._view_account_data,
+                password_provider=self.db_manager.get_password
+            )
             self.account_table.place(x=20, y=20, width=810, height=360)
             
         except Exception as e:
@@ -192,14 +223,34 @@ class PasswordManagerApp:
     def _load_accounts(self):
         """Charger les comptes depuis la base de données"""
         try:
-            accounts = self.db_manager.get_all_accounts()
             if self.account_table:
-                self.account_table.load_accounts(accounts)
-                if accounts:
-                    self.current_count = max(account[3] for account in accounts) + 1
+                # Les comptes sont insérés au fil du parcours, sans liste intermédiaire
+                self.account_table.clear_all()
+                indexed = []
+                for site, login, password, account_id in self.db_manager.iter_accounts(fields=LISTING_FIELDS):
+                    self.account_table.insert_account(site, login, password, account_id)
+                    indexed.append((site, login, account_id))
+                self.current_count = (indexed[-1][2] if indexed else 0) + 1
+                
+                # Index de recherche construits en arrière-plan à partir des données déjà déchiffrées
+                self._build_search_indexes(indexed)
         except Exception as e:
             print(f"Erreur lors du chargement des comptes : {e}")
 
+    def _build_search_indexes(self, indexed):
+        """Construire les index de recherche sans bloquer l'interface"""
+        future = self.vault.build_search_indexes_async(indexed, self.db_manager.index_generation)
+        call_when_done(self.root, future, self._on_search_indexes_built, self._on_search_indexes_error)
+
+    def _on_search_indexes_built(self, fuzzy_ready):
+        """Index prêts : relancer le filtre saisi pendant leur construction"""
+        if self.account_table and self.live_search.has_empty_result():
+            self.live_search.refresh()
+
+    def _on_search_indexes_error(self, error):
+        """Échec de la construction des index de recherche"""
+        print(f"Erreur lors de la construction des index de recherche : {error}")
+
     def _add_account(self):
         """Ouvrir le dialogue d'ajout de compte"""
         try:
@@ -212,9 +263,12 @@ class PasswordManagerApp:
     def _on_account_saved(self, site: str, login: str, password: str):
         """Callback appelé quand un compte est sauvegardé"""
         try:
+            if self.db_manager.account_exists(site, login):
+                raise ValueError("Un compte existe déjà pour ce site et ce login")
             account_id = self.db_manager.create_account(site, login, password)
             if self.account_table:
                 self.account_table.insert_account(site, login, password, account_id)
+                self.live_search.refresh()
             self.current_count += 1
         except Exception as e:
             print(f"Erreur lors de la sauvegarde : {e}")
@@ -234,6 +288,7 @@ class PasswordManagerApp:
         try:
             self.db_manager.delete_account(int(account_id))
             self.account_table.remove_selected()
+            self.live_search.refresh()
             show_success(self.root, "Le compte a été supprimé")
         except Exception as e:
             print(f"Erreur lors de la suppression : {e}")
@@ -253,8 +308,7 @@ class PasswordManagerApp:
         # Récupérer les vraies données depuis la base de données (non masquées)
         try:
             account_id = selected_data[3]
-            accounts = self.db_manager.get_all_accounts()
-            account = next((acc for acc in accounts if acc[3] == int(account_id)), None)
+            account = self.db_manager.get_account(int(account_id))
             
             if account:
                 # Ouvrir le dialogue d'édition avec les vraies données
@@ -274,20 +328,28 @@ class PasswordManagerApp:
             self.db_manager.update_account(account_id, site, login, password)
             if self.account_table:
                 self.account_table.update_account(str(account_id), site, login, password)
+                self.live_search.refresh()
             show_success(self.root, "Le compte a été modifié avec succès")
         except Exception as e:
             print(f"Erreur lors de la modification : {e}")
             show_error(self.root, "Erreur lors de la modification du compte")
 
     def _view_account_data(self, account_data):
-        """Afficher les données d'un compte"""
-        print(f"Visualisation du compte : {account_data}")  # Placeholder
+        """Afficher les données d'un compte (après vérification ou pendant le délai de grâce)"""
+        try:
+            from gui.dialogs.view_data import ViewDataDialog
+            dialog = ViewDataDialog(self.root, self.vault, account_data)
+            dialog.show()
+        except Exception as e:
+            print(f"Erreur lors de l'affichage du compte : {e}")
+            show_error(self.root, "Erreur lors de l'affichage du compte")
 
     def _open_settings(self):
         """Ouvrir le dialogue des paramètres"""
         try:
             from gui.dialogs.settings import SettingsDialog
-            dialog = SettingsDialog(self.root, self._on_settings_changed)
+            dialog = SettingsDialog(self.root, self.vault, self._on_settings_changed,
+                                    self._start_key_rotation)
             dialog.show()
         except Exception as e:
             print(f"Erreur lors de l'ouverture des paramètres : {e}")
@@ -315,20 +377,79 @@ class PasswordManagerApp:
             print(f"Erreur lors de l'application des paramètres : {e}")
             show_error(self.root, "Erreur lors de l'application des paramètres")
 
+    def _start_key_rotation(self):
+        """Rechiffrer les comptes avec la nouvelle clé, un lot par tour de boucle Tk"""
+        if self.rotation_job is not None:
+            return
+        self.rotation_job = KeyRotationJob(self.db_manager, on_progress=self._on_rotation_progress)
+        self.root.after(1, self._rotation_step)
+
+    def _rotation_step(self):
+        """Traiter un lot puis rendre la main à l'interface"""
+        try:
+            if self.rotation_job.step():
+                self.root.after(1, self._rotation_step)
+                return
+            show_success(self.root, "Clé de chiffrement renouvelée !")
+        except Exception as e:
+            # Le point de reprise est enregistré : la rotation reprendra au prochain démarrage
+            print(f"Erreur lors de la rotation de la clé : {e}")
+            show_error(self.root, "Rotation de la clé interrompue")
+        self.rotation_job = None
+        self._update_search_status("")
+
+    def _on_rotation_progress(self, progress):
+        """Afficher l'avancement de la rotation"""
+        if progress['finished']:
+            return
+        self._update_search_status(
+            f"Rotation de la clé : {progress['done']}/{progress['total']} "
+            f"({progress['percent']:.0f} %, {progress['rows_per_second']:.0f} comptes/s)"
+        )
+
     def _search_accounts(self):
         """Fonction de recherche"""
         try:
             from gui.dialogs.search_accounts import SearchAccountsDialog
-            dialog = SearchAccountsDialog(self.root, self._on_search_results)
+            dialog = SearchAccountsDialog(self.root, self.vault, self._on_search_results)
             dialog.show()
         except Exception as e:
             print(f"Erreur lors de l'ouverture de la recherche : {e}")
             
+    def _live_search(self, query, search_type, candidates):
+        """Recherche utilisée par le filtre instantané"""
+        if not self.db_manager.search_index_ready:
+            # Index en construction : le filtre est relancé quand il est prêt
+            return []
+        return self.db_manager.search_accounts(query, search_type, candidates=candidates)
+
+    def _live_fuzzy_search(self, query, search_type):
+        """Repli tolérant aux fautes de frappe, exécuté sur le worker des index"""
+        if not self.db_manager.fuzzy_index_ready:
+            # Jamais de construction pendant la frappe : l'index arrive en arrière-plan
+            return None
+        return self.vault.fuzzy_search_async(query, search_type)
+    
+    def _on_live_search_results(self, account_ids, query):
+        """Appliquer le résultat du filtre instantané au tableau (différentiel)"""
+        if not self.account_table:
+            return
+        self.account_table.show_only(account_ids)
+        if account_ids is None:
+            self._update_search_status("")
+        elif not self.db_manager.search_index_ready:
+            self._update_search_status("Indexation des comptes en cours...")
+        else:
+            self._update_search_status(f"{len(account_ids)} résultat(s) pour '{query}'")
+    
     def _on_search_results(self, filtered_accounts, search_term):
         """Callback appelé avec les résultats de recherche"""
         try:
             if self.account_table:
-                self.account_table.load_accounts(filtered_accounts)
+                if search_term:
+                    self.account_table.show_only([account[3] for account in filtered_accounts])
+                else:
+                    self.account_table.show_only(None)
                 
                 # Mettre à jour le statut
                 if search_term:
@@ -363,4 +484,7 @@ class PasswordManagerApp:
     
     def run(self):
         """Lancer l'application"""
-        self.root.mainloop()
\ No newline at end of file
+        try:
+            self.root.mainloop()
+        finally:
+            self.vault.close()
\ No newline at end of file
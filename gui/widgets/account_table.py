@@ -11,10 +11,12 @@ from config.settings import COLORS
 class AccountTable:
     """Widget personnalisé pour afficher les comptes"""
     
-    def __init__(self, parent, on_view_data=None):
+    def __init__(self, parent, on_view_data=None, password_provider=None):
         self.parent = parent
         self.on_view_data = on_view_data
+        self.password_provider = password_provider  # Déchiffrement à la demande (account_id -> str)
         self.clipboard = ClipboardManager()
+        self._detached = set()  # Lignes masquées par un filtre (conservées par le Treeview)
         self._setup_style()
         self._create_table()
         self._create_context_menu()
@@ -172,9 +174,12 @@ class AccountTable:
     def _copy_password(self):
         """Copier le mot de passe dans le presse-papiers"""
         values = self._get_selected_values()
-        if values and len(values) > 2:
+        if values and len(values) > 3 and self.password_provider:
             # Le mot de passe est masqué dans l'affichage, il faut le récupérer de la DB
-            print("Mot de passe copié (fonctionnalité à implémenter)")
+            password = self.password_provider(int(values[3]))
+            if password:
+                self.clipboard.copy_to_clipboard(password)
+                print("Mot de passe copié")
     
     def _view_data(self):
         """Afficher les données détaillées"""
@@ -184,10 +189,17 @@ class AccountTable:
                 values = self.table.item(selected, 'values')
                 self.on_view_data(values)
     
-    def insert_account(self, site: str, login: str, password: str, account_id: int):
+    @staticmethod
+    def _mask_password(password: Optional[str]) -> str:
+        """Masquer un mot de passe (None = non déchiffré, masque complet)"""
+        if password is None:
+            return "•" * 8
+        return "•" * min(8, len(password))
+
+    def insert_account(self, site: str, login: str, password: Optional[str], account_id: int):
         """Insérer un nouveau compte dans le tableau"""
         # Masquer le mot de passe pour l'affichage
-        masked_password = "•" * min(8, len(password)) if password else ""
+        masked_password = self._mask_password(password)
         
         self.table.insert(
             parent='',
@@ -196,9 +208,9 @@ class AccountTable:
             values=(site, login, masked_password, account_id)
         )
     
-    def update_account(self, item_id: str, site: str, login: str, password: str):
+    def update_account(self, item_id: str, site: str, login: str, password: Optional[str]):
         """Mettre à jour un compte dans le tableau"""
-        masked_password = "•" * min(8, len(password)) if password else ""
+        masked_password = self._mask_password(password)
         self.table.item(item_id, values=(site, login, masked_password, item_id))
     
     def remove_selected(self):
@@ -226,8 +238,48 @@ class AccountTable:
     
     def clear_all(self):
         """Vider le tableau"""
-        for item in self.table.get_children():
-            self.table.delete(item)
+        items = list(self.table.get_children()) + list(self._detached)
+        if items:
+            self.table.delete(*items)
+        self._detached.clear()
+    
+    def show_only(self, account_ids: Optional[List[int]] = None):
+        """
+        Filtrer l'affichage en n'appliquant que la différence avec l'état courant
+        
+        Les lignes masquées sont détachées (pas supprimées) et réattachées à
+        leur place : aucune ligne n'est recréée. Une liste d'IDs est affichée
+        dans son ordre (résultats classés par pertinence) ; sans filtre, le
+        tableau revient à l'ordre des IDs.
+        
+        Args:
+            account_ids: IDs à afficher, dans l'ordre voulu (None = tout afficher)
+        """
+        current = list(self.table.get_children())
+        
+        if account_ids is None:
+            wanted = sorted(set(current) | self._detached, key=int)
+        else:
+            known = set(current) | self._detached
+            wanted = list(dict.fromkeys(str(account_id) for account_id in account_ids
+                                        if str(account_id) in known))
+        
+        if wanted == current:
+            return
+        
+        wanted_set = set(wanted)
+        to_hide = [item for item in current if item not in wanted_set]
+        if to_hide:
+            self.table.detach(*to_hide)
+            self._detached.update(to_hide)
+        
+        # Si les lignes restantes sont déjà dans l'ordre, on n'insère que les manquantes
+        remaining = [item for item in current if item in wanted_set]
+        in_order = remaining == [item for item in wanted if item not in self._detached]
+        for index, item in enumerate(wanted):
+            if item in self._detached or not in_order:
+                self.table.move(item, '', index)
+                self._detached.discard(item)
     
     def load_accounts(self, accounts):
         """Charger une liste de comptes dans le tableau"""
@@ -0,0 +1,128 @@
+"""
+Barre de recherche instantanée (filtrage pendant la saisie)
+"""
+
+from typing import Callable, List, Optional
+from customtkinter import CTkEntry
+
+from config.settings import COLORS, SEARCH
+from utils.background import call_when_done
+
+class LiveSearchBar:
+    """
+    Champ de filtre avec anti-rebond et affinage incrémental
+
+    - Les frappes sont regroupées : la recherche n'est lancée qu'après
+      SEARCH['debounce_ms'] sans nouvelle saisie (l'appel en attente est annulé).
+    - Si la requête prolonge la précédente ("git" -> "gith"), seuls les
+      résultats précédents sont revérifiés au lieu de tout le coffre.
+    - Sans résultat exact, la recherche de repli (approximative) s'exécute sur
+      un worker ; son résultat revient sur le thread Tk.
+    - Un résultat obtenu pour une requête déjà dépassée est ignoré.
+    """
+
+    def __init__(self, parent, search_func: Callable, on_results: Callable,
+                 search_type: str = "all", fallback_func: Optional[Callable] = None, **kwargs):
+        """
+        Args:
+            parent: Widget parent
+            search_func: search_func(query, search_type, candidates) -> comptes
+            on_results: on_results(account_ids ou None, query), None = aucun filtre
+            search_type: "all", "site" ou "login"
+            fallback_func: fallback_func(query, search_type) -> Future des comptes,
+                           ou None si le repli n'est pas disponible
+        """
+        self.parent = parent
+        self.search_func = search_func
+        self.on_results = on_results
+        self.fallback_func = fallback_func
+        self.search_type = search_type
+
+        self._pending = None
+        self._generation = 0
+        self._last_query = ""
+        self._last_ids: Optional[List[int]] = None
+
+        default_config = {
+            'width': 200,
+            'height': 30,
+            'placeholder_text': "🔍 Filtrer...",
+            'fg_color': COLORS['input_bg'],
+            'border_color': COLORS['input_border'],
+            'text_color': COLORS['input_text']
+        }
+        default_config.update(kwargs)
+
+        self.entry = CTkEntry(parent, **default_config)
+        self.entry.bind('<KeyRelease>', self._on_key)
+        self.entry.bind('<Escape>', lambda e: self.clear())
+
+    def _on_key(self, event=None):
+        """Reprogrammer la recherche à chaque frappe (anti-rebond)"""
+        self._generation += 1
+        if self._pending is not None:
+            self.entry.after_cancel(self._pending)
+        self._pending = self.entry.after(SEARCH['debounce_ms'], self._run, self._generation)
+
+    def _run(self, generation: int):
+        """Exécuter la recherche si elle correspond encore à la dernière saisie"""
+        self._pending = None
+        if generation != self._generation:
+            return
+
+        query = self.entry.get().strip().lower()
+        if not query:
+            self._last_query, self._last_ids = "", None
+            self.on_results(None, "")
+            return
+        if query == self._last_query:
+            return
+
+        # Affinage : la nouvelle requête contient l'ancienne, les résultats aussi
+        candidates = None
+        if self._last_ids is not None and self._last_query and query.startswith(self._last_query):
+            candidates = self._last_ids
+
+        try:
+            accounts = self.search_func(query, self.search_type, candidates)
+        except Exception as e:
+            print(f"Erreur lors du filtrage : {e}")
+            return
+
+        if generation != self._generation:
+            return
+        if not accounts and self.fallback_func is not None:
+            future = self.fallback_func(query, self.search_type)
+            if future is not None:
+                call_when_done(self.entry, future,
+                               lambda found: self._deliver(generation, query, found),
+                               lambda e: print(f"Erreur lors du filtrage approximatif : {e}"))
+                return
+        self._deliver(generation, query, accounts)
+
+    def _deliver(self, generation: int, query: str, accounts):
+        """Publier les résultats s'ils correspondent encore à la dernière saisie"""
+        if generation != self._generation:
+            return
+        self._last_query = query
+        self._last_ids = [account[3] for account in accounts]
+        self.on_results(self._last_ids, query)
+
+    def has_empty_result(self) -> bool:
+        """True si le filtre courant n'a trouvé aucun compte"""
+        return bool(self._last_query) and self._last_ids == []
+
+    def refresh(self):
+        """Relancer le filtre courant sans cache (après une modification du coffre)"""
+        self._last_query, self._last_ids = "", None
+        self._generation += 1
+        self._run(self._generation)
+
+    def clear(self):
+        """Effacer le filtre"""
+        self.entry.delete(0, 'end')
+        self.refresh()
+
+    def place(self, **kwargs):
+        """Positionner la barre de recherche"""
+        self.entry.place(**kwargs)
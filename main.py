@@ -29,20 +29,21 @@ ctk.set_default_color_theme("blue")
 sys.path.append(str(Path(__file__).parent))
 
 from gui.main_window import PasswordManagerApp
-from core.database import DatabaseManager
+from core.vault import VaultService
 from gui.dialogs.master_password import MasterPasswordDialog, MasterPasswordVerificationDialog
 
 class AuthenticationManager:
     """Gestionnaire d'authentification au démarrage"""
     
-    def __init__(self):
-        self.db_manager = DatabaseManager()
+    def __init__(self, vault):
+        self.vault = vault
         self.authenticated = False
         self.setup_window = None
+        self._use_password = False
     
     def check_authentication_required(self):
         """Vérifier si une authentification est requise"""
-        return self.db_manager.has_master_password()
+        return self.vault.has_master_password()
     
     def show_first_time_setup(self):
         """Afficher le setup de première fois"""
@@ -63,6 +64,7 @@ class AuthenticationManager:
         from gui.dialogs.master_password import MasterPasswordDialog
         dialog = MasterPasswordDialog(
             self.setup_window, 
+            self.vault,
             self._on_first_setup_complete
         )
         dialog.show()
@@ -73,15 +75,35 @@ class AuthenticationManager:
         self.setup_window = ctk.CTk()
         self.setup_window.withdraw()  # Cacher la fenêtre principale
         
+        # Déverrouillage rapide par code PIN s'il est activé et encore valable
+        if self.vault.quick_unlock_available():
+            from gui.dialogs.quick_unlock import QuickUnlockDialog
+            self._use_password = False
+            dialog = QuickUnlockDialog(
+                self.setup_window,
+                self.vault,
+                self._on_login_success,
+                self._on_use_password,
+                self._on_login_cancelled
+            )
+            dialog.show()
+            if not self._use_password:
+                return
+        
         # Dialog de connexion personnalisé
         from gui.dialogs.startup_login import StartupLoginDialog
         dialog = StartupLoginDialog(
             self.setup_window,
+            self.vault,
             self._on_login_success,
             self._on_login_cancelled
         )
         dialog.show()
 
+    def _on_use_password(self):
+        """Callback appelé pour revenir au mot de passe maître"""
+        self._use_password = True
+    
     def _on_login_cancelled(self):
         """Callback appelé si l'utilisateur annule la connexion"""
         print("[i] Connexion annulée par l'utilisateur")
@@ -187,8 +209,11 @@ def main():
         print("[*] Configuration du thème moderne...")
         setup_modern_theme()
         
+        print("[*] Ouverture du coffre...")
+        vault = VaultService()
+        
         print("[*] Initialisation du système d'authentification...")
-        auth_manager = AuthenticationManager()
+        auth_manager = AuthenticationManager(vault)
         
         # Vérifier si c'est la première utilisation
         if not auth_manager.check_authentication_required():
@@ -202,6 +227,7 @@ def main():
         
         # Vérifier si l'authentification a réussi
         if not auth_manager.is_authenticated():
+            vault.close()
             print("[i] Authentification annulée par l'utilisateur")
             print("[*] Fermeture de l'application...")
             sys.exit(0)
@@ -210,7 +236,7 @@ def main():
         print("[*] Lancement de l'interface principale...")
         
         # Lancer l'application principale
-        app = PasswordManagerApp()
+        app = PasswordManagerApp(vault)
         # Configurer les polices après création de la fenêtre principale
         setup_modern_fonts()
         
@@ -0,0 +1,93 @@
+"""
+Configuration commune des tests
+"""
+
+import base64
+import hashlib
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+# Dérivations au coût minimal : seule la logique du coffre est testée
+os.environ.setdefault('PASSWORD_VAULT_KDF_TARGET_MS', '1')
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from cryptography.fernet import Fernet
+
+from core.database import DatabaseManager
+from core.encryption import legacy_key
+from core.kdf import LEGACY_KDF
+from core.session import SessionKeyManager
+
+@pytest.fixture
+def master_password() -> str:
+    """Mot de passe maître des coffres de test"""
+    return "maître-1"
+
+@pytest.fixture
+def accounts():
+    """Comptes (site, login, password) des coffres de test"""
+    return [(f"site{i}.example", f"login{i}", f"secret-{i}") for i in range(40)]
+
+@pytest.fixture
+def db_path(tmp_path) -> Path:
+    """Chemin d'une base de données vierge"""
+    return tmp_path / "vault.db"
+
+@pytest.fixture
+def open_database(db_path):
+    """Ouvrir la base (nouvelle session à chaque appel) ; fermée en fin de test"""
+    opened = []
+
+    def _open() -> DatabaseManager:
+        database = DatabaseManager(db_path, key_session=SessionKeyManager())
+        opened.append(database)
+        return database
+
+    yield _open
+    for database in opened:
+        database.lock()
+        database.close()
+
+def _legacy_hash(password: str) -> str:
+    """Hash du mot de passe maître au format d'origine (salt hexadécimal + PBKDF2 en base64)"""
+    salt = "0123456789abcdef0123456789abcdef"
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt.encode('utf-8'),
+                                 LEGACY_KDF.iterations)
+    return salt + base64.b64encode(digest).decode('utf-8')
+
+@pytest.fixture
+def legacy_database(db_path, master_password, accounts) -> Path:
+    """Base d'origine : schéma sans version, champs Fernet (clé fixe) en base64 dans du TEXT"""
+    fernet = Fernet(base64.urlsafe_b64encode(legacy_key()))
+
+    def encrypt(value: str) -> str:
+        return base64.urlsafe_b64encode(fernet.encrypt(value.encode())).decode()
+
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE Accounts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            site TEXT NOT NULL,
+            login TEXT NOT NULL,
+            password TEXT NOT NULL
+        );
+        CREATE TABLE MasterPassword (
+            id INTEGER PRIMARY KEY,
+            password_hash TEXT NOT NULL
+        );
+    """)
+    conn.executemany("INSERT INTO Accounts (site, login, password) VALUES (?, ?, ?)",
+                     [tuple(encrypt(value) for value in account) for account in accounts])
+    conn.execute("INSERT INTO MasterPassword (id, password_hash) VALUES (1, ?)",
+                 (_legacy_hash(master_password),))
+    conn.commit()
+    conn.close()
+    return db_path
+
+def read_all(database: DatabaseManager):
+    """Comptes déchiffrés, sans l'ID"""
+    return [account[:3] for account in database.get_all_accounts()]
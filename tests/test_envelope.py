@@ -0,0 +1,76 @@
+"""
+Clé de données enveloppée sous le mot de passe maître
+"""
+
+import sqlite3
+
+from conftest import read_all
+from core import kdf
+from core.ciphers import CIPHERS_BY_VERSION
+
+def _stored_passwords(path):
+    """Colonne password telle qu'elle est stockée"""
+    conn = sqlite3.connect(path)
+    try:
+        return [row[0] for row in conn.execute("SELECT password FROM Accounts ORDER BY id")]
+    finally:
+        conn.close()
+
+def test_legacy_vault_gets_an_enveloped_data_key(legacy_database, open_database,
+                                                 master_password, accounts):
+    database = open_database()
+    assert not database.unlock("mauvais mot de passe")
+    assert database.unlock(master_password)
+
+    # Clé aléatoire enveloppée, comptes de l'ancienne clé fixe rechiffrés en AEAD
+    assert database.get_metadata('wrapped_key') is not None
+    assert database.get_metadata('kek_kdf') is not None
+    assert {value[0] for value in _stored_passwords(legacy_database)} <= set(CIPHERS_BY_VERSION)
+    assert read_all(database) == accounts
+    assert database.find_accounts(site="SITE7.example ")[0][:3] == accounts[7]
+
+    database.lock()
+    reopened = open_database()
+    assert reopened.unlock(master_password)
+    assert read_all(reopened) == accounts
+
+def test_password_derived_vault_is_enveloped_without_reencryption(db_path, open_database,
+                                                                 master_password, accounts):
+    # Version intermédiaire : clé de données dérivée directement du mot de passe
+    vault_kdf, salt = kdf.ScryptKDF(14), b"s" * 16
+    database = open_database()
+    database.encryption.session.unlock(vault_kdf.derive(master_password, salt))
+    database.create_accounts(accounts)
+    database.encryption.session.lock()
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO MasterPassword (id, password_hash) VALUES (1, ?)",
+                 (database.encryption.hash_password(master_password, vault_kdf),))
+    conn.execute("INSERT INTO VaultMetadata (key, value) VALUES ('vault_kdf', ?)",
+                 (kdf.encode(vault_kdf, salt),))
+    conn.commit()
+    conn.close()
+    before = _stored_passwords(db_path)
+
+    assert database.unlock(master_password)
+    # La clé dérivée devient la clé de données : seule l'enveloppe est écrite
+    assert _stored_passwords(db_path) == before
+    assert database.get_metadata('vault_kdf') is None
+    assert database.get_metadata('wrapped_key') is not None
+    assert read_all(database) == accounts
+
+def test_password_change_only_rewraps_the_key(db_path, open_database, master_password, accounts):
+    database = open_database()
+    database.set_master_password(master_password)
+    database.create_accounts(accounts)
+    before = _stored_passwords(db_path)
+    wrapped_key = database.get_metadata('wrapped_key')
+
+    database.set_master_password("maître-2")
+    assert _stored_passwords(db_path) == before
+    assert database.get_metadata('wrapped_key') != wrapped_key
+
+    database.lock()
+    reopened = open_database()
+    assert not reopened.unlock(master_password)
+    assert reopened.unlock("maître-2")
+    assert read_all(reopened) == accounts
@@ -0,0 +1,73 @@
+"""
+Migrations du schéma : champs chiffrés TEXT (base64) convertis en BLOB
+"""
+
+import sqlite3
+
+from conftest import read_all
+from core.ciphers import legacy_text_to_blob
+from core.migrations import SCHEMA_VERSION
+
+def _column_types(path):
+    """Types SQLite des champs chiffrés de toutes les lignes"""
+    conn = sqlite3.connect(path)
+    try:
+        return {value_type for row in conn.execute(
+            "SELECT typeof(site), typeof(login), typeof(password) FROM Accounts"
+        ) for value_type in row}
+    finally:
+        conn.close()
+
+def _schema_version(path) -> int:
+    """PRAGMA user_version de la base"""
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+
+def test_legacy_fields_are_converted_to_blob(legacy_database, open_database,
+                                             master_password, accounts):
+    assert _column_types(legacy_database) == {'text'}
+
+    database = open_database()
+    # Migration sans clé : base64 retiré, jetons Fernet conservés tels quels
+    assert _schema_version(legacy_database) == SCHEMA_VERSION
+    assert _column_types(legacy_database) == {'blob'}
+
+    assert database.unlock(master_password)
+    assert read_all(database) == accounts
+
+def test_blob_conversion_resumes_after_interruption(legacy_database, open_database,
+                                                    master_password, accounts):
+    # Migration v3 interrompue : une partie des lignes est déjà convertie
+    conn = sqlite3.connect(legacy_database)
+    conn.executescript("""
+        ALTER TABLE Accounts ADD COLUMN site_index TEXT;
+        ALTER TABLE Accounts ADD COLUMN login_index TEXT;
+        CREATE TABLE VaultMetadata (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        PRAGMA user_version = 2;
+    """)
+    rows = conn.execute("SELECT id, site, login, password FROM Accounts WHERE id <= 15").fetchall()
+    conn.executemany("UPDATE Accounts SET site = ?, login = ?, password = ? WHERE id = ?",
+                     [(legacy_text_to_blob(site), legacy_text_to_blob(login),
+                       legacy_text_to_blob(password), account_id)
+                      for account_id, site, login, password in rows])
+    conn.commit()
+    conn.close()
+
+    database = open_database()
+    assert _schema_version(legacy_database) == SCHEMA_VERSION
+    assert _column_types(legacy_database) == {'blob'}
+    assert database.unlock(master_password)
+    assert read_all(database) == accounts
+
+def test_new_vault_declares_blob_columns(db_path, open_database):
+    open_database()
+    conn = sqlite3.connect(db_path)
+    try:
+        declared = {row[1]: row[2] for row in conn.execute("PRAGMA table_info(Accounts)")}
+    finally:
+        conn.close()
+    assert [declared[column] for column in ('site', 'login', 'password')] == ['BLOB'] * 3
+    assert _schema_version(db_path) == SCHEMA_VERSION
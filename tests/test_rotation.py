@@ -0,0 +1,99 @@
+"""
+Rotation de la clé de données, interrompue puis reprise
+"""
+
+import pytest
+
+from conftest import read_all
+from core.rotation import KeyRotationJob
+
+@pytest.fixture
+def vault(open_database, master_password, accounts):
+    """Coffre déverrouillé contenant les comptes de test"""
+    database = open_database()
+    database.set_master_password(master_password)
+    database.create_accounts(accounts)
+    return database
+
+def _assert_rotation_finished(database):
+    """Plus d'ancienne clé, ni dans la base ni dans la session"""
+    assert not database.rotation_pending()
+    assert database.get_metadata('previous_wrapped_key') is None
+    assert database.get_metadata('rotation_checkpoint') is None
+    assert database.encryption.session.get_previous_key() is None
+
+def test_rotation_resumes_after_interruption(vault, open_database, master_password, accounts):
+    job = KeyRotationJob(vault, batch_size=10)
+    assert not job.start("mauvais mot de passe")
+    assert job.start(master_password)
+    job.step()
+    job.step()
+    vault.create_account("new.example", "nouveau", "secret")
+    accounts = accounts + [("new.example", "nouveau", "secret")]
+
+    # Arrêt brutal : seule la base survit
+    vault.lock()
+    reopened = open_database()
+    assert reopened.rotation_pending()
+    assert reopened.unlock(master_password)
+    assert read_all(reopened) == accounts
+    assert reopened.find_accounts(site="site3.example")[0][:3] == accounts[3]
+    assert reopened.find_accounts(site="site30.example")[0][:3] == accounts[30]
+
+    progress = KeyRotationJob(reopened, batch_size=10).run()
+    assert progress['finished'] and progress['done'] == progress['total'] == len(accounts)
+    _assert_rotation_finished(reopened)
+
+    reopened.lock()
+    final = open_database()
+    assert final.unlock(master_password)
+    assert final.encryption.session.get_previous_key() is None
+    assert read_all(final) == accounts
+
+def test_password_change_during_rotation(vault, open_database, master_password, accounts):
+    job = KeyRotationJob(vault, batch_size=10)
+    assert job.start(master_password)
+    job.step()
+
+    vault.set_master_password("maître-2")
+    # L'ancienne clé reste disponible, enveloppée sous le nouveau mot de passe
+    assert vault.rotation_pending()
+    vault.lock()
+    reopened = open_database()
+    assert not reopened.unlock(master_password)
+    assert reopened.unlock("maître-2")
+    assert read_all(reopened) == accounts
+
+    KeyRotationJob(reopened, batch_size=10).run()
+    _assert_rotation_finished(reopened)
+    assert read_all(reopened) == accounts
+
+def test_password_change_after_last_batch_does_not_restart_rotation(vault, master_password):
+    session = vault.encryption.session
+    old_key = session.get_key()
+    job = KeyRotationJob(vault, batch_size=10)
+    assert job.start(master_password)
+    job.run()
+
+    # Changement de mot de passe entre la validation du dernier lot et la mise
+    # à jour de la session : la session connaît encore l'ancienne clé
+    session.unlock(session.get_key(), old_key)
+    vault.set_master_password("maître-2")
+    session.unlock(session.get_key())
+    _assert_rotation_finished(vault)
+
+def test_rotate_batch_without_checkpoint_finishes_rotation(vault, master_password, accounts):
+    assert vault.begin_key_rotation(master_password)
+    previous_wrapped_key = vault.get_metadata('previous_wrapped_key')
+    assert vault.rotate_batch(len(accounts) + 1) == len(accounts)
+    # Ancienne clé encore enveloppée mais plus de point de reprise
+    # (état laissé par un changement de mot de passe concurrent au dernier lot)
+    with vault._transaction("test") as cursor:
+        vault._set_metadata(cursor, 'previous_wrapped_key', previous_wrapped_key)
+    vault.lock()
+    assert vault.unlock(master_password)
+    assert vault.rotation_pending()
+
+    assert not KeyRotationJob(vault, batch_size=10).step()
+    _assert_rotation_finished(vault)
+    assert read_all(vault) == accounts
@@ -0,0 +1,47 @@
+"""
+Recherche approximative : automate de Levenshtein élagué et plafond de candidats
+"""
+
+import random
+
+from core.search_index import FuzzyIndex, LevenshteinTrie
+
+def _distance(first, second) -> int:
+    """Distance d'édition calculée sur la matrice complète"""
+    previous = list(range(len(second) + 1))
+    for row, first_char in enumerate(first, 1):
+        current = [row]
+        for column, second_char in enumerate(second, 1):
+            current.append(min(current[-1] + 1, previous[column] + 1,
+                               previous[column - 1] + (first_char != second_char)))
+        previous = current
+    return previous[-1]
+
+def test_trie_matches_full_matrix():
+    rng = random.Random(3)
+    terms = {''.join(rng.choices("abcde.-", k=rng.randint(1, 9))) for _ in range(1500)}
+    trie = LevenshteinTrie()
+    for term in terms:
+        trie.add(term)
+    removed = set(rng.sample(sorted(terms), 150))
+    for term in removed:
+        trie.discard(term)
+    remaining = terms - removed
+
+    for _ in range(100):
+        query = ''.join(rng.choices("abcde.-", k=rng.randint(1, 10)))
+        for max_distance in (0, 1, 2):
+            expected = sorted((_distance(query, term), term) for term in remaining
+                              if _distance(query, term) <= max_distance)
+            assert sorted(trie.search(query, max_distance)) == expected
+
+def test_fuzzy_search_keeps_closest_candidates_within_limit():
+    index = FuzzyIndex()
+    index.build([(f"site{i}.example", "exemple", i) for i in range(50)]
+                + [("exact.example", "exmple", 100), ("far.example", "exemples", 101)])
+
+    results = index.search("exmple", "login", max_distance=2, limit=5)
+    # Les plus proches d'abord : la distance 2 n'entre pas dans le plafond
+    assert results[0][2:] == (100, 0)
+    assert [distance for _, _, _, distance in results[1:]] == [1] * 4
+    assert len(index.search("exmple", "login", max_distance=2)) == 52
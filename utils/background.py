@@ -0,0 +1,51 @@
+"""
+Retour sur le thread Tk du résultat d'un traitement d'arrière-plan
+
+Tkinter n'est pas thread-safe : un worker ne doit jamais toucher aux widgets.
+Le thread Tk interroge donc le Future avec after() et appelle les callbacks
+lui-même, sans jamais bloquer la boucle d'événements.
+"""
+
+import tkinter as tk
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+import logging
+
+# Intervalle d'interrogation du Future (ms)
+POLL_MS = 50
+
+def call_when_done(widget, future: Future, on_done: Callable[[Any], None],
+                   on_error: Optional[Callable[[BaseException], None]] = None,
+                   poll_ms: int = POLL_MS):
+    """
+    Appeler on_done(résultat) ou on_error(exception) sur le thread Tk
+    quand le Future est terminé
+
+    Si le widget est détruit entre-temps (dialog fermé), le résultat est ignoré.
+
+    Args:
+        widget: Widget Tk qui porte la boucle after()
+        future: Traitement lancé sur un worker
+        on_done: Callback appelé avec le résultat
+        on_error: Callback appelé avec l'exception levée par le traitement
+        poll_ms: Intervalle d'interrogation
+    """
+    def poll():
+        try:
+            if not widget.winfo_exists():
+                return
+            if not future.done():
+                widget.after(poll_ms, poll)
+                return
+        except tk.TclError:
+            return
+
+        error = future.exception()
+        if error is None:
+            on_done(future.result())
+        elif on_error is not None:
+            on_error(error)
+        else:
+            logging.error(f"Erreur lors du traitement en arrière-plan : {error}")
+
+    widget.after(poll_ms, poll)
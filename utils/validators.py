@@ -3,7 +3,7 @@ Fonctions de validation des données
 """
 
 from typing import Tuple, Optional
-from config.settings import VALIDATION, MESSAGES
+from config.settings import VALIDATION, MESSAGES, QUICK_UNLOCK
 
 class ValidationError(Exception):
     """Exception personnalisée pour les erreurs de validation"""
@@ -37,6 +37,26 @@ class Validator:
         
         return True, None
     
+    @staticmethod
+    def validate_pin(pin: str, confirmation: str) -> Tuple[bool, Optional[str]]:
+        """
+        Valider un code PIN de déverrouillage rapide et sa confirmation
+        
+        Args:
+            pin: Code PIN
+            confirmation: Confirmation du code PIN
+            
+        Returns:
+            Tuple (is_valid, error_message)
+        """
+        if not pin.isdigit() or len(pin) < QUICK_UNLOCK['min_pin_length']:
+            return False, MESSAGES['error']['invalid_pin']
+        
+        if pin != confirmation:
+            return False, MESSAGES['error']['pin_mismatch']
+        
+        return True, None
+    
     @staticmethod
     def validate_master_password(password: str, confirmation: str) -> Tuple[bool, Optional[str]]:
         """